@@ -0,0 +1,148 @@
+"""
+Load-check the HTTP API (lib.api) on aiosqlite.
+
+    python -m benchmarks.api_load [--contributions 3000] [--concurrency 100] [--min-rate 200]
+
+Seeds a throwaway SQLite database and drives the app in-process through
+httpx's ASGI transport (no sockets, so the numbers are the app and the
+database, not the network). Posts --contributions contributions with
+--concurrency requests in flight, for random members so some merge into
+the same day's row, then fires concurrent requests that must not all
+succeed: the same loan asked for many times at once, and repayments that
+together overdraw one loan.
+
+Exits 1 unless every contribution was accepted at --min-rate or better,
+the ledger still matches the rows (and moved by exactly what was posted),
+one loan was issued, and the repayments stopped at the balance.
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from decimal import Decimal
+
+# Point the app at a scratch file before lib.db.db builds its engine
+DB_PATH = os.path.join(tempfile.mkdtemp(), "api.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+import httpx
+from sqlalchemy import text
+from tabulate import tabulate
+
+from lib.api import app
+from lib.db import seed
+from lib.db.db import session_scope
+from lib.models.member_balance import MemberBalance
+
+
+async def post_all(client, requests, concurrency):
+    """POST (url, body) pairs with concurrency in flight; returns [(status, seconds)] in order"""
+    gate = asyncio.Semaphore(concurrency)
+
+    async def post(url, body):
+        async with gate:
+            started = time.perf_counter()
+            response = await client.post(url, json=body)
+            return response.status_code, time.perf_counter() - started
+
+    return await asyncio.gather(*(post(url, body) for url, body in requests))
+
+
+def eligible_member():
+    """A member old enough to borrow and without an active loan"""
+    with session_scope() as session:
+        return session.execute(text(
+            "SELECT id FROM members WHERE join_date < date('now', '-61 days') AND id NOT IN "
+            "(SELECT member_id FROM loans WHERE status = 'ACTIVE') ORDER BY id LIMIT 1")).scalar()
+
+
+def contributed_total():
+    with session_scope() as session:
+        return sum((balance.total_contributed for balance in session.query(MemberBalance)), Decimal(0))
+
+
+async def check(args, report, failures):
+    rng = random.Random(5)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://api") as client:
+            before = contributed_total()
+            requests = [("/contributions", {"member_id": rng.randint(1, args.members), "amount": "10.50"})
+                        for _ in range(args.contributions)]
+            started = time.perf_counter()
+            results = await post_all(client, requests, args.concurrency)
+            elapsed = time.perf_counter() - started
+
+            rate = len(results) / elapsed
+            latencies = sorted(seconds * 1000 for _, seconds in results)
+            refused = sum(status != 201 for status, _ in results)
+            p50, p99 = statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+            report.append(tabulate([[len(results), args.concurrency, f"{rate:,.0f}", f"{p50:.1f}", f"{p99:.1f}", refused]],
+                                   headers=["Contributions", "In flight", "Per second", "p50 ms", "p99 ms", "Refused"],
+                                   tablefmt="grid"))
+            if refused:
+                failures.append(f"{refused} contribution(s) were not accepted")
+            if rate < args.min_rate:
+                failures.append(f"{rate:,.0f} contributions/s is under --min-rate {args.min_rate:,}")
+            posted = Decimal("10.50") * args.contributions
+            if contributed_total() - before != posted:
+                failures.append(f"the ledger moved by {contributed_total() - before}, expected {posted}")
+
+            # The same loan, asked for many times at once: one is issued, the rest see it as active
+            borrower = eligible_member()
+            results = await post_all(client, [("/loans", {"member_id": borrower, "amount": "100", "plan": "1_month"})]
+                                     * args.race, args.race)
+            issued = sum(status == 201 for status, _ in results)
+            loan_id = (await client.get("/loans", params={"member_id": borrower, "status": "ACTIVE"})).json()[0]["id"]
+            balance = Decimal((await client.get("/loans", params={"member_id": borrower})).json()[0]["balance"])
+
+            # Repayments of a tenth of the balance each, twice as many as it takes: ten get through
+            tenth = (balance / 10).quantize(Decimal("0.01"))
+            results = await post_all(client, [(f"/loans/{loan_id}/repayments", {"amount": str(tenth)})] * 20, 20)
+            repaid = sum(status == 201 for status, _ in results)
+            expected_repaid = int(balance // tenth)
+            report.append(f"Loan race: {issued} of {args.race} requests issued. "
+                          f"Repayment race: {repaid} of 20 posted against a balance of {balance} ({tenth} each).")
+            if issued != 1:
+                failures.append(f"{issued} loans were issued to member {borrower} by {args.race} concurrent requests")
+            if repaid != expected_repaid:
+                failures.append(f"{repaid} repayments of {tenth} were posted against {balance}, "
+                                f"expected {expected_repaid}")
+
+    with session_scope() as session:
+        mismatches = MemberBalance.verify(session)
+    if mismatches:
+        failures.append(f"the ledger disagrees with the rows for {len(mismatches)} member(s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--members", type=int, default=2000)
+    parser.add_argument("--contributions", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=100, help="requests in flight at once")
+    parser.add_argument("--race", type=int, default=20, help="concurrent requests for the same loan")
+    parser.add_argument("--min-rate", type=int, default=200, help="contributions per second to accept")
+    args = parser.parse_args()
+
+    with open(os.devnull, "w") as quiet, contextlib.redirect_stdout(quiet):
+        seed.seed(members=args.members, contributions=args.members * 5, loans=args.members // 10,
+                  repayments=args.members // 10, seed=3, as_of=datetime(2026, 1, 1))
+    report, failures = [], []
+    with open(os.devnull, "w") as quiet, contextlib.redirect_stdout(quiet):  # the models' progress lines
+        asyncio.run(check(args, report, failures))
+
+    print("\n".join(report))
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ Every contribution was accepted in time, the ledger matches and the races were refused.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+Scripted operations per second: one `python -m lib.cli` process per
+operation versus one `batch` process reading NDJSON from stdin.
+
+    python -m benchmarks.batch_cli [--processes 50] [--batch 5000]
+
+Runs against a throwaway SQLite database (DATABASE_URL is set for the
+child processes). Adds members in one batch, then records contributions
+both ways and reports operations/s. Exits 1 if any command fails or the
+ledger does not match afterwards.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from tabulate import tabulate
+
+CLI = [sys.executable, "-m", "lib.cli"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--members", type=int, default=500)
+    parser.add_argument("--processes", type=int, default=50, help="operations run one process each")
+    parser.add_argument("--batch", type=int, default=5_000, help="operations run in one batch process")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp()
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{os.path.join(scratch, 'batch.db')}"}
+
+    def cli(*argv, stdin=None):
+        done = subprocess.run(CLI + list(argv), input=stdin, env=env, capture_output=True, text=True)
+        if done.returncode != 0:
+            sys.exit(f"❌ {' '.join(argv)} exited {done.returncode}: {done.stdout[-500:]}{done.stderr[-500:]}")
+        return done.stdout
+
+    members = "".join(json.dumps({"op": "member.add", "name": f"Member {i}", "phone": f"07{i:08d}"}) + "\n"
+                      for i in range(1, args.members + 1))
+    cli("batch", stdin=members)
+
+    started = time.perf_counter()
+    for i in range(args.processes):
+        cli("contribution", "add", str(i % args.members + 1), "100", "--json")
+    one_each = args.processes / (time.perf_counter() - started)
+
+    ops = "".join(json.dumps({"op": "contribution.add", "member_id": i % args.members + 1, "amount": "100"}) + "\n"
+                  for i in range(args.batch))
+    started = time.perf_counter()
+    cli("batch", stdin=ops)
+    batched = args.batch / (time.perf_counter() - started)
+
+    print(tabulate(
+        [[f"{args.processes} processes, one operation each", f"{one_each:,.1f}"],
+         [f"1 batch process, {args.batch} operations", f"{batched:,.1f}"]],
+        headers=["contribution.add", "Ops/s"], tablefmt="grid",
+    ))
+    verify = subprocess.run([sys.executable, "-m", "lib.db.ledger", "verify"], env=env, capture_output=True, text=True)
+    print(verify.stdout.strip())
+    return verify.returncode
+
+
+if __name__ == "__main__":
+    sys.exit(main())
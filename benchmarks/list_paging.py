@@ -0,0 +1,80 @@
+"""
+Time-to-first-page for "List All Contributions": get_all() + one big
+tabulate grid versus one keyset page.
+
+    python -m benchmarks.list_paging [--contributions 200000]
+
+Loads a throwaway SQLite database with the query_plans fixture, then
+measures the time and peak Python memory to get the first screen of
+rows on screen both ways. It also measures a page near the end of the
+table, which keyset paging makes as cheap as the first one.
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+from tabulate import tabulate
+
+from benchmarks.query_plans import build_fixture
+from lib.db.db import Base, make_engine
+from lib.helper import PAGE_SIZE
+from lib.models.contribution import Contribution
+
+HEADERS = ["ID", "Member ID", "Amount", "Date"]
+
+
+def to_row(c):
+    return [c.id, c.member_id, c.amount, c.date.strftime("%Y-%m-%d %H:%M:%S") if c.date else "-"]
+
+
+def measure(fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return [f"{elapsed * 1000:,.1f}", f"{peak / 2**20:,.1f}"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--members", type=int, default=5_000)
+    parser.add_argument("--contributions", type=int, default=200_000)  # tracemalloc makes get_all() slow
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "paging.db")
+    engine = make_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    build_fixture(engine, args.members, args.contributions, loans=1, repayments=0)
+    Session = sessionmaker(bind=engine)
+
+    with Session() as session:
+        last_id = session.scalar(select(func.max(Contribution.id)))
+
+    def all_rows():
+        with Session() as session:
+            tabulate([to_row(c) for c in Contribution.get_all(session)], headers=HEADERS, tablefmt="grid")
+
+    def one_page(after_id):
+        with Session() as session:
+            tabulate([to_row(c) for c in Contribution.page(after_id, PAGE_SIZE + 1, session)[:PAGE_SIZE]],
+                     headers=HEADERS, tablefmt="grid")
+
+    rows = [
+        ["get_all() + tabulate", *measure(all_rows)],
+        ["first keyset page", *measure(lambda: one_page(0))],
+        ["keyset page near the end", *measure(lambda: one_page(last_id - PAGE_SIZE * 2))],
+    ]
+    print(tabulate(rows, headers=["Contributions list", "ms to render", "Peak MiB"], tablefmt="grid"))
+
+    engine.dispose()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Member lookups with and without the read-through cache, per cache size.
+
+    python -m benchmarks.member_cache [--members 10000] [--lookups 50000]
+
+Loads a throwaway SQLite database with the query_plans fixture, then runs
+the same skewed stream of Member.get_by_id / find_by_phone calls (a few
+members are looked up far more often than the rest, as at a teller
+desk) with the cache off and at several sizes, reporting lookups/s and
+the hit rate. It also checks that create, set_status, delete and TTL
+expiry are never served stale, and exits 1 if one is.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Point the app at a scratch file before lib.db.db builds its engine
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'member_cache.db')}"
+
+from tabulate import tabulate
+
+from benchmarks.query_plans import build_fixture
+from lib.db.cache import LRUCache
+from lib.db.db import Base, engine
+from lib.models import member as member_module
+from lib.models.member import Member, MemberStatus
+
+
+def use_cache(maxsize, ttl=300.0, clock=time.monotonic):
+    member_module.member_cache = LRUCache(maxsize, ttl, clock)
+    return member_module.member_cache
+
+
+def check_invalidation():
+    """Each write must be visible to the next cached lookup"""
+    failures = []
+    now = [0.0]
+    use_cache(100, ttl=60, clock=lambda: now[0])
+
+    member = Member.create("Cache Check", "0799999999")
+    if Member.find_by_phone("0799999999") is None:
+        failures.append("create: new phone not found")
+    Member.get_by_id(member.id).set_status(MemberStatus.SUSPENDED)
+    if Member.get_by_id(member.id).status != MemberStatus.SUSPENDED:
+        failures.append("set_status: stale status by id")
+    if Member.find_by_phone("+254799999999").status != MemberStatus.SUSPENDED:
+        failures.append("set_status: stale status by phone")
+
+    Member.get_by_id(1)
+    with engine.begin() as conn:  # a write the cache cannot see, as from another process
+        conn.exec_driver_sql("UPDATE members SET name = 'Renamed Elsewhere' WHERE id = 1")
+    now[0] += 61
+    if Member.get_by_id(1).name != "Renamed Elsewhere":
+        failures.append("ttl: entry not refreshed after expiry")
+
+    Member.delete(member.id)
+    if Member.get_by_id(member.id) is not None or Member.find_by_phone("0799999999") is not None:
+        failures.append("delete: deleted member still served")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--members", type=int, default=10_000)
+    parser.add_argument("--lookups", type=int, default=50_000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 256, 1024, 8192])
+    args = parser.parse_args()
+
+    Base.metadata.create_all(engine)
+    build_fixture(engine, args.members, contributions=1, loans=1, repayments=0)
+
+    rng = random.Random(7)
+    ids = [min(int(rng.paretovariate(0.4)), args.members) for _ in range(args.lookups)]
+    stream = [(by_phone, member_id) for by_phone, member_id in zip((rng.random() < 0.3 for _ in ids), ids)]
+
+    table = []
+    for size in args.sizes:
+        cache = use_cache(size)
+        started = time.perf_counter()
+        for by_phone, member_id in stream:
+            if by_phone:
+                Member.find_by_phone(f"+2547{member_id:08d}")
+            else:
+                Member.get_by_id(member_id)
+        elapsed = time.perf_counter() - started
+        stats = cache.stats()
+        table.append([size or "off", f"{args.lookups / elapsed:,.0f}",
+                      f"{stats['hit_rate']:.1%}" if size else "-", stats["evictions"]])
+    print(tabulate(table, headers=["Cache size", "Lookups/s", "Hit rate", "Evictions"], tablefmt="grid"))
+
+    failures = check_invalidation()
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ Writes and TTL expiry are never served stale.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""
+Check the Prometheus metrics from lib.metrics end to end.
+
+    python -m benchmarks.metrics_export [--contributions 2000]
+
+Seeds a throwaway SQLite database, serves /metrics on a free local port,
+then records contributions (one by one and as an NDJSON batch whose last
+line fails, so it rolls back), posts repayments, issues a loan, has loans
+refused by each rule but the pool limit, and makes one write fail on a
+held write lock.
+Scrapes the endpoint and exits 1 unless every counter moved by exactly
+what was done, rolled-back work was not counted and the text parses as
+the exposition format. Also prints write ops/s and the cost of a scrape.
+"""
+import argparse
+import io
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime
+
+# Point the app at a scratch file before lib.db.db builds its engine
+DB_PATH = os.path.join(tempfile.mkdtemp(), "metrics.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+from tabulate import tabulate
+
+from lib import commands, metrics
+from lib.db import seed
+from lib.db.db import engine, session_scope
+from lib.db.money import to_money
+from lib.models.member import Member
+from lib.models.contribution import Contribution
+from lib.models.loan import Loan, LoanStatus
+from lib.models.repayment import Repayment
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{(?:[a-zA-Z_]\w*="(?:[^"\\]|\\.)*",?)*\})? (\S+)$')
+
+
+def scrape(port):
+    """{(name, labels): value} from GET /metrics, and the lines that did not parse"""
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+        body = response.read().decode("utf-8")
+    samples, bad = {}, []
+    for line in body.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        match = SAMPLE.match(line)
+        if not match:
+            bad.append(line)
+            continue
+        samples[(match.group(1), match.group(2) or "")] = float(match.group(3))
+    return samples, bad
+
+
+def hold_write_lock():
+    """Another connection holding SQLite's write lock, as a second teller mid-transaction"""
+    other = sqlite3.connect(DB_PATH, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    return other
+
+
+def eligible_member():
+    """A member old enough to borrow and without an active loan"""
+    with session_scope() as session:
+        return session.execute(text(
+            "SELECT id FROM members WHERE join_date < date('now', '-61 days') AND id NOT IN "
+            "(SELECT member_id FROM loans WHERE status = 'ACTIVE') ORDER BY id LIMIT 1")).scalar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contributions", type=int, default=2000)
+    args = parser.parse_args()
+
+    with open(os.devnull, "w") as quiet:
+        sys.stdout, stdout = quiet, sys.stdout
+        try:
+            seed.seed(members=args.contributions, contributions=args.contributions * 5, loans=100, repayments=100,
+                      seed=3, as_of=datetime(2026, 1, 1))
+        finally:
+            sys.stdout = stdout
+    metrics.instrument(engine)
+    port = metrics.serve(0).server_address[1]
+    before, _ = scrape(port)
+    failures = []
+
+    with open(os.devnull, "w") as quiet:
+        sys.stdout, stdout = quiet, sys.stdout
+        try:
+            started = time.perf_counter()
+            for member_id in range(1, args.contributions + 1):
+                Contribution.create(member_id, 100)
+            contribution_rate = args.contributions / (time.perf_counter() - started)
+
+            batch = [f'{{"op": "contribution.add", "member_id": {i}, "amount": "5"}}' for i in range(1, 11)]
+            commands.run_batch(batch + ['{"op": "contribution.add", "member_id": 1, "amount": "-5"}'], io.StringIO())
+
+            with session_scope() as session:
+                open_loans = session.scalars(select(Loan.id).where(Loan.status == LoanStatus.ACTIVE,
+                                                                  Loan.balance >= to_money(10)).limit(20)).all()
+            started = time.perf_counter()
+            for loan_id in open_loans:
+                Repayment.apply_repayment(loan_id, 1)
+            repayment_rate = len(open_loans) / (time.perf_counter() - started)
+
+            borrower = eligible_member()
+            Loan.issue_loan(borrower, 100, "1_month")
+            newcomer = Member.create("Just Joined", "0799000111").id
+            refusals = {"invalid_plan": (1, 100, "2_weeks"), "member_not_found": (10 ** 9, 100, "1_month"),
+                        "membership_age": (newcomer, 100, "1_month"), "active_loan": (borrower, 100, "1_month"),
+                        "contribution_limit": (eligible_member(), 10 ** 9, "1_month"),
+                        "non_positive": (eligible_member(), 0, "1_month")}
+            for rule, (member_id, amount, plan) in refusals.items():
+                try:
+                    Loan.issue_loan(member_id, amount, plan)
+                    failures.append(f"issue_loan was not refused for {rule}")
+                except ValueError:
+                    pass
+
+            other = hold_write_lock()
+            try:
+                with session_scope() as session:
+                    session.execute(text("PRAGMA busy_timeout = 50"))
+                    try:
+                        Contribution.create(1, 100, session)
+                        failures.append("a write went through while another connection held the write lock")
+                    except OperationalError:
+                        pass
+                    finally:
+                        session.execute(text("PRAGMA busy_timeout = 10000"))
+            finally:
+                other.rollback()
+                other.close()
+        finally:
+            sys.stdout = stdout
+
+    started = time.perf_counter()
+    after, bad = scrape(port)
+    scrape_ms = (time.perf_counter() - started) * 1000
+
+    def moved(name, labels=""):
+        return after.get((name, labels), 0) - before.get((name, labels), 0)
+
+    expected = [
+        ("chama_contributions_recorded_total", "", args.contributions),
+        ("chama_contributions_amount_kes_total", "", args.contributions * 100),
+        ("chama_repayments_recorded_total", "", len(open_loans)),
+        ("chama_repayment_seconds_count", '{outcome="ok"}', len(open_loans)),
+        ("chama_loans_issued_total", "", 1),
+        ("chama_loan_decision_seconds_count", '{outcome="issued"}', 1),
+        ("chama_db_lock_errors_total", "", 1),
+    ] + [("chama_loans_rejected_total", f'{{rule="{rule}"}}', 1) for rule in refusals] + [
+        ("chama_loan_decision_seconds_count", '{outcome="rejected"}', len(refusals)),
+    ]
+    table = []
+    for name, labels, want in expected:
+        got = moved(name, labels)
+        table.append([name + labels, f"{got:g}", f"{want:g}", "✅" if got == want else "❌"])
+        if got != want:
+            failures.append(f"{name}{labels} moved by {got:g}, expected {want:g}")
+    print(tabulate(table, headers=["Metric", "Moved", "Expected", ""], tablefmt="grid"))
+
+    for line in bad:
+        failures.append(f"not in the exposition format: {line}")
+    for name, labels in after:
+        if name.endswith("_count"):
+            inf = labels[:-1] + (',le="+Inf"}' if labels else '{le="+Inf"}')
+            if after.get((name[:-len("_count")] + "_bucket", inf)) != after[(name, labels)]:
+                failures.append(f"{name}{labels} differs from its +Inf bucket")
+    if after[("chama_db_sessions_opened_total", "")] - after[("chama_db_sessions_closed_total", "")] \
+            != after[("chama_db_sessions_open", "")]:
+        failures.append("sessions opened - closed != open")
+
+    print(f"Contribution.create: {contribution_rate:,.0f}/s, Repayment.apply_repayment: {repayment_rate:,.0f}/s, "
+          f"one scrape: {scrape_ms:.1f} ms ({len(after)} samples)")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ Every counter matches what was done; rolled-back work is not counted.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
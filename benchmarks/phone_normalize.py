@@ -0,0 +1,105 @@
+"""
+normalize_phone on an M-Pesa-like column: the old per-call regex version
+versus the precompiled, memoized one and the normalize_phones batch API.
+
+    python -m benchmarks.phone_normalize [--rows 1000000] [--distinct 5000]
+
+Builds --rows phone strings drawn from --distinct numbers, each written
+in one of the formats exports use, plus about 1% junk. Every way must
+give the same normalized phone or the same error per row (exits 1 if
+not). It reports rows/s, with the memo cleared before each timed run.
+"""
+import argparse
+import random
+import re
+import sys
+import time
+
+from tabulate import tabulate
+
+from lib.helper import _normalize_phone, normalize_phone, normalize_phones
+
+
+# lib/helper.normalize_phone before it was memoized
+def legacy_normalize_phone(phone: str) -> str:
+    phone = re.sub(r"\D", "", phone)  # remove non-digits
+
+    if phone.startswith("254"):
+        phone = "+" + phone
+    elif phone.startswith("07"):
+        phone = "+254" + phone[1:]
+    elif phone.startswith("7") and len(phone) == 9:
+        phone = "+254" + phone
+    elif phone.startswith("1") and len(phone) == 10:  # Safaricom, Airtel codes
+        phone = "+254" + phone
+    else:
+        raise ValueError("Invalid Kenyan phone number format")
+
+    if not re.match(r"^\+2547\d{8}$", phone):
+        raise ValueError("Invalid Kenyan phone number format")
+    return phone
+
+
+FORMATS = [
+    lambda n: f"07{n}",
+    lambda n: f"+2547{n}",
+    lambda n: f"2547{n}",
+    lambda n: f"07{n[:2]} {n[2:5]} {n[5:]}",
+    lambda n: f"+254 7{n[:2]}-{n[2:5]}-{n[5:]}",
+    lambda n: f"7{n}",
+]
+JUNK = ["", "N/A", "0112345678", "12345", "+1 555 0100", "07123"]
+
+
+def per_row(normalize, phones):
+    results = []
+    for phone in phones:
+        try:
+            results.append((normalize(phone), None))
+        except ValueError as e:
+            results.append((None, str(e)))
+    return results
+
+
+def as_pairs(column):
+    normalized, errors = column
+    return [(phone, errors.get(row)) for row, phone in enumerate(normalized)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--distinct", type=int, default=5_000)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    numbers = [f"{rng.randint(0, 99_999_999):08d}" for _ in range(args.distinct)]
+    phones = [rng.choice(JUNK) if rng.random() < 0.01 else rng.choice(FORMATS)(rng.choice(numbers))
+              for _ in range(args.rows)]
+
+    # name -> (timed call, conversion of its output to (phone, error) per row)
+    ways = {
+        "old normalize_phone per row": (lambda: per_row(legacy_normalize_phone, phones), list),
+        "memoized normalize_phone per row": (lambda: per_row(normalize_phone, phones), list),
+        "normalize_phones(column)": (lambda: normalize_phones(phones), as_pairs),
+    }
+    table, results = [], {}
+    for name, (run, to_pairs) in ways.items():
+        _normalize_phone.cache_clear()
+        started = time.perf_counter()
+        output = run()
+        elapsed = time.perf_counter() - started
+        results[name] = to_pairs(output)
+        table.append([name, f"{args.rows / elapsed:,.0f}", f"{elapsed:.2f}"])
+    info = _normalize_phone.cache_info()
+    print(tabulate(table, headers=[f"{args.rows:,} phones", "Rows/s", "Seconds"], tablefmt="grid"))
+    print(f"Memo after the batch run: {info.currsize:,} distinct strings, {info.hits:,} hits, {info.misses:,} misses")
+
+    reference = results["old normalize_phone per row"]
+    mismatched = [name for name, got in results.items() if got != reference]
+    print("✅ Same phones and errors for every row." if not mismatched else f"❌ Differs: {', '.join(mismatched)}")
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""
+Show the hot lookup queries going from SCAN to SEARCH once the composite
+indexes exist.
+
+    python -m benchmarks.query_plans [--contributions 1000000] [--db PATH]
+
+Builds a throwaway SQLite database (the app's chama.db is never touched),
+loads it without secondary indexes, prints EXPLAIN QUERY PLAN and timings
+for each query, then creates the model indexes and prints them again.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, select
+from tabulate import tabulate
+
+from lib.db.db import Base
+from lib.models.member import Member
+from lib.models.contribution import Contribution
+from lib.models.loan import Loan, LoanStatus
+from lib.models.repayment import Repayment
+from lib.models.member_balance import MemberBalance
+
+FMT = "%Y-%m-%d %H:%M:%S.%f"
+START = datetime(2023, 1, 1)
+
+
+def build_fixture(engine, members, contributions, loans, repayments, seed=42):
+    """Bulk-load random rows straight through the DB-API (no ORM); amounts are in cents"""
+    rng = random.Random(seed)
+    stamp = lambda days: (START + timedelta(days=days, seconds=rng.randint(0, 86399))).strftime(FMT)
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        cur.executemany(
+            "INSERT INTO members (id, name, phone, join_date, status) VALUES (?, ?, ?, ?, 'ACTIVE')",
+            ((i, f"Member {i}", f"+2547{i:08d}", stamp(0)) for i in range(1, members + 1)),
+        )
+        # At most one contribution per member per day, as the unique index requires
+        days = max(1000, contributions // members + 1)
+        slots = rng.sample(range(members * days), contributions)
+        cur.executemany(
+            "INSERT INTO contributions (member_id, amount, date, contribution_day) VALUES (?, ?, ?, ?)",
+            ((slot % members + 1, rng.randint(10000, 500000), stamp(slot // members),
+              (START + timedelta(days=slot // members)).date().isoformat())
+             for slot in slots),
+        )
+        statuses = ["ACTIVE", "PAID", "DEFAULTED"]
+        cur.executemany(
+            "INSERT INTO loans (member_id, amount, issued_date, due_date, interest_rate, status, balance) "
+            "VALUES (?, ?, ?, ?, 4.0, ?, ?)",
+            ((rng.randint(1, members), 100000, stamp(d), stamp(d + 180), rng.choice(statuses), 104000)
+             for d in (rng.randint(0, 1000) for _ in range(loans))),
+        )
+        cur.executemany(
+            "INSERT INTO repayments (loan_id, amount, date) VALUES (?, ?, ?)",
+            ((rng.randint(1, loans), 10000, stamp(rng.randint(0, 1000))) for _ in range(repayments)),
+        )
+        raw.commit()
+    finally:
+        raw.close()
+
+
+def hot_queries(member_id, loan_id):
+    """The lookups issued by the models, as the models write them"""
+    day = START + timedelta(days=500)
+    return {
+        "Contribution.create same-day merge": select(Contribution).where(
+            Contribution.member_id == member_id, Contribution.contribution_day == day.date()
+        ),
+        "Member statement contributions": select(Contribution).where(Contribution.member_id == member_id),
+        "issue_loan Rule 2 active loan": select(Loan).where(
+            Loan.member_id == member_id, Loan.status == LoanStatus.ACTIVE
+        ),
+        "Overdue / arrears loans": select(Loan).where(
+            Loan.status == LoanStatus.DEFAULTED, Loan.due_date < START + timedelta(days=30)
+        ),
+        "Repayment.for_loan": select(Repayment).where(Repayment.loan_id == loan_id),
+        "Loan.mark_overdue sweep": select(Loan.id).where(*Loan.overdue(START + timedelta(days=30))),
+    }
+
+
+def measure(engine, queries, repeat=20):
+    rows = {}
+    with engine.connect() as conn:
+        for name, query in queries.items():
+            sql = str(query.compile(engine, compile_kwargs={"literal_binds": True}))
+            plan = "; ".join(r[-1] for r in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql))
+            started = time.perf_counter()
+            for _ in range(repeat):
+                conn.exec_driver_sql(sql).fetchall()
+            rows[name] = (plan, (time.perf_counter() - started) / repeat * 1000)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--members", type=int, default=10_000)
+    parser.add_argument("--contributions", type=int, default=1_000_000)
+    parser.add_argument("--loans", type=int, default=100_000)
+    parser.add_argument("--repayments", type=int, default=200_000)
+    parser.add_argument("--db", help="fixture path (default: a temp file, removed afterwards)")
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    tables = [t.__table__ for t in (Member, Contribution, Loan, Repayment, MemberBalance)]
+    indexes = [index for table in tables for index in table.indexes]
+
+    Base.metadata.create_all(engine, tables=tables)
+    with engine.begin() as conn:
+        for index in indexes:
+            index.drop(conn)
+
+    started = time.perf_counter()
+    build_fixture(engine, args.members, args.contributions, args.loans, args.repayments)
+    print(f"Loaded fixture in {time.perf_counter() - started:.1f}s ({path})")
+
+    queries = hot_queries(member_id=args.members // 2, loan_id=args.loans // 2)
+    before = measure(engine, queries)
+    with engine.begin() as conn:
+        for index in indexes:
+            index.create(conn)
+        conn.exec_driver_sql("ANALYZE")
+    after = measure(engine, queries)
+
+    table = [
+        [name, before[name][0], f"{before[name][1]:.2f}", after[name][0], f"{after[name][1]:.2f}"]
+        for name in queries
+    ]
+    print(tabulate(table, headers=["Query", "Plan before", "ms", "Plan after", "ms"], tablefmt="grid"))
+
+    engine.dispose()
+    if not args.db:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Full ORM entities vs read models for a listing query.
+
+    python -m benchmarks.read_models [--loans 200000]
+
+Loads a throwaway SQLite database with the query_plans fixture, then
+loads every loan three ways: session.query(Loan).all(), raw Row results
+of Loan.projection(), and LoanRow named tuples via Loan.fetch(). It
+reports rows/sec (best of --repeat runs, without tracing) and the Python
+memory held per loaded row.
+"""
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy.orm import sessionmaker
+from tabulate import tabulate
+
+from benchmarks.query_plans import build_fixture
+from lib.db.db import Base, make_engine
+from lib.models.loan import Loan
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--loans", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "read_models.db")
+    engine = make_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    build_fixture(engine, members=1_000, contributions=1, loans=args.loans, repayments=0)
+    Session = sessionmaker(bind=engine)
+
+    ways = {
+        "session.query(Loan).all()": lambda session: session.query(Loan).all(),
+        "Row from Loan.projection()": lambda session: session.execute(Loan.projection()).all(),
+        "LoanRow via Loan.fetch()": lambda session: Loan.fetch(Loan.projection(), session),
+    }
+
+    table = []
+    for name, load in ways.items():
+        best = float("inf")
+        for _ in range(args.repeat):
+            with Session() as session:
+                started = time.perf_counter()
+                rows = load(session)
+                best = min(best, time.perf_counter() - started)
+            del rows
+            gc.collect()
+
+        with Session() as session:
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+            rows = load(session)
+            held = tracemalloc.get_traced_memory()[0] - baseline
+            tracemalloc.stop()
+            count = len(rows)
+            del rows
+        gc.collect()
+        table.append([name, f"{count / best:,.0f}", f"{held / count:,.0f}"])
+
+    print(tabulate(table, headers=[f"Loading {args.loans:,} loans", "Rows/s", "Bytes/row"], tablefmt="grid"))
+    engine.dispose()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Compare the SQLite engine profiles from lib/db/db.py.
+
+    python -m benchmarks.sqlite_profiles [--writes 2000] [--writers 4] [--readers 4]
+
+For each profile a throwaway database is created. Writer threads record
+contributions one transaction at a time (like tellers at their desks)
+while reader threads keep reading member ledger rows. The table shows
+write throughput, read latency and how many operations failed with
+"database is locked".
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from tabulate import tabulate
+
+from lib.db.db import Base, SQLITE_PROFILES, make_engine
+from lib.models.member import Member
+from lib.models.contribution import Contribution
+from lib.models.member_balance import MemberBalance
+
+MEMBERS = 500
+
+
+def setup(engine):
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(Member.__table__.insert(), [
+            {"id": i, "name": f"Member {i}", "phone": f"+2547{i:08d}", "join_date": datetime(2024, 1, 1)}
+            for i in range(1, MEMBERS + 1)
+        ])
+
+
+def writer(Session, writes, day_offset, errors):
+    """Record contributions, one commit per deposit"""
+    rng = random.Random(day_offset)
+    for i in range(writes):
+        member_id = rng.randint(1, MEMBERS)
+        stamp = datetime(2025, 1, 1) + timedelta(days=day_offset * writes + i)
+        try:
+            with Session() as session:
+                Contribution.bulk_create([(member_id, 100.0, stamp)], session)
+                session.commit()
+        except OperationalError:
+            errors.append("write")
+
+
+def reader(Session, stop, latencies, errors):
+    """Read member balances until the writers are done"""
+    rng = random.Random()
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            with Session() as session:
+                session.execute(select(MemberBalance).where(MemberBalance.member_id == rng.randint(1, MEMBERS))).all()
+            latencies.append((time.perf_counter() - started) * 1000)
+        except OperationalError:
+            errors.append("read")
+
+
+def run_profile(profile, writes, writers, readers):
+    path = os.path.join(tempfile.mkdtemp(), f"{profile}.db")
+    # A 1s driver timeout stands in for an impatient teller; profiles with busy_timeout override it
+    engine = make_engine(f"sqlite:///{path}", profile, connect_args={"timeout": 1})
+    setup(engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+
+    stop = threading.Event()
+    latencies, errors = [], []
+    read_threads = [threading.Thread(target=reader, args=(Session, stop, latencies, errors)) for _ in range(readers)]
+    write_threads = [threading.Thread(target=writer, args=(Session, writes, n, errors)) for n in range(writers)]
+
+    for thread in read_threads:
+        thread.start()
+    started = time.perf_counter()
+    for thread in write_threads:
+        thread.start()
+    for thread in write_threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    for thread in read_threads:
+        thread.join()
+    engine.dispose()
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95)] if latencies else float("nan")
+    return [
+        profile,
+        f"{writes * writers / elapsed:,.0f}",
+        f"{statistics.median(latencies) if latencies else float('nan'):.2f}",
+        f"{p95:.2f}",
+        errors.count("write"),
+        errors.count("read"),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writes", type=int, default=2000, help="commits per writer thread")
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--profiles", nargs="*", default=list(SQLITE_PROFILES))
+    args = parser.parse_args()
+
+    rows = [run_profile(profile, args.writes, args.writers, args.readers) for profile in args.profiles]
+    print(tabulate(rows, headers=["Profile", "Writes/s", "Read p50 ms", "Read p95 ms", "Write locked", "Read locked"],
+                   tablefmt="grid"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+CLI start-up: wall time and `-X importtime` import cost per command,
+checked against a budget.
+
+    python -m benchmarks.startup [--repeat 5] [--budget-ms 600]
+
+Runs a few short commands as fresh processes against a throwaway SQLite
+database (created and stamped by the first command). For each one it
+reports the best wall time, the best total import time over as many
+-X importtime runs (one traced run is at the mercy of whatever else the
+machine is doing) and that run's heaviest top-level imports. Exits 1 if a command goes over its import
+budget, imports a module it should not need, or if lib.db.db's
+SCHEMA_REVISION is not the Alembic head (then init_db() would refuse
+every database migrated to head).
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from tabulate import tabulate
+
+CLI = [sys.executable, "-m", "lib.cli"]
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# command -> modules it must not import
+COMMANDS = {
+    "-h": ["sqlalchemy", "tabulate", "faker"],
+    "report totals --json": ["tabulate", "faker", "sqlalchemy.dialects.postgresql"],
+    "member show 1 --json": ["tabulate", "faker", "sqlalchemy.dialects.postgresql"],
+    "loan list --ndjson": ["tabulate", "faker", "sqlalchemy.dialects.postgresql"],
+}
+
+
+def import_times(stderr):
+    """{module: cumulative µs} for top-level imports, and the set of every imported module"""
+    top, every = {}, set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        every.add(name.strip())
+        if not name[1:].startswith(" "):  # not nested under another import
+            top[name.strip()] = int(cumulative)
+    return top, every
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=600, help="import-time budget per database command")
+    parser.add_argument("--help-budget-ms", type=float, default=60, help="import-time budget for -h")
+    args = parser.parse_args()
+
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+    from lib.db.db import SCHEMA_REVISION
+    head = ScriptDirectory.from_config(Config(os.path.join(ROOT, "alembic.ini"))).get_current_head()
+
+    scratch = tempfile.mkdtemp()
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{os.path.join(scratch, 'startup.db')}",
+           "PYTHONPATH": os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")]))}
+    subprocess.run(CLI + ["member", "add", "Start Up", "0700000000", "--json"], env=env, check=True,
+                   capture_output=True)
+
+    table, failures = [], []
+    for command, forbidden in COMMANDS.items():
+        argv = CLI + command.split()
+        best = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            subprocess.run(argv, env=env, check=True, capture_output=True)
+            best = min(best, time.perf_counter() - started)
+
+        top, every = None, set()
+        for _ in range(args.repeat):
+            traced = subprocess.run([sys.executable, "-X", "importtime"] + argv[1:], env=env, check=True,
+                                    capture_output=True, text=True)
+            run_top, run_every = import_times(traced.stderr)
+            if top is None or sum(run_top.values()) < sum(top.values()):
+                top = run_top
+            every |= run_every
+        imports_ms = sum(top.values()) / 1000
+        heaviest = sorted(top.items(), key=lambda item: -item[1])[:3]
+        table.append([command, f"{best * 1000:,.0f}", f"{imports_ms:,.0f}",
+                      ", ".join(f"{name} {us / 1000:,.0f}" for name, us in heaviest)])
+
+        budget = args.help_budget_ms if command == "-h" else args.budget_ms
+        if imports_ms > budget:
+            failures.append(f"{command}: imports took {imports_ms:,.0f} ms (budget {budget:,.0f} ms)")
+        for module in forbidden:
+            if module in every:
+                failures.append(f"{command}: imported {module}")
+
+    print(tabulate(table, headers=["python -m lib.cli", "Best wall ms", "Import ms", "Heaviest imports (ms)"],
+                   tablefmt="grid"))
+    if SCHEMA_REVISION != head:
+        failures.append(f"SCHEMA_REVISION is {SCHEMA_REVISION} but the Alembic head is {head}")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ Within budget.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Monthly statements for every member: cold (no checkpoints, whole history
+read) versus warm (starting from the previous month's checkpoints).
+
+    python -m benchmarks.statements [--members 10000] [--contributions 1000000]
+
+Loads a throwaway SQLite database with the query_plans fixture, builds
+the --month statements cold, then builds the month before it (which
+stores checkpoints) and the --month statements again. It reports time
+and activity rows read for each run, and checks that cold and warm
+runs give every member the same opening and closing totals.
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+from sqlalchemy.orm import sessionmaker
+from tabulate import tabulate
+
+from benchmarks.query_plans import build_fixture
+from lib import statements
+from lib.db.db import Base, make_engine
+from lib.models.member import Member
+from lib.models.statement_checkpoint import StatementCheckpoint
+
+rows_read = 0
+
+
+def counting(activity):
+    def wrapper(*args):
+        global rows_read
+        found = activity(*args)
+        rows_read += sum(len(rows) for by_member in found for rows in by_member.values())
+        return found
+    return wrapper
+
+
+def run(Session, start, end, batch_size):
+    """Build (and checkpoint) every member's statement for start..end without writing files"""
+    global rows_read
+    rows_read, after_id, closing = 0, 0, {}
+    started = time.perf_counter()
+    while True:
+        with Session.begin() as session:
+            members = Member.page(after_id, batch_size, session)
+            if not members:
+                break
+            for statement in statements.build_statements(session, members, start, end):
+                closing[statement.member.id] = (statement.opening, statement.closing)
+        after_id = members[-1].id
+    return time.perf_counter() - started, rows_read, closing
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--members", type=int, default=10_000)
+    parser.add_argument("--contributions", type=int, default=1_000_000)
+    parser.add_argument("--loans", type=int, default=50_000)
+    parser.add_argument("--repayments", type=int, default=100_000)
+    parser.add_argument("--month", default="2025-06", help="month N (the fixture spans 2023-01 to 2025-09)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "statements.db")
+    engine = make_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    build_fixture(engine, args.members, args.contributions, args.loans, args.repayments)
+    Session = sessionmaker(bind=engine)
+    statements.activity = counting(statements.activity)
+
+    start, end = statements.month_period(args.month)
+    previous = statements.month_period(f"{start - timedelta(days=1):%Y-%m}")
+
+    cold = run(Session, start, end, args.batch_size)
+    with Session.begin() as session:
+        StatementCheckpoint.clear(session)
+    prior = run(Session, *previous, args.batch_size)
+    warm = run(Session, start, end, args.batch_size)
+
+    print(tabulate(
+        [[f"{args.month} cold (no checkpoints)", f"{cold[0]:.2f}", f"{cold[1]:,}"],
+         [f"{previous[0]:%Y-%m} (stores checkpoints)", f"{prior[0]:.2f}", f"{prior[1]:,}"],
+         [f"{args.month} from checkpoints", f"{warm[0]:.2f}", f"{warm[1]:,}"]],
+        headers=[f"Statements for {args.members:,} members", "Seconds", "Rows read"], tablefmt="grid",
+    ))
+    mismatched = [member_id for member_id in cold[2] if cold[2][member_id] != warm[2].get(member_id)]
+    print("✅ Cold and warm totals match." if not mismatched else f"❌ Totals differ for members {mismatched[:10]}")
+
+    engine.dispose()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# lib/api.py
+from contextlib import asynccontextmanager
+from decimal import Decimal
+from typing import Literal, Optional
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+from sqlalchemy.exc import SQLAlchemyError
+from lib import metrics, services
+from lib.commands import NotFound, dumps
+from lib.db import aio
+from lib.db.db import init_db
+
+# HTTP API over the models, for the mobile app and the USSD gateway.
+#
+#     python -m lib.cli serve-api [--host 127.0.0.1] [--port 8000]
+#
+# Every request is one transaction on the asyncio engine (lib.db.aio); the
+# operations are lib.services (and through it lib.commands), so results,
+# messages and rules match the CLI and the batch mode. Money goes out as
+# exact strings. Refusals are 422 with {"error": message}, unknown records
+# 404, database failures 503. Listings are keyset paged: pass the last id
+# seen as after_id.
+
+
+class ChamaJSONResponse(JSONResponse):
+    """JSON the way lib.commands writes it: money as exact strings, ISO 8601 dates, enums by value"""
+
+    def render(self, content):
+        return dumps(content).encode("utf-8")
+
+
+def reply(content, status_code=200):
+    return ChamaJSONResponse(content, status_code)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    init_db()
+    metrics.instrument(aio.engine.sync_engine)
+    yield
+    await aio.engine.dispose()
+
+
+app = FastAPI(title="Chama Tracking System", lifespan=lifespan, default_response_class=ChamaJSONResponse)
+
+
+@app.exception_handler(NotFound)
+async def not_found(request, error):
+    return reply({"error": str(error)}, 404)
+
+
+@app.exception_handler(ValueError)  # a rule or validation refused it (CommandError included)
+async def rejected(request, error):
+    return reply({"error": str(error)}, 422)
+
+
+@app.exception_handler(SQLAlchemyError)  # locked, connection lost, ...
+async def database_error(request, error):
+    return reply({"error": f"❌ Database error: {error}"}, 503)
+
+
+# Request bodies. Amounts are parsed as Decimal, from JSON numbers or strings.
+class NewMember(BaseModel):
+    name: str
+    phone: str
+    status: str = "ACTIVE"
+
+
+class StatusChange(BaseModel):
+    status: str
+
+
+class NewContribution(BaseModel):
+    member_id: int
+    amount: Decimal
+
+
+class LoanRequest(BaseModel):
+    member_id: int
+    amount: Decimal
+    plan: str
+
+
+class NewRepayment(BaseModel):
+    amount: Decimal
+    date: Optional[str] = None  # when it was paid, YYYY-MM-DD[ HH:MM[:SS]] (default: now)
+
+
+PageSize = Query(services.PAGE_SIZE, ge=1, le=services.MAX_PAGE_SIZE)
+
+
+# Members
+@app.post("/members", status_code=201)
+async def add_member(member: NewMember):
+    async with aio.write_scope() as session:
+        return reply(await services.run(session, "member.add", **member.model_dump()), 201)
+
+
+@app.get("/members")
+async def list_members(status: Optional[str] = None, after_id: int = 0, limit: int = PageSize):
+    async with aio.session_scope() as session:
+        return reply(await services.member_list(session, status, after_id, limit))
+
+
+@app.get("/members/{member_id}")
+async def show_member(member_id: int):
+    async with aio.session_scope() as session:
+        return reply(await services.run(session, "member.show", id=member_id))
+
+
+@app.patch("/members/{member_id}")
+async def set_member_status(member_id: int, change: StatusChange):
+    async with aio.write_scope() as session:
+        return reply(await services.run(session, "member.set-status", id=member_id, status=change.status))
+
+
+@app.delete("/members/{member_id}")
+async def delete_member(member_id: int):
+    async with aio.write_scope() as session:
+        return reply(await services.run(session, "member.delete", id=member_id))
+
+
+# Contributions
+@app.post("/contributions", status_code=201)
+async def add_contribution(contribution: NewContribution):
+    return reply(await services.contribution_add(contribution.member_id, contribution.amount), 201)
+
+
+@app.get("/contributions")
+async def list_contributions(member_id: Optional[int] = None, after_id: int = 0, limit: int = PageSize):
+    async with aio.session_scope() as session:
+        return reply(await services.contribution_list(session, member_id, after_id, limit))
+
+
+# Loans
+@app.post("/loans", status_code=201)
+async def issue_loan(request: LoanRequest):
+    async with aio.write_scope() as session:
+        return reply(await services.loan_issue(session, request.member_id, request.amount, request.plan), 201)
+
+
+@app.get("/loans")
+async def list_loans(member_id: Optional[int] = None, status: Optional[str] = None, after_id: int = 0,
+                     limit: int = PageSize):
+    async with aio.session_scope() as session:
+        return reply(await services.loan_list(session, member_id, status, after_id, limit))
+
+
+@app.post("/loans/{loan_id}/repayments", status_code=201)
+async def repay_loan(loan_id: int, repayment: NewRepayment):
+    async with aio.write_scope() as session:
+        return reply(await services.run(session, "loan.repay", loan_id=loan_id, amount=repayment.amount,
+                                        date=repayment.date), 201)
+
+
+@app.get("/repayments")
+async def list_repayments(loan_id: Optional[int] = None, after_id: int = 0, limit: int = PageSize):
+    async with aio.session_scope() as session:
+        return reply(await services.repayment_list(session, loan_id, after_id, limit))
+
+
+# Reports
+@app.get("/reports/{report}")
+async def report(report: Literal["totals", "arrears", "status"]):
+    async with aio.session_scope() as session:
+        return reply(await services.run(session, f"report.{report}"))
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+def serve(host="127.0.0.1", port=8000):
+    """Run the API with uvicorn until interrupted"""
+    import uvicorn
+    uvicorn.run(app, host=host, port=port, access_log=False)
+    return 0
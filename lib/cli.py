@@ -1,357 +1,288 @@
-from lib.models.member import Member, MemberStatus
-from lib.models.contribution import Contribution
-from lib.models.loan import Loan, LoanStatus
-from lib.models.repayment import Repayment
-from lib.helper import prompt_int, prompt_choice, prompt_float, confirm_delete, print_header
-from lib.db.db import init_db, SessionLocal
-from tabulate import tabulate
-from datetime import datetime, timedelta
-# MAIN MENU 
-def main_menu():
-    while True:
-        print_header("💰 CHAMA TRACKING SYSTEM 💸")
-        print("1. Members")
-        print("2. Contributions")
-        print("3. Loans")
-        print("4. Reports")
-        print("0. Exit")
-
-        choice = prompt_choice("Choose: ", ["1", "2", "3", "4", "0"])
-
-        if choice == "1":
-            members_menu()
-        elif choice == "2":
-            contributions_menu()
-        elif choice == "3":
-            loans_menu()
-        elif choice == "4":
-            reports_menu()
-        elif choice == "0":
-            print("👋 Thanks for Visiting My Chama!")
-            break
-
-
-# MEMBERS MENU
-def members_menu():
-    while True:
-        print_header("===🧑🏽‍🤝‍🧑🏾 MEMBERS MENU ===")
-        print("1. Create Member")
-        print("2. Delete Member")
-        print("3. List All Members")
-        print("4. Find by ID")
-        print("5. Find by Phone")
-        print("6. Set Status")
-        print("0. Back to Main")
-
-        choice = prompt_choice("Choose: ", ["1", "2", "3", "4", "5", "6", "0"])
-
-        if choice == "1":
-            name = input("Enter Member Full Name: ")
-            phone = input("Enter Phone (07…): ")
-            try:
-                Member.create(name, phone)
-            except Exception as e:
-                print(f"❌ {e}")
-
-        elif choice == "2":
-            member_id = prompt_int("Enter Member ID to delete: ")
-            member = Member.get_by_id(member_id)
-            if member and confirm_delete(member.name):
-                Member.delete(member_id)
-
-        elif choice == "3":
-            members = Member.get_all()
-            if not members:
-                print("❌No Members found.")
-            else:
-                table = []
-                for m in members:
-                    joined = m.join_date.strftime("%Y-%m-%d %H:%M:%S") if m.join_date else "-"
-                    table.append([m.id, m.name, m.phone, m.status.value, joined])
-                headers = ["ID", "Name", "Phone", "Status", "Joined At"]
-                print(tabulate(table, headers=headers, tablefmt="grid"))
-
-        elif choice == "4":
-            member_id = prompt_int("Enter member ID: ")
-            member = Member.get_by_id(member_id)
-            if member:
-                print(f"✅ Found: {member.name}, Phone: {member.phone}, Status: {member.status.value}")
-            else:
-                print("❌ Member not found.")
-
-        elif choice == "5":
-            phone = input("Enter phone: ")
-            member = Member.find_by_phone(phone)
-            if member:
-                print(f"✅ Found: {member.name}, Phone: {member.phone}, Status: {member.status.value}")
-            else:
-                print("❌ No member with that phone.")
-
-        elif choice == "6":
-            member_id = prompt_int("Enter member ID: ")
-            member = Member.get_by_id(member_id)
-            if not member:
-                print("❌ Member not found.")
-                continue
-            print("1. ACTIVE\n2. INACTIVE\n3. SUSPENDED")
-            status_choice = prompt_choice("Choose status: ", ["1", "2", "3"])
-            status_map = {"1": MemberStatus.ACTIVE, "2": MemberStatus.INACTIVE, "3": MemberStatus.SUSPENDED}
-            member.set_status(status_map[status_choice])
-
-        elif choice == "0":
-            break
-
-
-# CONTRIBUTIONS MENU
-def contributions_menu():
-    while True:
-        print_header("=== 🤑 CONTRIBUTIONS ===")
-        print("1. Record Contribution")
-        print("2. Delete Contribution")
-        print("3. List All Contributions")
-        print("4. Find Contribution by ID")
-        print("5. View Contribution's Member")
-        print("6. Show Member Total Contributions")
-        print("7. Show All Contributions for a Member")
-        print("0. Back to Main")
-
-        choice = prompt_choice("Choose: ", ["1","2","3","4","5","6","7","0"])
-
-        if choice == "0":
-            break
-
-        elif choice == "1":
-            member_id = prompt_int("Enter Member ID: ")
-            amount = prompt_float("Enter Contribution amount: ")
-            try:
-                Contribution.create(member_id, amount)
-            except Exception as e:
-                print(f"❌ {e}")
-
-        elif choice == "2":
-            contribution_id = prompt_int("Enter Contribution ID to delete: ")
-            Contribution.delete(contribution_id)
-
-        elif choice == "3":
-            contributions = Contribution.get_all()
-            table = []
-            for c in contributions:
-                date = c.date.strftime("%Y-%m-%d %H:%M:%S") if c.date else "-"
-                table.append([c.id, c.member_id, c.amount, date])
-            headers = ["ID", "Member ID", "Amount", "Date"]
-            print(tabulate(table, headers=headers, tablefmt="grid"))
-
-        elif choice == "4":
-            contribution_id = prompt_int("Enter Contribution ID: ")
-            c = Contribution.get_by_id(contribution_id)
-            if c:
-                date = c.date.strftime("%Y-%m-%d %H:%M:%S") if c.date else "-"
-                print(f"ID: {c.id}, Member ID: {c.member_id}, Amount: {c.amount}, Date: {date}")
-            else:
-                print("❌ Contribution not found.")
-
-        elif choice == "5":
-            contribution_id = prompt_int("Enter Contribution ID: ")
-            c = Contribution.get_by_id(contribution_id)
-            if c:
-                member = Member.get_by_id(c.member_id)
-                if member:
-                    print(f"Contribution Member: {member.name}, Phone: {member.phone}, Status: {member.status.value}")
-                else:
-                    print("❌ Member not found.")
-
-        elif choice == "6":
-            member_id = prompt_int("Enter Member ID: ")
-            total = Contribution.total_for_member(member_id)
-            print(f"Total contributions for Member {member_id}: {total}")
-
-        elif choice == "7":
-            member_id = prompt_int("Enter Member ID: ")
-            contributions = Contribution.for_member(member_id)
-            if not contributions:
-                print("❌ No contributions found for this member.")
-            else:
-                table = []
-                for c in contributions:
-                    date = c.date.strftime("%Y-%m-%d %H:%M:%S") if c.date else "-"
-                    table.append([c.id, c.amount, date])
-                headers = ["ID", "Amount", "Date"]
-                print(tabulate(table, headers=headers, tablefmt="grid"))
-
-# LOANS MENU
-def loans_menu():
-    while True:
-        print_header("=== 💵 LOANS ===")
-        print("1. Issue Loan")
-        print("2. Record Loan Repayment")
-        print("3. Delete Loan")
-        print("4. List All Loans")
-        print("5. Find Loan by ID")
-        print("6. Find Loans by Status")
-        print("7. View Loan's Member")
-        print("0. Back to Main")
-
-        choice = prompt_choice("Choose: ", ["1","2","3","4","5","6","7","0"])
-
-        if choice == "0":
-            break
-
-        elif choice == "1":  # Issue Loan
-            member_id = prompt_int("Enter Member ID: ")
-            amount = prompt_float("Enter loan amount: ")
-            print("Choose Loan Plan:")
-            print("1. 1 Month (2% interest)")
-            print("2. 6 Months (4% interest)")
-            print("3. 12 Months (7% interest)")
-            plan_choice = prompt_choice("Select plan: ", ["1","2","3"])
-            plan_map = {"1": "1_month", "2": "6_months", "3": "12_months"}
-            plan = plan_map[plan_choice]
-            try:
-                loan = Loan.issue_loan(member_id, amount, plan)
-            except Exception as e:
-                print(f"❌ Cannot issue loan: {e}")
-
-        elif choice == "2":  # Record Repayment
-            loan_id = prompt_int("Enter Loan ID: ")
-            amount = prompt_float("Enter repayment amount: ")
-            try:
-                loan = Loan.get_by_id(loan_id)
-                if not loan:
-                    print("❌ Loan not found.")
-                    continue
-                loan.apply_repayment(amount)
-            except Exception as e:
-                print(f"❌ {e}")
-
-        elif choice == "3":  # Delete Loan
-            loan_id = prompt_int("Enter Loan ID to delete: ")
-            loan = Loan.get_by_id(loan_id)
-            if loan and confirm_delete(f"Loan {loan.id}"):
-                session = SessionLocal()
-                session.delete(session.merge(loan))
-                session.commit()
-                session.close()
-                print(f"🚮 Loan {loan_id} deleted.")
-
-        elif choice == "4":  # List All Loans
-            loans = Loan.get_all()
-            table = []
-            for l in loans:
-                issued = l.issued_date.strftime("%Y-%m-%d %H:%M:%S") if l.issued_date else "-"
-                due = l.due_date.strftime("%Y-%m-%d %H:%M:%S") if l.due_date else "-"
-                table.append([l.id, l.member_id, f"{l.amount:.2f}", f"{l.balance:.2f}", l.status.value, issued, due])
-            headers = ["ID","Member ID","Amount","Balance","Status","Issued At","Due Date"]
-            print(tabulate(table, headers=headers, tablefmt="grid"))
-
-        elif choice == "5":  # Find Loan by ID
-            loan_id = prompt_int("Enter Loan ID: ")
-            l = Loan.get_by_id(loan_id)
-            if l:
-                issued = l.issued_date.strftime("%Y-%m-%d %H:%M:%S")
-                due = l.due_date.strftime("%Y-%m-%d %H:%M:%S")
-                print(f"Loan {l.id}: Member {l.member_id}, Amount {l.amount:.2f}, Balance {l.balance:.2f}, "
-                      f"Status {l.status.value}, Issued {issued}, Due {due}")
-            else:
-                print("❌ Loan not found.")
-
-        elif choice == "6":  # Find Loans by Status
-            print("1. ACTIVE\n2. PAID\n3. DEFAULTED")
-            status_choice = prompt_choice("Choose status: ", ["1","2","3"])
-            status_map = {"1": LoanStatus.ACTIVE, "2": LoanStatus.PAID, "3": LoanStatus.DEFAULTED}
-            loans = Loan.find_by_status(status_map[status_choice])
-            table = [[l.id, l.member_id, f"{l.amount:.2f}", f"{l.balance:.2f}", l.status.value] for l in loans]
-            headers = ["ID","Member ID","Amount","Balance","Status"]
-            print(tabulate(table, headers=headers, tablefmt="grid"))
-
-        elif choice == "7":  # View Loan's Member
-            loan_id = prompt_int("Enter Loan ID: ")
-            l = Loan.get_by_id(loan_id)
-            if l:
-                member = Member.get_by_id(l.member_id)
-                if member:
-                    print(f"Loan Member: {member.name}, Phone: {member.phone}, Status: {member.status.value}")
-                else:
-                    print("❌ Member not found.")
-            else:
-                print("❌ Loan not found.")
-# REPORTS MENU
-def reports_menu():
-    while True:
-        print_header("=== 📊 REPORTS ===")
-        print("1. Member Statement")
-        print("2. Group Totals")
-        print("3. Members in Arrears")
-        print("0. Back to Main")
-
-        choice = prompt_choice("Choose: ", ["1", "2", "3", "0"])
-
-        if choice == "0":
-            break
-
-        elif choice == "1":  # Member Statement
-            member_id = prompt_int("Enter Member ID: ")
-            member = Member.get_by_id(member_id)
-            if not member:
-                print("❌ Member not found.")
-                continue
-
-            print(f"\nStatement for {member.name} (Phone: {member.phone}, Status: {member.status.value})")
-
-            # Contributions
-            contributions = Contribution.for_member(member_id)
-            if contributions:
-                table = [[c.id, f"{c.amount:.2f}", c.date.strftime("%Y-%m-%d")] for c in contributions]
-                print("\nContributions:")
-                print(tabulate(table, headers=["ID","Amount","Date"], tablefmt="grid"))
-                total_contrib = sum(c.amount for c in contributions)
-                print(f"Total Contributions: {total_contrib:.2f}")
-            else:
-                print("❌ No contributions found.")
-
-            # Loans
-            loans = Loan.for_member(member_id)
-            if loans:
-                table = [[l.id, f"{l.amount:.2f}", f"{l.balance:.2f}", l.status.value, l.due_date.strftime("%Y-%m-%d")] for l in loans]
-                print("\nLoans:")
-                print(tabulate(table, headers=["ID","Amount","Balance","Status","Due Date"], tablefmt="grid"))
-                total_loans_member = sum(l.amount for l in loans)
-                total_outstanding_member = sum(l.balance for l in loans if l.status in [LoanStatus.ACTIVE, LoanStatus.DEFAULTED])
-                print(f"Total Loans: {total_loans_member:.2f}")
-                print(f"Total Outstanding Balance: {total_outstanding_member:.2f}")
-            else:
-                print("❌ No loans found.")
-
-        elif choice == "2":  # Group Totals
-            members = Member.get_all()
-            total_contributions = sum(Contribution.total_for_member(m.id) for m in members)
-            total_loans = 0
-            total_outstanding = 0
-            for m in members:
-                loans = Loan.for_member(m.id)
-                total_loans += sum(l.amount for l in loans)
-                total_outstanding += sum(l.balance for l in loans if l.status in [LoanStatus.ACTIVE, LoanStatus.DEFAULTED])
-
-            print_header("--- Group Totals ---")
-            print(f"Total Members: {len(members)}")
-            print(f"Total Contributions: {total_contributions:.2f}")
-            print(f"Total Loans Issued: {total_loans:.2f}")
-            print(f"Total Outstanding Balance: {total_outstanding:.2f}")
-
-        elif choice == "3":  # Members in Arrears
-            members = Member.get_all()
-            arrears_list = []
-            for m in members:
-                for l in Loan.for_member(m.id):
-                    if l.status == LoanStatus.DEFAULTED:
-                        arrears_list.append([m.id, m.name, m.phone, f"{l.balance:.2f}", l.due_date.strftime("%Y-%m-%d")])
-
-            if arrears_list:
-                print("\nMembers in Arrears:")
-                print(tabulate(arrears_list, headers=["Member ID","Name","Phone","Outstanding","Due Date"], tablefmt="grid"))
-            else:
-                print("❌ No members in arrears.")
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import nullcontext, redirect_stdout
+from datetime import date, timedelta
+
+# Entry point. Only argparse and the standard library load up front: the
+# models, SQLAlchemy's ORM and tabulate are imported by whichever menu or
+# subcommand needs them, so `-h` and short scripted commands start fast.
+# The interactive menus live in lib.menu.
+
+def export_statements(month, out_dir, workers=None, batch_size=250):
+    """Export every member's statement for month as text and CSV with a process pool"""
+    from lib.exporter import export_statements as export
+    from lib.statements import month_period
+    try:
+        start, end = month_period(month)
+    except ValueError:
+        print(f"❌ Invalid month '{month}'. Use YYYY-MM.")
+        return None
+    exported = export(start, end, out_dir, workers, batch_size)
+    print(f"✅ Exported {exported} statement(s) for {month} to {out_dir}")
+    return exported
+
+def show_result(result):
+    """Print a command result as grid tables"""
+    from tabulate import tabulate
+    from lib.commands import dumps
+    plain = json.loads(dumps(result))  # Decimal -> exact string, Enum -> value, datetime -> ISO
+    if isinstance(plain, list):
+        print(tabulate(plain, headers="keys", tablefmt="grid", floatfmt=".2f") if plain else "❌ Nothing found.")
+    elif plain and all(isinstance(value, list) for value in plain.values()):
+        for title, rows in plain.items():
+            print(f"\n{title.title()}:")
+            print(tabulate(rows, headers="keys", tablefmt="grid", floatfmt=".2f") if rows else "❌ Nothing found.")
+    else:
+        print(tabulate(plain.items(), tablefmt="grid"))
+
+def print_result(result, output, out):
+    """Print a command result to out; a listing's records are printed as they are read"""
+    from lib import commands
+    if output == "table":
+        show_result(result if isinstance(result, dict) else list(result))  # tabulate needs every row
+    elif isinstance(result, dict):
+        print(commands.dumps(result), file=out)
+    elif output == "json":
+        commands.write_records(out, result)
+        print(file=out)
+    else:
+        for record in result:
+            print(commands.dumps(record), file=out)
+
+def run_command(op, params, output):
+    """
+    Run one operation from the command line in its own transaction and print
+    the result as a table, JSON or NDJSON. In the machine-readable formats
+    the models' progress messages go to stderr, so stdout is only data.
+    Returns the exit code.
+    """
+    from sqlalchemy.exc import SQLAlchemyError
+    from lib import commands
+    from lib.db.db import session_scope
+    out = sys.stdout
+    try:
+        with redirect_stdout(sys.stderr) if output != "table" else nullcontext():
+            with session_scope() as session:
+                result = commands.run(op, session, **params)
+                if not isinstance(result, dict):  # a listing reads its rows through the session
+                    print_result(result, output, out)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return commands.EXIT_USAGE if isinstance(e, commands.BadParameters) else commands.EXIT_REJECTED
+    except SQLAlchemyError as e:
+        print(f"❌ Database error: {e}", file=sys.stderr)
+        return commands.EXIT_DB_ERROR
+    except BrokenPipeError:  # the reader (e.g. head) stopped before the end of a listing
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())  # so the flush at exit doesn't fail too
+        return commands.EXIT_OK
+
+    if isinstance(result, dict):  # printed once it is committed
+        print_result(result, output, out)
+    return commands.EXIT_OK
+
+def run_batch(path):
+    """Run NDJSON operations from path (or stdin) in one transaction"""
+    from sqlalchemy.exc import SQLAlchemyError
+    from lib import commands
+    source = open(path, encoding="utf-8") if path != "-" else sys.stdin
+    out = sys.stdout  # results only; model messages are sent to stderr below
+    try:
+        with redirect_stdout(sys.stderr):
+            return commands.run_batch(source, out)
+    except SQLAlchemyError as e:
+        print(f"❌ Database error: {e}", file=sys.stderr)
+        return commands.EXIT_DB_ERROR
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+def add_command_groups(subcommands):
+    """member/contribution/loan/report subcommands, one per lib.commands operation"""
+    output = argparse.ArgumentParser(add_help=False)
+    formats = output.add_mutually_exclusive_group()
+    formats.add_argument("--json", dest="output", action="store_const", const="json", default="table",
+                         help="Print the result as one JSON document")
+    formats.add_argument("--ndjson", dest="output", action="store_const", const="ndjson",
+                         help="Print one JSON object per line")
+
+    def group(name, help):
+        actions = subcommands.add_parser(name, help=help).add_subparsers(dest="action", required=True)
+        return lambda action, help: actions.add_parser(action, help=help, parents=[output])
+
+    member = group("member", "Add, list, show, update or delete members")
+    add = member("add", "Register a member")
+    add.add_argument("name")
+    add.add_argument("phone")
+    add.add_argument("--status", default="ACTIVE")
+    member("list", "List members").add_argument("--status")
+    member("show", "Show a member with their balances").add_argument("id", type=int)
+    set_status = member("set-status", "Change a member's status")
+    set_status.add_argument("id", type=int)
+    set_status.add_argument("status")
+    member("delete", "Delete a member").add_argument("id", type=int)
+    member("cache-stats", "Member lookup cache counters for this process (most useful as a batch op)")
+
+    contribution = group("contribution", "Record or list contributions")
+    add = contribution("add", "Record a contribution (merged into today's, if any)")
+    add.add_argument("member_id", type=int)
+    add.add_argument("amount")
+    contribution("list", "List contributions").add_argument("--member-id", type=int)
+
+    loan = group("loan", "Issue, repay, list or sweep loans")
+    issue = loan("issue", "Issue a loan")
+    issue.add_argument("member_id", type=int)
+    issue.add_argument("amount")
+    issue.add_argument("plan", choices=["1_month", "6_months", "12_months"])
+    repay = loan("repay", "Repay a loan")
+    repay.add_argument("loan_id", type=int)
+    repay.add_argument("amount")
+    repay.add_argument("--date", help="When it was paid (default: now)")
+    listing = loan("list", "List loans")
+    listing.add_argument("--member-id", type=int)
+    listing.add_argument("--status")
+    loan("sweep", "Mark overdue ACTIVE loans as DEFAULTED")
+
+    report = group("report", "Group reports")
+    report("totals", "Group totals")
+    report("arrears", "Members in arrears")
+    report("status", "Members and loans by status")
+
+    batch = subcommands.add_parser("batch", help="Run NDJSON operations from stdin in one transaction")
+    batch.add_argument("file", nargs="?", default="-", help="NDJSON file (default: stdin)")
 
 # ENTRY POINT
-if __name__ == "__main__":
-    init_db()
+def dispatch(args):
+    """Run the parsed command (or the menus); returns the exit code"""
+    if args.command in ("member", "contribution", "loan", "report"):
+        params = {key: value for key, value in vars(args).items()
+                  if key not in ("command", "action", "output", "profile", "metrics_port", "metrics_file")}
+        return run_command(f"{args.command}.{args.action}", params, args.output)
+
+    if args.command == "batch":
+        return run_batch(args.file)
+
+    if args.command == "import-contributions":
+        from lib.importer import import_contributions
+        try:
+            import_contributions(args.file, args.rejects, args.batch_size)
+        except (OSError, ValueError) as e:
+            print(f"❌ {e}")
+            return 1
+        return 0
+
+    if args.command == "sweep-loans":
+        from sqlalchemy.exc import SQLAlchemyError
+        from lib.menu import sweep_loans
+        try:
+            sweep_loans()
+            while args.every:
+                time.sleep(args.every)
+                try:
+                    sweep_loans()
+                except SQLAlchemyError as e:  # e.g. database locked: keep the daemon alive for the next run
+                    print(f"❌ Sweep failed: {e}")
+        except KeyboardInterrupt:
+            print("👋 Sweeper stopped.")
+        return 0
+
+    if args.command == "export-statements":
+        try:
+            exported = export_statements(args.month, args.out, args.workers, args.batch_size)
+        except KeyboardInterrupt:
+            print("👋 Export stopped. Run the same command again to resume.")
+            return 130
+        return 0 if exported is not None else 1
+
+    if args.command == "serve-api":
+        from lib.api import serve
+        return serve(args.host, args.port)
+
+    if args.command == "statements":
+        from lib.menu import write_statements
+        return 0 if write_statements(args.month, args.out, args.batch_size) is not None else 1
+
+    from lib.menu import main_menu
     main_menu()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m lib.cli", description="Chama Tracking System")
+    parser.add_argument("--profile", action="store_true",
+                        help="After each action, print its SQL statement count and time, repeated (N+1) "
+                             "statements and slow queries to stderr")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="Serve Prometheus metrics at http://127.0.0.1:PORT/metrics while running")
+    parser.add_argument("--metrics-file", metavar="PATH",
+                        help="Write Prometheus metrics to PATH every 15 s and at exit (node_exporter textfile collector)")
+    subcommands = parser.add_subparsers(dest="command")
+
+    import_parser = subcommands.add_parser("import-contributions", help="Import contributions from a CSV statement")
+    import_parser.add_argument("file", help="CSV with phone, amount and optional date columns")
+    import_parser.add_argument("--rejects", help="Where to write rejected rows (default: <file>.rejects.csv)")
+    import_parser.add_argument("--batch-size", type=int, default=10000)
+
+    sweep_parser = subcommands.add_parser("sweep-loans", help="Mark overdue ACTIVE loans as DEFAULTED")
+    sweep_parser.add_argument("--every", type=int, metavar="SECONDS",
+                              help="Keep running, sweeping every SECONDS (daemon mode) until interrupted")
+
+    statements_parser = subcommands.add_parser("statements", help="Write every member's statement for a month")
+    statements_parser.add_argument("--month", required=True, help="Statement month as YYYY-MM")
+    statements_parser.add_argument("--out", default="statements", help="Output folder (default: statements)")
+    statements_parser.add_argument("--batch-size", type=int, default=500)
+
+    last_month = f"{date.today().replace(day=1) - timedelta(days=1):%Y-%m}"
+    export_parser = subcommands.add_parser("export-statements",
+                                           help="Export every member's month-end statement (text + CSV) in parallel")
+    export_parser.add_argument("--out", required=True, help="Output folder; its manifest makes reruns resume")
+    export_parser.add_argument("--month", default=last_month, help=f"Statement month as YYYY-MM (default: {last_month})")
+    export_parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU)")
+    export_parser.add_argument("--batch-size", type=int, default=250, help="Members per worker task")
+
+    api_parser = subcommands.add_parser("serve-api", help="Serve the HTTP API (lib/api.py) until interrupted")
+    api_parser.add_argument("--host", default="127.0.0.1")
+    api_parser.add_argument("--port", type=int, default=8000)
+
+    # Options (and -h) are lib.db.seed's own, passed through so this parser doesn't import it
+    subcommands.add_parser("seed", add_help=False,
+                           help="Replace all data with synthetic data (python -m lib.cli seed -h for options)")
+
+    add_command_groups(subcommands)
+
+    args, extra = parser.parse_known_args(argv)
+    if args.command == "seed":
+        from lib.db.seed import main as seed
+        return seed(extra)
+    if extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    from lib.db.db import SchemaError, engine, init_db
+    try:
+        init_db()
+    except SchemaError as e:
+        print(e, file=sys.stderr)
+        from lib.commands import EXIT_DB_ERROR
+        return EXIT_DB_ERROR
+
+    if args.metrics_port or args.metrics_file:
+        from lib import metrics
+        metrics.instrument(engine)
+        if args.metrics_port:
+            metrics.serve(args.metrics_port)
+        if args.metrics_file:
+            metrics.dump_every(args.metrics_file)
+
+    if not args.profile:
+        return dispatch(args)
+    from lib.db.profiler import profiler
+    profiler.attach(engine, summaries=True)
+    if args.command in (None, "batch"):  # the menus and batches report each action themselves
+        return dispatch(args)
+    with profiler.operation(" ".join(filter(None, [args.command, getattr(args, "action", None)]))):
+        return dispatch(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+# lib/commands.py
+import inspect
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from functools import lru_cache
+from typing import Optional, Union, get_args, get_origin, get_type_hints
+from sqlalchemy.exc import IntegrityError
+from lib import reports
+from lib.db.db import session_scope
+from lib.db.profiler import profiler
+from lib.importer import parse_date
+from lib.models.member import Member, MemberStatus
+from lib.models.contribution import Contribution
+from lib.models.loan import Loan, LoanStatus
+from lib.models.repayment import Repayment
+from lib.models.member_balance import MemberBalance
+
+# Non-interactive operations behind the CLI subcommands and the NDJSON batch
+# mode. Each one runs inside the caller's session and returns plain data
+# (dicts, or an iterable of dicts for listings); nothing here commits.
+# Parameters are annotated with the JSON types they accept, checked by run.
+
+EXIT_OK = 0
+EXIT_REJECTED = 1  # an operation was refused (validation, not found)
+EXIT_USAGE = 2     # bad arguments or a malformed batch line (argparse uses 2 too)
+EXIT_DB_ERROR = 3  # the database failed (locked, connection lost, ...)
+
+Amount = Union[str, int, float, Decimal]  # anything to_money parses
+
+
+class CommandError(ValueError):
+    """An operation could not be carried out; the message is shown as-is."""
+
+
+class NotFound(CommandError):
+    """The record an operation names does not exist."""
+
+
+class BadParameters(CommandError):
+    """An operation was given missing, unknown or wrongly typed parameters."""
+
+
+def as_dict(record):
+    """A read row, Row or ORM entity as a dict of its columns"""
+    if hasattr(record, "_asdict"):
+        return record._asdict()
+    model = type(record)
+    fields = model.__read_model__._fields if getattr(model, "__read_model__", None) else \
+        [column.key for column in model.__table__.columns]
+    return {field: getattr(record, field) for field in fields}
+
+
+def to_json(value):
+    """json.dumps default: money stays exact as a string, dates are ISO 8601"""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(value) -> str:
+    return json.dumps(value, default=to_json, ensure_ascii=False)
+
+
+def write_records(out, records):
+    """Write records to out as a JSON array, each one as soon as it is read"""
+    out.write("[")
+    for index, record in enumerate(records):
+        out.write((", " if index else "") + dumps(record))
+    out.write("]")
+
+
+def enum_value(enum, value):
+    try:
+        return enum(value.upper())
+    except ValueError:
+        raise CommandError(f"❌ Invalid status '{value}'. Choose from: {', '.join(e.value for e in enum)}") from None
+
+
+def get_or_fail(session, model, record_id):
+    record = session.get(model, record_id)
+    if record is None:
+        raise NotFound(f"❌ {model.__name__} {record_id} not found.")
+    return record
+
+
+# Members
+def member_add(session, name: str, phone: str, status: str = "ACTIVE"):
+    return as_dict(Member.create(name, phone, enum_value(MemberStatus, status), session))
+
+
+def member_list(session, status: Optional[str] = None):
+    if status:
+        return Member.rows(Member.status == enum_value(MemberStatus, status), session=session)
+    return Member.iter_all(session=session)
+
+
+def member_show(session, id: int):
+    member = get_or_fail(session, Member, id)
+    balance = MemberBalance.get(id, session)
+    return {**as_dict(member), **({key: value for key, value in as_dict(balance).items() if key != "member_id"}
+                                  if balance else {})}
+
+
+def member_set_status(session, id: int, status: str):
+    member = get_or_fail(session, Member, id)
+    member.set_status(enum_value(MemberStatus, status), session)
+    return as_dict(member)
+
+
+def member_cache_stats(session):
+    return Member.cache_stats()
+
+
+def member_delete(session, id: int):
+    if not Member.delete(id, session):
+        raise NotFound(f"❌ Member {id} not found.")
+    return {"id": id, "deleted": True}
+
+
+# Contributions
+def contribution_add(session, member_id: int, amount: Amount):
+    get_or_fail(session, Member, member_id)
+    return as_dict(Contribution.create(member_id, amount, session))
+
+
+def contribution_list(session, member_id: Optional[int] = None):
+    if member_id is not None:
+        return Contribution.for_member(member_id, session)
+    return Contribution.iter_all(session=session)
+
+
+# Loans
+def loan_issue(session, member_id: int, amount: Amount, plan: str):
+    return as_dict(Loan.issue_loan(member_id, amount, plan, session))
+
+
+def loan_repay(session, loan_id: int, amount: Amount, date: Optional[str] = None):
+    repayment, balance, status = Repayment.post(session, [(loan_id, amount, parse_date(date))])[0]
+    return {**as_dict(repayment), "balance": balance, "status": status}
+
+
+def loan_list(session, member_id: Optional[int] = None, status: Optional[str] = None):
+    criteria = []
+    if member_id is not None:
+        criteria.append(Loan.member_id == member_id)
+    if status:
+        criteria.append(Loan.status == enum_value(LoanStatus, status))
+    return Loan.rows(*criteria, session=session) if criteria else Loan.iter_all(session=session)
+
+
+def loan_sweep(session):
+    return {"defaulted": Loan.mark_overdue(session=session)}
+
+
+# Reports
+def report_totals(session):
+    return reports.group_totals(session)
+
+
+def report_arrears(session):
+    return reports.arrears(session)
+
+
+def report_status(session):
+    return {
+        "members": [as_dict(row) for row in reports.member_status_breakdown(session)],
+        "loans": [as_dict(row) for row in reports.loan_status_breakdown(session)],
+    }
+
+
+# "group.action" -> operation, as used by the batch "op" field
+OPERATIONS = {
+    "member.add": member_add,
+    "member.list": member_list,
+    "member.show": member_show,
+    "member.set-status": member_set_status,
+    "member.delete": member_delete,
+    "member.cache-stats": member_cache_stats,
+    "contribution.add": contribution_add,
+    "contribution.list": contribution_list,
+    "loan.issue": loan_issue,
+    "loan.repay": loan_repay,
+    "loan.list": loan_list,
+    "loan.sweep": loan_sweep,
+    "report.totals": report_totals,
+    "report.arrears": report_arrears,
+    "report.status": report_status,
+}
+
+
+@lru_cache(maxsize=None)
+def parameter_types(operation):
+    """{parameter: the types its annotation accepts} for an operation"""
+    return {name: get_args(hint) if get_origin(hint) is Union else (hint,)
+            for name, hint in get_type_hints(operation).items()}
+
+
+def check_types(op, operation, params):
+    """Raise BadParameters for a parameter whose value its annotation doesn't accept, e.g. {"date": 12}"""
+    for name, value in params.items():
+        accepted = parameter_types(operation).get(name)
+        # bool is a subclass of int, but true is not an id
+        if accepted and (not isinstance(value, accepted) or isinstance(value, bool) and bool not in accepted):
+            expected = " or ".join("null" if kind is type(None) else kind.__name__ for kind in accepted)
+            raise BadParameters(f"❌ Bad parameters for {op}: {name} must be {expected}, not {type(value).__name__}")
+
+
+def run(op, session, **params):
+    """
+    Run one operation by name. A listing comes back as an iterator of dicts
+    that reads its rows as it is consumed, so consume it inside the session.
+    """
+    if op not in OPERATIONS:
+        raise CommandError(f"❌ Unknown operation '{op}'. Choose from: {', '.join(OPERATIONS)}")
+    operation = OPERATIONS[op]
+    try:
+        inspect.signature(operation).bind(session, **params)
+    except TypeError as e:  # wrong or missing parameters for op
+        raise BadParameters(f"❌ Bad parameters for {op}: {e}") from None
+    check_types(op, operation, params)
+    try:
+        result = operation(session, **params)
+    except IntegrityError as e:  # e.g. a phone number that is already taken
+        raise CommandError(f"❌ {e.orig}") from None
+    if isinstance(result, dict):
+        return result
+    if hasattr(result, "_asdict"):
+        return result._asdict()
+    return (as_dict(record) for record in result)
+
+
+def run_batch(lines, out, session=None):
+    """
+    Run NDJSON operations ({"op": "member.add", "name": ..., ...} per line)
+    in one session and one transaction. Each result is written to out as an
+    NDJSON line {"line": n, "op": ..., "result": ...}, a listing's records
+    as they are read. The first failure is
+    written as {"line": n, "error": ...} and rolls the whole batch back:
+    EXIT_USAGE for a malformed line (not an object with an "op", or bad
+    parameters), EXIT_REJECTED for an operation that was refused. Returns
+    the exit code.
+    """
+    done = 0
+    with session_scope(session) as session:
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                params = json.loads(line)
+            except ValueError:
+                params = None
+            if not isinstance(params, dict) or not isinstance(params.get("op"), str):
+                out.write(dumps({"line": number, "error": "❌ Expected a JSON object with an \"op\" field."}) + "\n")
+                session.rollback()
+                return EXIT_USAGE
+            op = params.pop("op")
+            try:
+                with profiler.operation(f"line {number}: {op}"):
+                    result = run(op, session, **params)
+            except ValueError as e:  # includes CommandError
+                out.write(dumps({"line": number, "op": op, "error": str(e)}) + "\n")
+                session.rollback()
+                return EXIT_USAGE if isinstance(e, BadParameters) else EXIT_REJECTED
+            if isinstance(result, dict):
+                out.write(dumps({"line": number, "op": op, "result": result}) + "\n")
+            else:
+                out.write(f'{{"line": {number}, "op": {dumps(op)}, "result": ')
+                write_records(out, result)
+                out.write("}\n")
+            done += 1
+    out.write(dumps({"committed": done}) + "\n")
+    return EXIT_OK
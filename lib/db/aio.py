@@ -0,0 +1,132 @@
+# lib/db/aio.py
+import asyncio
+import weakref
+from contextlib import asynccontextmanager, nullcontext
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from lib.db.db import DATABASE_URL, DB_PROFILE, POOL_SETTINGS, TrackedSession, use_sqlite_profile
+
+# The asyncio side of lib.db.db, used by the HTTP API (lib/api.py): the same
+# DATABASE_URL, profile and pool settings, reached through an async driver.
+# Models and statements are shared with the rest of the app; only the engine
+# and the session class differ.
+
+# Async driver per backend: sqlite:///chama.db -> sqlite+aiosqlite:///chama.db
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+
+def async_url(url):
+    """url with its driver swapped for the backend's async one"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise NotImplementedError(f"No async driver for {backend}. Supported: {', '.join(ASYNC_DRIVERS)}")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def make_async_engine(url=None, profile=None, **kwargs):
+    """make_engine() for asyncio: SQLite gets the PRAGMA profile, servers the pool settings"""
+    url = async_url(url or DATABASE_URL)
+    if url.get_backend_name() != "sqlite":
+        kwargs = {**POOL_SETTINGS, **kwargs}
+    engine = create_async_engine(url, echo=False, **kwargs)
+    if engine.dialect.name == "sqlite":
+        use_sqlite_profile(engine.sync_engine, profile or DB_PROFILE)
+    return engine
+
+
+engine = make_async_engine()
+
+# TrackedSession underneath, so API sessions show up in session_stats() and the metrics
+SessionLocal = async_sessionmaker(engine, sync_session_class=TrackedSession, autoflush=False,
+                                  expire_on_commit=False)
+
+# SQLite has one writer at a time. This process's writers wait their turn here,
+# in the event loop, instead of each polling the file lock for busy_timeout;
+# it also makes a service's reads and its writes one step (no check-then-act
+# races between requests). Server databases rely on their own locking.
+# One lock per event loop: before Python 3.10 an asyncio.Lock belongs to the
+# loop that was current when it was made, not the one uvicorn runs.
+write_locks = weakref.WeakKeyDictionary()
+
+
+def write_lock():
+    """The running event loop's write lock"""
+    loop = asyncio.get_running_loop()
+    if loop not in write_locks:
+        write_locks[loop] = asyncio.Lock()
+    return write_locks[loop]
+
+
+@asynccontextmanager
+async def session_scope(session=None):
+    """lib.db.db.session_scope for an AsyncSession: commit, roll back and close the same way"""
+    if session is not None:
+        yield session
+        return
+
+    session = SessionLocal()
+    try:
+        yield session
+        await session.commit()
+    except BaseException:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+
+@asynccontextmanager
+async def write_scope():
+    """session_scope() for a unit of work that writes; on SQLite, one at a time (see write_lock)"""
+    async with write_lock() if engine.dialect.name == "sqlite" else nullcontext():
+        async with session_scope() as session:
+            yield session
+
+
+class GroupCommit:
+    """
+    Concurrent callers' writes sharing transactions. submit(item) queues the
+    item and waits: one writer at a time takes what is queued (up to
+    max_batch) and awaits write(session, items) in a write_scope(). write
+    returns one result per item, or an exception for an item it refused,
+    which goes to that caller alone; if the transaction fails, every caller
+    in the batch gets the error. Items that arrive while a batch is being
+    written go in the next one, so under load each commit carries many
+    writes and an idle server still writes each item at once.
+    """
+
+    def __init__(self, write, max_batch=500):
+        self.write = write
+        self.max_batch = max_batch
+        self.queue = []      # (item, future) waiting for a batch
+        self.writer = None   # the task draining the queue, while there is one
+
+    async def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        self.queue.append((item, future))
+        if self.writer is None:
+            self.writer = asyncio.create_task(self.drain())
+        return await future
+
+    async def drain(self):
+        try:
+            while self.queue:
+                batch, self.queue = self.queue[:self.max_batch], self.queue[self.max_batch:]
+                try:
+                    async with write_scope() as session:
+                        results = await self.write(session, [item for item, _ in batch])
+                except Exception as error:
+                    results = [error] * len(batch)
+                for (_, future), result in zip(batch, results):
+                    if future.done():  # the caller gave up (e.g. the client went away)
+                        continue
+                    if isinstance(result, BaseException):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+        finally:
+            self.writer = None
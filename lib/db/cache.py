@@ -0,0 +1,69 @@
+# lib/db/cache.py
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+
+class LRUCache:
+    """
+    A size-bounded, least-recently-used cache whose entries also expire
+    ttl seconds after they were stored. maxsize=0 disables it. Not shared
+    between processes: entries written elsewhere are only seen after they
+    expire, so ttl bounds how stale a lookup can be.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()  # key -> (expires at, value), least recently used first
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    def get(self, key):
+        """The cached value for key, or MISSING"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+        expires, value = entry
+        if expires <= self.clock():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = (self.clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, *keys):
+        for key in keys:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        """Counters for sizing: hits, misses, hit_rate, evictions, expirations, ..."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,34 @@
+# lib/db/ledger.py
+import sys
+from lib.db.db import init_db
+from lib.models.member_balance import MemberBalance
+
+
+def rebuild():
+    """Recompute every member's running balances from the raw tables"""
+    count = MemberBalance.rebuild()
+    print(f"✅ Ledger rebuilt for {count} members.")
+
+
+def verify():
+    """Compare the ledger with the raw tables; exit non-zero on drift"""
+    mismatches = MemberBalance.verify()
+    if not mismatches:
+        print("✅ Ledger matches contributions, loans and repayments.")
+        return True
+    print(f"❌ {len(mismatches)} ledger mismatches found:")
+    for member_id, column, stored, expected in mismatches:
+        print(f"   Member {member_id}: {column} stored={stored} expected={expected}")
+    return False
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "verify"
+    if command not in ("rebuild", "verify"):
+        print("Usage: python -m lib.db.ledger [rebuild|verify]")
+        sys.exit(2)
+    init_db()
+    if command == "rebuild":
+        rebuild()
+    elif not verify():
+        sys.exit(1)
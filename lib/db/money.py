@@ -0,0 +1,54 @@
+# lib/db/money.py
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from sqlalchemy import BigInteger
+from sqlalchemy.types import TypeDecorator
+
+CENT = Decimal("0.01")
+
+# Money columns are BIGINT cents
+MAX_CENTS = 2**63 - 1
+
+
+def to_money(value) -> Decimal:
+    """Parse an amount (str, int, float or Decimal) into a Decimal rounded to the cent"""
+    try:
+        money = value if isinstance(value, Decimal) else Decimal(str(value).strip())
+        if not money.is_finite():
+            raise InvalidOperation
+        # quantize raises InvalidOperation too, past the context's 28 digits
+        money = money.quantize(CENT, rounding=ROUND_HALF_UP)
+    except InvalidOperation:
+        raise ValueError(f"❌ Invalid amount '{value}'.") from None
+    if abs(money.scaleb(2)) > MAX_CENTS:
+        raise ValueError(f"❌ Amount '{value}' is too large.")
+    return money
+
+
+def to_cents(value) -> int:
+    """Amount -> whole cents"""
+    return int(to_money(value).scaleb(2))
+
+
+def from_cents(cents) -> Decimal:
+    """Whole cents -> Decimal amount with two places"""
+    return Decimal(cents).scaleb(-2).quantize(CENT)
+
+
+class Money(TypeDecorator):
+    """
+    Amount stored as an integer number of cents. Python sees a two-place
+    Decimal; the database only ever adds and compares integers, so sums are
+    exact and need no rounding.
+    """
+    impl = BigInteger
+    cache_ok = True
+
+    @property
+    def python_type(self):
+        return Decimal
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else to_cents(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else from_cents(value)
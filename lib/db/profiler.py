@@ -0,0 +1,136 @@
+# lib/db/profiler.py
+import logging
+import os
+import re
+import sys
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Statements at least this slow are logged as warnings while the profiler is
+# attached (always, when CHAMA_SLOW_QUERY_MS is set; see lib/db/db.py)
+SLOW_QUERY_MS = float(os.environ.get("CHAMA_SLOW_QUERY_MS") or 100)
+# The same statement shape this many times in one action is reported as N+1
+REPEAT_THRESHOLD = 5
+
+WHITESPACE = re.compile(r"\s+")
+PARAM = r"(?:\?|%s|%\(\w+\)s|:\w+)"
+VALUE_LIST = re.compile(rf"\(\s*{PARAM}(?:\s*,\s*{PARAM})+\s*\)")  # IN (?, ?, ?) and multi-row VALUES
+
+
+@lru_cache(maxsize=1024)  # an app issues a few hundred distinct statement strings at most
+def statement_shape(statement: str) -> str:
+    """The statement with whitespace collapsed and parameter lists of any length made alike"""
+    return VALUE_LIST.sub("(...)", WHITESPACE.sub(" ", statement).strip())
+
+
+def shorten(text: str, width: int = 110) -> str:
+    return text if len(text) <= width else text[:width - 1] + "…"
+
+
+class Operation:
+    """The statements one action (a menu choice, a CLI command, a batch line) issued"""
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.perf_counter()
+        self.seconds = None  # wall time, set when the action finishes
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.shapes = {}  # statement shape -> [times executed, seconds]
+        self.slow = []    # (seconds, statement) over the slow threshold
+
+    def record(self, statement, seconds, slow):
+        self.statements += 1
+        self.db_seconds += seconds
+        shape = self.shapes.setdefault(statement_shape(statement), [0, 0.0])
+        shape[0] += 1
+        shape[1] += seconds
+        if slow:
+            self.slow.append((seconds, statement))
+
+    def repeated(self, threshold=REPEAT_THRESHOLD):
+        """(shape, count, seconds) for shapes run at least threshold times, most frequent first"""
+        return sorted(((shape, count, seconds) for shape, (count, seconds) in self.shapes.items()
+                       if count >= threshold), key=lambda item: -item[1])
+
+    def summary(self, threshold=REPEAT_THRESHOLD):
+        lines = [f"📊 {self.name}: {self.statements} statement(s), {self.db_seconds * 1000:.1f} ms in the database, "
+                 f"{(self.seconds or 0) * 1000:.1f} ms in all"]
+        for shape, count, seconds in self.repeated(threshold):
+            lines.append(f"   ⚠️ N+1? {count}x ({seconds * 1000:.1f} ms): {shorten(shape)}")
+        for seconds, statement in sorted(self.slow, reverse=True)[:5]:
+            lines.append(f"   🐢 {seconds * 1000:.1f} ms: {shorten(statement_shape(statement))}")
+        return "\n".join(lines)
+
+
+class QueryProfiler:
+    """
+    Cursor-level listeners on an engine: every statement is timed, slow ones
+    are logged, and statements run between start() and finish() are counted
+    against that action. With summaries on, finish() prints the action's
+    summary to stderr. Until attach() is called everything here is a no-op.
+    """
+
+    def __init__(self, slow_ms=SLOW_QUERY_MS, repeat_threshold=REPEAT_THRESHOLD):
+        self.slow_ms = slow_ms
+        self.repeat_threshold = repeat_threshold
+        self.summaries = False
+        self.engine = None
+        self.current = None
+
+    def attach(self, engine, summaries=False):
+        if self.engine is not engine:
+            self.detach()
+            event.listen(engine, "before_cursor_execute", self._before)
+            event.listen(engine, "after_cursor_execute", self._after)
+            self.engine = engine
+        self.summaries = self.summaries or summaries
+
+    def detach(self):
+        if self.engine is not None:
+            event.remove(self.engine, "before_cursor_execute", self._before)
+            event.remove(self.engine, "after_cursor_execute", self._after)
+            self.engine = None
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["query_started"].pop()
+        slow = seconds * 1000 >= self.slow_ms
+        if slow:
+            logger.warning("Slow query (%.1f ms): %s", seconds * 1000, shorten(statement_shape(statement), 500))
+        if self.current is not None:
+            self.current.record(statement, seconds, slow)
+
+    def start(self, name):
+        """Begin counting statements for the action name (finishing any action still open)"""
+        self.finish()
+        if self.engine is not None:
+            self.current = Operation(name)
+
+    def finish(self):
+        """End the current action and return its Operation (None if there was none)"""
+        operation, self.current = self.current, None
+        if operation is None:
+            return None
+        operation.seconds = time.perf_counter() - operation.started
+        if self.summaries and operation.statements:
+            print(operation.summary(self.repeat_threshold), file=sys.stderr)
+        return operation
+
+    @contextmanager
+    def operation(self, name):
+        """with profiler.operation("Group totals") as op: ... (op is None unless attached)"""
+        self.start(name)
+        try:
+            yield self.current
+        finally:
+            self.finish()
+
+
+profiler = QueryProfiler()
@@ -1,177 +1,218 @@
 # lib/db/seed.py
-from faker import Faker
+import argparse
 import random
-from datetime import timedelta, datetime
-from lib.db.db import init_db, SessionLocal
+import time
+from datetime import date, datetime, time as day_time, timedelta
+from faker import Faker
+from sqlalchemy import BigInteger, bindparam, column, delete, func, select, table, update
+from lib.db.db import init_db, session_scope
+from lib.db.money import Money
 from lib.models.member import Member, MemberStatus
 from lib.models.contribution import Contribution
 from lib.models.loan import Loan, LoanStatus
 from lib.models.repayment import Repayment
-from lib.helper import normalize_phone
-
-fake = Faker("en_US")
-
-
-def seed_members(n=30):
-    """Seed members into the database"""
-    session = SessionLocal()
-    session.query(Member).delete()
-    session.commit()
-
-    print(f"Seeding {n} members...")
-    members = []
-
-    for _ in range(n):
-        name = fake.first_name() + " " + fake.last_name()
-        phone = "07" + str(random.randint(10000000, 99999999))
-        phone = normalize_phone(phone)
-        status = random.choice(list(MemberStatus))
-
-        # Random join date within the past 2 years
-        join_date = fake.date_time_between(start_date="-2y", end_date="now")
-
-        member = Member(
-            name=name,
-            phone=phone,
-            status=status,
-            join_date=join_date
-        )
-        session.add(member)
-        session.flush()  # ensure member.id is generated
-        members.append(member)
-
-    session.commit()
-    print("✅ Members seeded!")
-    return members
-
-
-def seed_contributions(members, n=50):
-    """Seed contributions for random members"""
-    session = SessionLocal()
-    session.query(Contribution).delete()
-    session.commit()
-
-    print(f"Seeding {n} contributions...")
-    for _ in range(n):
-        member = random.choice(members)
-        amount = round(random.uniform(100, 5000), 2)
-
-        # Contribution date must be AFTER member joined
-        date = fake.date_time_between(
-            start_date=member.join_date,
-            end_date="now"
-        )
-
-        contribution = Contribution(member_id=member.id, amount=amount, date=date)
-        session.add(contribution)
-
-    session.commit()
-    print("✅ Contributions seeded!")
-
-
-def seed_loans(members, n=15):
-    """Seed loans respecting one-loan-per-member and contribution limits"""
-    session = SessionLocal()
-    session.query(Loan).delete()
-    session.commit()
-
-    print(f"Seeding up to {n} loans...")
-    loans = []
-
-    total_chama_contributions = sum(Contribution.total_for_member(m.id) for m in members)
-
-    attempts = 0
-    while len(loans) < n and attempts < n * 5:
-        attempts += 1
-        member = random.choice(members)
-        member_contrib = Contribution.total_for_member(member.id)
-
-        if member_contrib <= 0:
-            continue  # skip members without contributions
-
-        # Skip members who already have an active/defaulted loan
-        existing_loans = [
-            l for l in Loan.for_member(member.id)
-            if l.status in [LoanStatus.ACTIVE, LoanStatus.DEFAULTED]
-        ]
-        if existing_loans:
-            continue
-
-        # Max loan amount
-        max_member_loan = 3 * member_contrib
-        current_total_loans = sum(
-            l.balance for m2 in members for l in Loan.for_member(m2.id)
-            if l.status in [LoanStatus.ACTIVE, LoanStatus.DEFAULTED]
-        )
-        max_allowed = min(
-            max_member_loan,
-            0.5 * total_chama_contributions - current_total_loans
-        )
-        if max_allowed <= 0:
-            continue
-
-        amount = round(random.uniform(100, max_allowed), 2)
-        issued_date = fake.date_time_between(
-            start_date=member.join_date,
-            end_date="now"
-        )
-        plan_choice = random.choice([30, 180, 365])
-        due_date = issued_date + timedelta(days=plan_choice)
-        interest_rate = {30: 2.0, 180: 4.0, 365: 7.0}[plan_choice]
-        term_years = (due_date - issued_date).days / 365
-        total_balance = round(amount + (amount * interest_rate * term_years / 100), 2)
-
-        loan = Loan(
-            member_id=member.id,
-            amount=amount,
-            issued_date=issued_date,
-            due_date=due_date,
-            interest_rate=interest_rate,
-            balance=total_balance,
-            status=LoanStatus.ACTIVE
-        )
-        session.add(loan)
-        session.flush()
-        loans.append(loan)
-
-    session.commit()
-    print(f"✅ Loans seeded! Total loans created: {len(loans)}")
-    return loans
-
-
-def seed_repayments(loans, n=15):
-    """Seed repayments against existing loans using apply_repayment"""
-    session = SessionLocal()
-    session.query(Repayment).delete()
-    session.commit()
-
-    print(f"Seeding {n} repayments...")
-    for _ in range(n):
-        loan = random.choice(loans)
-        if loan.balance <= 0:
-            continue  # skip fully repaid loans
-
-        amount = round(random.uniform(100, float(loan.balance)), 2)
-        date = fake.date_time_between(
-            start_date=loan.issued_date,
-            end_date="now"
-        )
-
-        repayment = Repayment(loan_id=loan.id, amount=amount, date=date)
-        session.add(repayment)
-
-        # Apply repayment via the method
-        loan.apply_repayment(amount)
-        session.add(loan)
-
-    session.commit()
-    print("✅ Repayments seeded!")
+from lib.models.member_balance import MemberBalance
+from lib.models.statement_checkpoint import StatementCheckpoint
+
+# Deterministic synthetic data: the same seed and as_of always produce the
+# same database. Rows are generated as plain dicts and written with Core
+# executemany in chunks; everything the business rules need (contribution
+# totals, who has an open loan, the lending pool) is tracked in memory, so
+# nothing is read back while seeding.
+
+CHUNK_SIZE = 50_000
+HISTORY_DAYS = 730  # members joined within the last two years
+PLANS = [(30, 2), (180, 4), (365, 7)]  # (days, interest %) as in Loan.issue_loan
+MIN_AMOUNT = 10_000  # cents
+NAME_POOL = 1_000  # Faker's weighted picks are slow, so names come from a pool drawn once
+
+
+def cents_table(model):
+    """Core table of model's columns, with Money columns taking whole cents"""
+    return table(model.__tablename__, *(
+        column(c.key, BigInteger() if isinstance(c.type, Money) else c.type) for c in model.__table__.columns
+    ))
+
+
+def between(rng, start: datetime, end: datetime) -> datetime:
+    """A random moment in [start, end], to the second"""
+    return start + timedelta(seconds=rng.randint(0, max(0, int((end - start).total_seconds()))))
+
+
+def write_chunks(session, model, rows, label, chunk_size=CHUNK_SIZE):
+    """executemany rows (dicts) into model's table chunk by chunk; returns the count"""
+    target = cents_table(model)
+    written = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            session.execute(target.insert(), chunk)
+            written += len(chunk)
+            chunk = []
+            print(f"   ...{written:,} {label}")
+    if chunk:
+        session.execute(target.insert(), chunk)
+        written += len(chunk)
+    return written
+
+
+def split_counts(rng, total, weights):
+    """Share total out in proportion to weights, with the remainder spread at random"""
+    scale = total / sum(weights)
+    counts = [int(w * scale) for w in weights]
+    for i in rng.sample(range(len(counts)), min(len(counts), total - sum(counts))):
+        counts[i] += 1
+    return counts
+
+
+class Seeder:
+    def __init__(self, seed=42, as_of=None):
+        self.rng = random.Random(seed)
+        self.fake = Faker("en_US")
+        self.fake.seed_instance(seed)
+        self.as_of = as_of or datetime.combine(date.today(), day_time())
+        self.joined = []        # join datetime per member (index = id - 1)
+        self.contributed = []   # total contributed cents per member
+        self.loans = []         # [member_id, issued_date, balance at issue, balance now] (index = id - 1)
+
+    def members(self, n):
+        """Member rows with unique phones and join dates over the last HISTORY_DAYS"""
+        rng, fake = self.rng, self.fake
+        first_names = [fake.first_name() for _ in range(NAME_POOL)]
+        last_names = [fake.last_name() for _ in range(NAME_POOL)]
+        phones = rng.sample(range(100_000_000), n)
+        statuses = list(MemberStatus)
+        for member_id in range(1, n + 1):
+            joined = self.as_of - timedelta(seconds=rng.randint(0, HISTORY_DAYS * 86400))
+            self.joined.append(joined)
+            self.contributed.append(0)
+            yield {"id": member_id, "name": f"{rng.choice(first_names)} {rng.choice(last_names)}",
+                   "phone": f"+2547{phones[member_id - 1]:08d}", "join_date": joined,
+                   "status": rng.choices(statuses, weights=[8, 1, 1])[0]}
+
+    def contributions(self, n):
+        """
+        About n contribution rows, at most one per member per day (the unique
+        index) and never before the member joined. Some members are far more
+        active than others; a member cannot have more days than they have been
+        a member, so the total can come out slightly under n.
+        """
+        rng = self.rng
+        weights = [rng.expovariate(1.0) for _ in self.joined]
+        for index, count in enumerate(split_counts(rng, n, weights)):
+            joined = self.joined[index]
+            days = (self.as_of.date() - joined.date()).days + 1
+            for offset in sorted(rng.sample(range(days), min(count, days))):
+                day = datetime.combine(joined.date() + timedelta(days=offset), day_time())
+                when = between(rng, max(day, joined), min(day + timedelta(seconds=86399), self.as_of))
+                amount = rng.randint(MIN_AMOUNT, 500_000)
+                self.contributed[index] += amount
+                yield {"member_id": index + 1, "amount": amount, "date": when, "contribution_day": when.date()}
+
+    def issue_loans(self, n):
+        """
+        Up to n loan rows following Loan.issue_loan's rules: two months of
+        membership, one loan per member, at most 3x the member's contributions,
+        and (as the old seeder did) outstanding loans within half the pool.
+        """
+        rng = self.rng
+        room = sum(self.contributed) // 2
+        eligible = [index for index, joined in enumerate(self.joined)
+                    if self.contributed[index] > 0 and joined <= self.as_of - timedelta(days=60)]
+        rng.shuffle(eligible)
+        for index in eligible[:n]:
+            limit = min(3 * self.contributed[index], room)
+            if limit < MIN_AMOUNT:
+                continue
+            amount = rng.randint(MIN_AMOUNT, limit)
+            days, rate = rng.choice(PLANS)
+            issued = between(rng, self.joined[index] + timedelta(days=60), self.as_of)
+            balance = amount + (amount * rate + 50) // 100  # flat interest, rounded half up to the cent
+            room -= balance
+            self.loans.append([index + 1, issued, balance, balance])
+            yield {"id": len(self.loans), "member_id": index + 1, "amount": amount, "issued_date": issued,
+                   "due_date": issued + timedelta(days=days), "interest_rate": float(rate),
+                   "status": LoanStatus.ACTIVE, "balance": balance}
+
+    def repayments(self, n):
+        """Up to n repayment rows against loans that still owe something; balances are tracked here"""
+        rng = self.rng
+        open_loans = list(range(len(self.loans)))
+        for _ in range(n):
+            if not open_loans:
+                return
+            pick = rng.randrange(len(open_loans))
+            loan_index = open_loans[pick]
+            loan = self.loans[loan_index]
+            amount = rng.randint(min(MIN_AMOUNT, loan[3]), loan[3])
+            loan[3] -= amount
+            if loan[3] == 0:  # paid off: swap-remove from the open loans
+                open_loans[pick] = open_loans[-1]
+                open_loans.pop()
+            yield {"loan_id": loan_index + 1, "amount": amount, "date": between(rng, loan[1], self.as_of)}
+
+
+def seed(members=30, contributions=50, loans=15, repayments=15, seed=42, as_of=None, chunk_size=CHUNK_SIZE):
+    """
+    Replace all data with a synthetic chama: members, contributions, loans
+    and repayments, then the ledger, in one transaction. Returns the row
+    counts written.
+    """
+    init_db()
+    seeder = Seeder(seed, as_of)
+    with session_scope() as session:
+        for model in (Repayment, Loan, Contribution, StatementCheckpoint, MemberBalance, Member):
+            session.execute(delete(model))
+
+        counts = {
+            "members": write_chunks(session, Member, seeder.members(members), "members", chunk_size),
+            "contributions": write_chunks(session, Contribution, seeder.contributions(contributions),
+                                          "contributions", chunk_size),
+            "loans": write_chunks(session, Loan, seeder.issue_loans(loans), "loans", chunk_size),
+            "repayments": write_chunks(session, Repayment, seeder.repayments(repayments), "repayments", chunk_size),
+        }
+
+        # Loans were written at their issue balance; store what the repayments left
+        loans_table = cents_table(Loan)
+        repaid = [{"loan_id": index + 1, "balance": now, "status": LoanStatus.PAID if now == 0 else LoanStatus.ACTIVE}
+                  for index, (_, _, issued, now) in enumerate(seeder.loans) if now != issued]
+        if repaid:
+            session.execute(
+                update(loans_table).where(loans_table.c.id == bindparam("loan_id"))
+                .values(balance=bindparam("balance"), status=bindparam("status")),
+                repaid,
+            )
+
+        # Ids were given explicitly, so move PostgreSQL's sequences past them
+        if session.get_bind().dialect.name == "postgresql":
+            for model in (Member, Contribution, Loan, Repayment):
+                session.execute(select(func.setval(func.pg_get_serial_sequence(model.__tablename__, "id"),
+                                                   func.coalesce(func.max(model.id), 0) + 1, False)))
+
+        MemberBalance.rebuild(session)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m lib.db.seed", description="Replace all data with synthetic data")
+    parser.add_argument("--members", type=int, default=30)
+    parser.add_argument("--contributions", type=int, default=50)
+    parser.add_argument("--loans", type=int, default=15)
+    parser.add_argument("--repayments", type=int, default=15)
+    parser.add_argument("--seed", type=int, default=42, help="same seed (and --as-of) -> same data")
+    parser.add_argument("--as-of", type=date.fromisoformat, help="the 'today' of the data, YYYY-MM-DD (default: today)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    counts = seed(args.members, args.contributions, args.loans, args.repayments, args.seed,
+                  datetime.combine(args.as_of, day_time()) if args.as_of else None, args.chunk_size)
+    elapsed = time.perf_counter() - started
+    print(f"🎉 Database seeding complete in {elapsed:.1f}s: "
+          + ", ".join(f"{count:,} {name}" for name, count in counts.items()))
+    return 0
 
 
 if __name__ == "__main__":
-    init_db()
-    members = seed_members(30)
-    seed_contributions(members, 50)
-    loans = seed_loans(members, 15)
-    seed_repayments(loans, 15)
-    print("🎉 Database seeding complete!")
+    main()
@@ -0,0 +1,102 @@
+# lib/exporter.py
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+from lib.db import db
+from lib.db.db import make_engine, session_scope
+from lib.models.member import Member
+from lib.models.statement_checkpoint import StatementCheckpoint
+from lib.statements import build_statements, closing_checkpoints, render_csv, render_text, statement_path
+
+# Set in each worker process by init_worker
+WorkerSession = None
+
+
+def init_worker(url):
+    """Give the worker process its own read-only engine"""
+    global WorkerSession
+    db.engine.dispose(close=False)  # connections inherited from the parent belong to the parent
+    WorkerSession = sessionmaker(bind=make_engine(url, read_only=True))
+
+
+def write_file(path, text):
+    """Write text to path via a temp file, so a crash never leaves half a statement"""
+    partial = path + ".part"
+    with open(partial, "w", newline="", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(partial, path)
+
+
+def export_batch(member_ids, start, end, out_dir):
+    """
+    Worker task: write the text and CSV statements of member_ids. Returns
+    (member_ids, checkpoint dicts) so the parent can record them.
+    """
+    with WorkerSession() as session:
+        members = Member.rows(Member.id.in_(member_ids), session=session)
+        statements = build_statements(session, members, start, end, save_checkpoints=False)
+    for statement in statements:
+        write_file(statement_path(out_dir, statement.member.id, start, end), render_text(statement))
+        write_file(statement_path(out_dir, statement.member.id, start, end, "csv"), render_csv(statement))
+    return member_ids, closing_checkpoints(statements)
+
+
+def manifest_path(out_dir, start, end):
+    return os.path.join(out_dir, f"manifest_{start:%Y%m%d}-{end:%Y%m%d}.txt")
+
+
+def read_manifest(path):
+    """Member ids already exported, one per line"""
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {int(line) for line in f if line.strip().isdigit()}
+
+
+def export_statements(start, end, out_dir, workers=None, batch_size=250):
+    """
+    Export every member's statement for start..end as text and CSV, with the
+    members split into batches of batch_size over a pool of worker processes.
+    Finished members are appended to a manifest in out_dir, so running the
+    same export again only does the members that are not in it yet. Workers
+    only read; the parent stores the closing checkpoints of each batch.
+    Returns the number of members exported by this run.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = manifest_path(out_dir, start, end)
+    done = read_manifest(manifest)
+    with session_scope() as session:
+        pending = [member_id for member_id in session.scalars(select(Member.id).order_by(Member.id))
+                   if member_id not in done]
+    if done:
+        print(f"   ...resuming: {len(done)} member(s) already exported, {len(pending)} to go")
+    if not pending:
+        return 0
+
+    batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+    exported = 0
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(db.DATABASE_URL,)) as pool, \
+            open(manifest, "a", encoding="utf-8") as log:
+        futures = [pool.submit(export_batch, batch, start, end, out_dir) for batch in batches]
+        try:
+            for future in as_completed(futures):
+                member_ids, checkpoints = future.result()
+                with session_scope() as session:
+                    StatementCheckpoint.save_many(session, checkpoints)
+                log.write("".join(f"{member_id}\n" for member_id in member_ids))
+                log.flush()
+                os.fsync(log.fileno())
+                exported += len(member_ids)
+                rate = exported / (time.perf_counter() - started)
+                print(f"   ...{exported}/{len(pending)} members ({rate:,.0f}/s)")
+        except BaseException:
+            # What is done is in the manifest; rerun to finish. (Cancelled by
+            # hand: shutdown(cancel_futures=True) needs Python 3.9.)
+            for pending_future in futures:
+                pending_future.cancel()
+            pool.shutdown(wait=True)
+            raise
+    return exported
@@ -1,5 +1,9 @@
 import re
 from datetime import datetime
+from functools import lru_cache
+from operator import itemgetter
+
+PAGE_SIZE = 20
 
 
 def prompt_int(prompt: str, default=None) -> int:
@@ -42,9 +46,16 @@ def prompt_choice(prompt: str, choices: list, case_sensitive=False):
         print(f"❌ Invalid choice. Options: {choices_display}")
 
 
-def normalize_phone(phone: str) -> str:
-    """Convert Kenyan phone to +2547… format"""
-    phone = re.sub(r"\D", "", phone)  # remove non-digits
+NON_DIGITS = re.compile(r"\D")
+KENYAN_MOBILE = re.compile(r"\+2547\d{8}")
+INVALID_PHONE = "Invalid Kenyan phone number format"
+
+
+@lru_cache(maxsize=65536)
+def _normalize_phone(phone: str):
+    """(normalized, None) or (None, error) for one raw phone string; memoized,
+    as exports repeat the same few thousand numbers many times"""
+    phone = NON_DIGITS.sub("", phone)  # remove non-digits
 
     if phone.startswith("254"):
         phone = "+" + phone
@@ -55,13 +66,35 @@ def normalize_phone(phone: str) -> str:
     elif phone.startswith("1") and len(phone) == 10:  # Safaricom, Airtel codes
         phone = "+254" + phone
     else:
-        raise ValueError("Invalid Kenyan phone number format")
+        return None, INVALID_PHONE
+
+    if not KENYAN_MOBILE.fullmatch(phone):
+        return None, INVALID_PHONE
+    return phone, None
 
-    if not re.match(r"^\+2547\d{8}$", phone):
-        raise ValueError("Invalid Kenyan phone number format")
+
+def normalize_phone(phone: str) -> str:
+    """Convert Kenyan phone to +2547… format"""
+    phone, error = _normalize_phone(phone)
+    if error:
+        raise ValueError(error)
     return phone
 
 
+def normalize_phones(phones):
+    """
+    Normalize a whole column of phones. Returns (normalized, errors): one
+    +2547… string per input row (None where the row is invalid) and a
+    {row index: error message} dict for the invalid rows.
+    """
+    results = list(map(_normalize_phone, phones))
+    normalized = list(map(itemgetter(0), results))
+    errors = {}
+    if None in normalized:  # the usual all-valid column never loops in Python
+        errors = {row: results[row][1] for row, phone in enumerate(normalized) if phone is None}
+    return normalized, errors
+
+
 def confirm_delete(name: str) -> bool:
     """Confirm delete with Y/N"""
     choice = input(f"⚠️ Are you sure you want to delete {name}? (y/n): ").strip().lower()
@@ -77,6 +110,42 @@ def prompt_date(prompt: str, fmt="%Y-%m-%d") -> datetime:
         except ValueError:
             print(f"❌ Invalid date format. Please use {fmt}.")
 
+def page_table(fetch_page, to_row, headers, page_size=PAGE_SIZE, empty="❌ No records found."):
+    """
+    Show a table one page at a time with next/prev/jump. fetch_page(after_id, limit)
+    returns rows with id > after_id in id order, so only the page on screen is
+    ever loaded or laid out, however big the table is.
+    """
+    from tabulate import tabulate  # only the interactive screens need it; keeps model imports light
+
+    starts = [0]  # after_id of each page visited, for prev
+    while True:
+        rows = fetch_page(starts[-1], page_size + 1)  # one extra row tells us there is a next page
+        if not rows:
+            if len(starts) == 1:
+                print(empty)
+                return
+            print("❌ No records from that ID on.")
+            starts.pop()
+            continue
+
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        print(tabulate([to_row(row) for row in rows], headers=headers, tablefmt="grid"))
+        print(f"IDs {rows[0].id}–{rows[-1].id}{' (more after)' if has_next else ' (end)'}")
+
+        choices = (["n"] if has_next else []) + (["p"] if len(starts) > 1 else []) + ["j", "q"]
+        choice = prompt_choice("[n]ext, [p]rev, [j]ump to ID, [q]uit", choices)
+        if choice == "n":
+            starts.append(rows[-1].id)
+        elif choice == "p":
+            starts.pop()
+        elif choice == "j":
+            starts.append(max(prompt_int("Jump to ID: ") - 1, 0))
+        else:
+            return
+
+
 def print_header(title: str):
     print("\n" + "=" * 40)
     print(title)
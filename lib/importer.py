@@ -0,0 +1,93 @@
+# lib/importer.py
+import csv
+import os
+from datetime import datetime
+from itertools import islice
+from sqlalchemy import select
+from lib.db.db import SessionLocal
+from lib.db.money import to_money
+from lib.helper import normalize_phones
+from lib.models.member import Member
+from lib.models.contribution import Contribution
+
+DATE_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d", "%d/%m/%Y %H:%M:%S", "%d/%m/%Y")
+
+
+def parse_date(value: str):
+    """Parse a statement date, or return None when the column is blank"""
+    value = (value or "").strip()
+    if not value:
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date '{value}'")
+
+
+def import_contributions(path: str, rejects_path: str = None, batch_size: int = 10000):
+    """
+    Stream a CSV of contributions (columns: phone, amount and optional date)
+    into the database. Each batch resolves its phones with one lookup, then
+    goes through Contribution.bulk_create in its own transaction. Rows that
+    cannot be imported are written to the rejects file with an error column.
+    Returns (imported rows, rejected rows).
+    """
+    rejects_path = rejects_path or os.path.splitext(path)[0] + ".rejects.csv"
+    member_ids = {}  # normalized phone -> member id, shared across batches
+    imported = rejected = 0
+
+    with open(path, newline="", encoding="utf-8-sig") as source, \
+            open(rejects_path, "w", newline="", encoding="utf-8") as rejects_file, \
+            SessionLocal() as session:
+        reader = csv.DictReader(source)
+        missing = {"phone", "amount"} - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError(f"❌ Missing column(s): {', '.join(sorted(missing))}")
+        rejects = csv.DictWriter(rejects_file, fieldnames=reader.fieldnames + ["error"], extrasaction="ignore")
+        rejects.writeheader()
+
+        while True:
+            batch = list(islice(reader, batch_size))
+            if not batch:
+                break
+
+            phones, bad_phones = normalize_phones([record["phone"] or "" for record in batch])
+            parsed = []
+            for row, (record, phone) in enumerate(zip(batch, phones)):
+                try:
+                    if row in bad_phones:
+                        raise ValueError(bad_phones[row])
+                    amount = to_money(record["amount"])
+                    if amount <= 0:
+                        raise ValueError("Contribution must be greater than 0")
+                    parsed.append((record, phone, amount, parse_date(record.get("date"))))
+                except ValueError as e:
+                    rejects.writerow({**record, "error": str(e).lstrip("❌ ")})
+                    rejected += 1
+
+            unknown = {phone for _, phone, _, _ in parsed} - member_ids.keys()
+            if unknown:
+                found = dict(session.execute(
+                    select(Member.phone, Member.id).where(Member.phone.in_(unknown))
+                ).all())
+                member_ids.update({phone: found.get(phone) for phone in unknown})
+
+            rows = []
+            for record, phone, amount, date in parsed:
+                member_id = member_ids.get(phone)
+                if member_id is None:
+                    rejects.writerow({**record, "error": f"No member with phone {phone}"})
+                    rejected += 1
+                    continue
+                rows.append((member_id, amount, date))
+
+            Contribution.bulk_create(rows, session)
+            session.commit()
+            imported += len(rows)
+            print(f"   ...{imported} imported, {rejected} rejected")
+
+    print(f"✅ Imported {imported} contributions. "
+          f"{rejected} rejected{f' (see {rejects_path})' if rejected else ''}.")
+    return imported, rejected
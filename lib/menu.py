@@ -0,0 +1,378 @@
+# lib/menu.py
+from lib.models.member import Member, MemberStatus
+from lib.models.contribution import Contribution
+from lib.models.loan import Loan, LoanStatus
+from lib.models.repayment import Repayment
+from lib import reports
+from lib.helper import prompt_int, prompt_choice, prompt_float, confirm_delete, print_header, page_table
+from lib.db.db import session_scope
+from lib.db.profiler import profiler
+from tabulate import tabulate
+from datetime import datetime
+# MAIN MENU 
+def main_menu():
+    while True:
+        print_header("💰 CHAMA TRACKING SYSTEM 💸")
+        print("1. Members")
+        print("2. Contributions")
+        print("3. Loans")
+        print("4. Reports")
+        print("0. Exit")
+
+        choice = prompt_choice("Choose: ", ["1", "2", "3", "4", "0"])
+
+        if choice == "1":
+            members_menu()
+        elif choice == "2":
+            contributions_menu()
+        elif choice == "3":
+            loans_menu()
+        elif choice == "4":
+            reports_menu()
+        elif choice == "0":
+            print("👋 Thanks for Visiting My Chama!")
+            break
+
+
+# MEMBERS MENU
+def members_menu():
+    while True:
+        profiler.finish()  # --profile: the summary of the action that just ran
+        print_header("===🧑🏽‍🤝‍🧑🏾 MEMBERS MENU ===")
+        print("1. Create Member")
+        print("2. Delete Member")
+        print("3. List All Members")
+        print("4. Find by ID")
+        print("5. Find by Phone")
+        print("6. Set Status")
+        print("7. Lookup Cache Stats")
+        print("0. Back to Main")
+
+        choice = prompt_choice("Choose: ", ["1", "2", "3", "4", "5", "6", "7", "0"])
+        profiler.start(f"Members menu, option {choice}")
+
+        if choice == "1":
+            name = input("Enter Member Full Name: ")
+            phone = input("Enter Phone (07…): ")
+            try:
+                Member.create(name, phone)
+            except Exception as e:
+                print(f"❌ {e}")
+
+        elif choice == "2":
+            member_id = prompt_int("Enter Member ID to delete: ")
+            member = Member.get_by_id(member_id)
+            if member and confirm_delete(member.name):
+                Member.delete(member_id)
+
+        elif choice == "3":
+            headers = ["ID", "Name", "Phone", "Status", "Joined At"]
+            page_table(Member.page,
+                       lambda m: [m.id, m.name, m.phone, m.status.value,
+                                  m.join_date.strftime("%Y-%m-%d %H:%M:%S") if m.join_date else "-"],
+                       headers, empty="❌No Members found.")
+
+        elif choice == "4":
+            member_id = prompt_int("Enter member ID: ")
+            member = Member.get_by_id(member_id)
+            if member:
+                print(f"✅ Found: {member.name}, Phone: {member.phone}, Status: {member.status.value}")
+            else:
+                print("❌ Member not found.")
+
+        elif choice == "5":
+            phone = input("Enter phone: ")
+            member = Member.find_by_phone(phone)
+            if member:
+                print(f"✅ Found: {member.name}, Phone: {member.phone}, Status: {member.status.value}")
+            else:
+                print("❌ No member with that phone.")
+
+        elif choice == "6":
+            member_id = prompt_int("Enter member ID: ")
+            member = Member.get_by_id(member_id)
+            if not member:
+                print("❌ Member not found.")
+                continue
+            print("1. ACTIVE\n2. INACTIVE\n3. SUSPENDED")
+            status_choice = prompt_choice("Choose status: ", ["1", "2", "3"])
+            status_map = {"1": MemberStatus.ACTIVE, "2": MemberStatus.INACTIVE, "3": MemberStatus.SUSPENDED}
+            member.set_status(status_map[status_choice])
+
+        elif choice == "7":
+            print(tabulate(Member.cache_stats().items(), tablefmt="grid"))
+
+        elif choice == "0":
+            break
+
+
+# CONTRIBUTIONS MENU
+def contributions_menu():
+    while True:
+        profiler.finish()  # --profile: the summary of the action that just ran
+        print_header("=== 🤑 CONTRIBUTIONS ===")
+        print("1. Record Contribution")
+        print("2. Delete Contribution")
+        print("3. List All Contributions")
+        print("4. Find Contribution by ID")
+        print("5. View Contribution's Member")
+        print("6. Show Member Total Contributions")
+        print("7. Show All Contributions for a Member")
+        print("0. Back to Main")
+
+        choice = prompt_choice("Choose: ", ["1","2","3","4","5","6","7","0"])
+        profiler.start(f"Contributions menu, option {choice}")
+
+        if choice == "0":
+            break
+
+        elif choice == "1":
+            member_id = prompt_int("Enter Member ID: ")
+            amount = prompt_float("Enter Contribution amount: ")
+            try:
+                Contribution.create(member_id, amount)
+            except Exception as e:
+                print(f"❌ {e}")
+
+        elif choice == "2":
+            contribution_id = prompt_int("Enter Contribution ID to delete: ")
+            Contribution.delete(contribution_id)
+
+        elif choice == "3":
+            headers = ["ID", "Member ID", "Amount", "Date"]
+            page_table(Contribution.page,
+                       lambda c: [c.id, c.member_id, c.amount, c.date.strftime("%Y-%m-%d %H:%M:%S") if c.date else "-"],
+                       headers, empty="❌ No contributions found.")
+
+        elif choice == "4":
+            contribution_id = prompt_int("Enter Contribution ID: ")
+            c = Contribution.get_by_id(contribution_id)
+            if c:
+                date = c.date.strftime("%Y-%m-%d %H:%M:%S") if c.date else "-"
+                print(f"ID: {c.id}, Member ID: {c.member_id}, Amount: {c.amount}, Date: {date}")
+            else:
+                print("❌ Contribution not found.")
+
+        elif choice == "5":
+            contribution_id = prompt_int("Enter Contribution ID: ")
+            c = Contribution.get_by_id(contribution_id)
+            if c:
+                member = Member.get_by_id(c.member_id)
+                if member:
+                    print(f"Contribution Member: {member.name}, Phone: {member.phone}, Status: {member.status.value}")
+                else:
+                    print("❌ Member not found.")
+
+        elif choice == "6":
+            member_id = prompt_int("Enter Member ID: ")
+            total = Contribution.total_for_member(member_id)
+            print(f"Total contributions for Member {member_id}: {total}")
+
+        elif choice == "7":
+            member_id = prompt_int("Enter Member ID: ")
+            contributions = Contribution.for_member(member_id)
+            if not contributions:
+                print("❌ No contributions found for this member.")
+            else:
+                table = []
+                for c in contributions:
+                    date = c.date.strftime("%Y-%m-%d %H:%M:%S") if c.date else "-"
+                    table.append([c.id, c.amount, date])
+                headers = ["ID", "Amount", "Date"]
+                print(tabulate(table, headers=headers, tablefmt="grid"))
+
+# LOANS MENU
+def loans_menu():
+    while True:
+        profiler.finish()  # --profile: the summary of the action that just ran
+        print_header("=== 💵 LOANS ===")
+        print("1. Issue Loan")
+        print("2. Record Loan Repayment")
+        print("3. Delete Loan")
+        print("4. List All Loans")
+        print("5. Find Loan by ID")
+        print("6. Find Loans by Status")
+        print("7. View Loan's Member")
+        print("8. Mark Overdue Loans as Defaulted")
+        print("0. Back to Main")
+
+        choice = prompt_choice("Choose: ", ["1","2","3","4","5","6","7","8","0"])
+        profiler.start(f"Loans menu, option {choice}")
+
+        if choice == "0":
+            break
+
+        elif choice == "1":  # Issue Loan
+            member_id = prompt_int("Enter Member ID: ")
+            amount = prompt_float("Enter loan amount: ")
+            print("Choose Loan Plan:")
+            print("1. 1 Month (2% interest)")
+            print("2. 6 Months (4% interest)")
+            print("3. 12 Months (7% interest)")
+            plan_choice = prompt_choice("Select plan: ", ["1","2","3"])
+            plan_map = {"1": "1_month", "2": "6_months", "3": "12_months"}
+            plan = plan_map[plan_choice]
+            try:
+                loan = Loan.issue_loan(member_id, amount, plan)
+            except Exception as e:
+                print(f"❌ Cannot issue loan: {e}")
+
+        elif choice == "2":  # Record Repayment
+            loan_id = prompt_int("Enter Loan ID: ")
+            amount = prompt_float("Enter repayment amount: ")
+            try:
+                Repayment.apply_repayment(loan_id, amount)
+            except Exception as e:
+                print(f"❌ {e}")
+
+        elif choice == "3":  # Delete Loan
+            loan_id = prompt_int("Enter Loan ID to delete: ")
+            loan = Loan.get_by_id(loan_id)
+            if loan and confirm_delete(f"Loan {loan.id}"):
+                Loan.delete(loan_id)
+
+        elif choice == "4":  # List All Loans
+            headers = ["ID","Member ID","Amount","Balance","Status","Issued At","Due Date"]
+            page_table(Loan.page,
+                       lambda l: [l.id, l.member_id, f"{l.amount:.2f}", f"{l.balance:.2f}", l.status.value,
+                                  l.issued_date.strftime("%Y-%m-%d %H:%M:%S") if l.issued_date else "-",
+                                  l.due_date.strftime("%Y-%m-%d %H:%M:%S") if l.due_date else "-"],
+                       headers, empty="❌ No loans found.")
+
+        elif choice == "5":  # Find Loan by ID
+            loan_id = prompt_int("Enter Loan ID: ")
+            l = Loan.get_by_id(loan_id)
+            if l:
+                issued = l.issued_date.strftime("%Y-%m-%d %H:%M:%S")
+                due = l.due_date.strftime("%Y-%m-%d %H:%M:%S")
+                print(f"Loan {l.id}: Member {l.member_id}, Amount {l.amount:.2f}, Balance {l.balance:.2f}, "
+                      f"Status {l.status.value}, Issued {issued}, Due {due}")
+            else:
+                print("❌ Loan not found.")
+
+        elif choice == "6":  # Find Loans by Status
+            print("1. ACTIVE\n2. PAID\n3. DEFAULTED")
+            status_choice = prompt_choice("Choose status: ", ["1","2","3"])
+            status_map = {"1": LoanStatus.ACTIVE, "2": LoanStatus.PAID, "3": LoanStatus.DEFAULTED}
+            loans = Loan.find_by_status(status_map[status_choice])
+            table = [[l.id, l.member_id, f"{l.amount:.2f}", f"{l.balance:.2f}", l.status.value] for l in loans]
+            headers = ["ID","Member ID","Amount","Balance","Status"]
+            print(tabulate(table, headers=headers, tablefmt="grid"))
+
+        elif choice == "7":  # View Loan's Member
+            loan_id = prompt_int("Enter Loan ID: ")
+            l = Loan.get_by_id(loan_id)
+            if l:
+                member = Member.get_by_id(l.member_id)
+                if member:
+                    print(f"Loan Member: {member.name}, Phone: {member.phone}, Status: {member.status.value}")
+                else:
+                    print("❌ Member not found.")
+            else:
+                print("❌ Loan not found.")
+
+        elif choice == "8":  # Mark Overdue Loans
+            sweep_loans()
+
+# REPORTS MENU
+def reports_menu():
+    while True:
+        profiler.finish()  # --profile: the summary of the action that just ran
+        print_header("=== 📊 REPORTS ===")
+        print("1. Member Statement")
+        print("2. Group Totals")
+        print("3. Members in Arrears")
+        print("4. Status Breakdown")
+        print("5. Monthly Statements")
+        print("0. Back to Main")
+
+        choice = prompt_choice("Choose: ", ["1", "2", "3", "4", "5", "0"])
+        profiler.start(f"Reports menu, option {choice}")
+
+        if choice == "0":
+            break
+
+        elif choice == "1":  # Member Statement
+            member_id = prompt_int("Enter Member ID: ")
+            month = input("Month (YYYY-MM) [all time]: ").strip()
+            show_statement(member_id, month)
+
+        elif choice == "2":  # Group Totals
+            total_members, total_contributions, total_loans, total_outstanding = reports.group_totals()
+
+            print_header("--- Group Totals ---")
+            print(f"Total Members: {total_members}")
+            print(f"Total Contributions: {total_contributions:.2f}")
+            print(f"Total Loans Issued: {total_loans:.2f}")
+            print(f"Total Outstanding Balance: {total_outstanding:.2f}")
+
+        elif choice == "3":  # Members in Arrears
+            arrears_list = [[r.member_id, r.name, r.phone, f"{r.balance:.2f}", r.due_date.strftime("%Y-%m-%d")]
+                            for r in reports.arrears()]
+
+            if arrears_list:
+                print("\nMembers in Arrears:")
+                print(tabulate(arrears_list, headers=["Member ID","Name","Phone","Outstanding","Due Date"], tablefmt="grid"))
+            else:
+                print("❌ No members in arrears.")
+
+        elif choice == "4":  # Status Breakdown
+            with session_scope() as session:
+                loan_rows = reports.loan_status_breakdown(session)
+                member_rows = reports.member_status_breakdown(session)
+
+            print("\nMembers by Status:")
+            print(tabulate([[r.status.value if r.status else "-", r.members] for r in member_rows],
+                           headers=["Status", "Members"], tablefmt="grid"))
+            print("\nLoans by Status:")
+            if loan_rows:
+                print(tabulate([[r.status.value if r.status else "-", r.loans, r.amount, r.balance] for r in loan_rows],
+                               headers=["Status", "Loans", "Amount", "Balance"], tablefmt="grid", floatfmt=".2f"))
+            else:
+                print("❌ No loans found.")
+
+        elif choice == "5":  # Monthly Statements
+            month = input("Month (YYYY-MM): ").strip()
+            out_dir = input("Output folder [statements]: ").strip() or "statements"
+            write_statements(month, out_dir)
+
+def show_statement(member_id, month=""):
+    """
+    Print a member's statement for month (YYYY-MM), or their whole history up
+    to today when month is blank. Built by lib.statements like the statement
+    files, so a closed month resumes from the member's last checkpoint.
+    """
+    from lib.statements import member_statement, month_period, render_text
+    if month:
+        try:
+            start, end = month_period(month)
+        except ValueError:
+            print(f"❌ Invalid month '{month}'. Use YYYY-MM.")
+            return None
+    else:
+        start, end = None, datetime.now().date()
+    statement = member_statement(member_id, start, end)
+    if statement is None:
+        print("❌ Member not found.")
+        return None
+    print("\n" + render_text(statement), end="")
+    return statement
+
+def write_statements(month, out_dir, batch_size=500):
+    """Generate every member's statement for month (YYYY-MM) into out_dir"""
+    from lib.statements import generate_statements, month_period
+    try:
+        start, end = month_period(month)
+    except ValueError:
+        print(f"❌ Invalid month '{month}'. Use YYYY-MM.")
+        return None
+    written = generate_statements(start, end, out_dir, batch_size)
+    print(f"✅ Wrote {written} statement(s) for {month} to {out_dir}")
+    return written
+
+def sweep_loans():
+    """Run the overdue-loan sweep once and report it"""
+    changed = Loan.mark_overdue()
+    print(f"✅ {datetime.now():%Y-%m-%d %H:%M:%S} Marked {changed} overdue loan(s) as DEFAULTED.")
+    return changed
+
@@ -0,0 +1,277 @@
+# lib/metrics.py
+import atexit
+import functools
+import inspect
+import math
+import os
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Application metrics in the Prometheus text format. The models count as they
+# go (always: it is a dict update); the numbers are only exposed when a
+# long-running CLI process is started with --metrics-port (an HTTP
+# /metrics endpoint) or --metrics-file (a dump for node_exporter's textfile
+# collector). Every process starts from zero.
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REGISTRY = []
+
+
+def format_value(value):
+    if isinstance(value, float) and math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def format_labels(pairs):
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f"❌ {self.name} takes labels {self.labels}, got {tuple(labels)}")
+        return tuple(labels[name] for name in self.labels)
+
+    def samples(self):
+        """(suffix, ((label, value), ...), value) per sample"""
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines += [f"{self.name}{suffix}{format_labels(pairs)} {format_value(value)}"
+                  for suffix, pairs, value in self.samples()]
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        super().__init__(name, help, labels)
+        self._values = {} if labels else {(): 0}
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self.key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        return [("", tuple(zip(self.labels, key)), value) for key, value in sorted(values)]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets) + (math.inf,)
+        self._values = {}  # label values -> [count per bucket (not cumulative)..., sum]
+
+    def observe(self, seconds, **labels):
+        key = self.key(labels)
+        index = next(i for i, bound in enumerate(self.buckets) if seconds <= bound)
+        with self._lock:
+            counts = self._values.setdefault(key, [0] * len(self.buckets) + [0.0])
+            counts[index] += 1
+            counts[-1] += seconds
+
+    def count(self, **labels):
+        return sum(self._values.get(self.key(labels), [0])[:-1])
+
+    def samples(self):
+        with self._lock:
+            values = [(key, list(counts)) for key, counts in self._values.items()]
+        samples = []
+        for key, counts in sorted(values):
+            pairs = tuple(zip(self.labels, key))
+            total = 0
+            for bound, count in zip(self.buckets, counts):
+                total += count
+                samples.append(("_bucket", pairs + (("le", format_value(bound)),), total))
+            samples += [("_sum", pairs, counts[-1]), ("_count", pairs, total)]
+        return samples
+
+
+class Observed(Metric):
+    """A counter or gauge kept elsewhere, read when the metrics are rendered"""
+
+    def __init__(self, name, help, read, kind="gauge"):
+        super().__init__(name, help)
+        self.read = read
+        self.kind = kind
+
+    def samples(self):
+        return [("", (), self.read())]
+
+
+def session_count(name):
+    def read():
+        from lib.db.db import session_stats
+        return session_stats()[name]
+    return read
+
+
+# The catalogue
+CONTRIBUTIONS = Counter("chama_contributions_recorded_total", "Contributions recorded (each same-day top-up counts)")
+CONTRIBUTED_KES = Counter("chama_contributions_amount_kes_total", "Amount contributed, in KES")
+LOANS_ISSUED = Counter("chama_loans_issued_total", "Loans issued")
+LOANS_REJECTED = Counter("chama_loans_rejected_total", "Loan requests refused, by the rule that refused them", ["rule"])
+LOAN_DECISION_SECONDS = Histogram("chama_loan_decision_seconds", "Time to issue or refuse a loan", ["outcome"])
+REPAYMENTS = Counter("chama_repayments_recorded_total", "Repayments posted")
+REPAYMENT_SECONDS = Histogram("chama_repayment_seconds", "Time to post a repayment (or a batch of them)", ["outcome"])
+SESSIONS_OPENED = Observed("chama_db_sessions_opened_total", "Database sessions opened", session_count("opened"),
+                           "counter")
+SESSIONS_CLOSED = Observed("chama_db_sessions_closed_total", "Database sessions closed", session_count("closed"),
+                           "counter")
+SESSIONS_OPEN = Observed("chama_db_sessions_open", "Database sessions open now (never closed ones included)",
+                         session_count("open"))
+DB_WRITE_SECONDS = Histogram("chama_db_write_seconds",
+                             "INSERT/UPDATE/DELETE statement time, including any wait for the write lock")
+DB_LOCK_ERRORS = Counter("chama_db_lock_errors_total",
+                         "Statements that failed on a lock: still locked after the busy timeout, or deadlocked")
+
+
+def on_commit(session, counter, amount=1, **labels):
+    """counter.inc(amount, **labels) once session commits; dropped if it rolls back"""
+    session.info.setdefault("metrics_pending", []).append((counter, amount, labels))
+
+
+@event.listens_for(Session, "after_commit")
+def apply_pending(session):
+    for counter, amount, labels in session.info.pop("metrics_pending", ()):
+        counter.inc(amount, **labels)
+
+
+@event.listens_for(Session, "after_rollback")
+def drop_pending(session):
+    session.info.pop("metrics_pending", None)
+
+
+def timed(histogram, ok="ok"):
+    """Decorator: observe the call's duration with outcome=ok, "rejected" (ValueError) or "error" """
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def awaiting(*args, **kwargs):
+                started = time.perf_counter()
+                outcome = "error"
+                try:
+                    result = await fn(*args, **kwargs)
+                    outcome = ok
+                    return result
+                except ValueError:
+                    outcome = "rejected"
+                    raise
+                finally:
+                    histogram.observe(time.perf_counter() - started, outcome=outcome)
+            return awaiting
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = fn(*args, **kwargs)
+                outcome = ok
+                return result
+            except ValueError:
+                outcome = "rejected"
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - started, outcome=outcome)
+        return wrapper
+    return decorator
+
+
+WRITES = ("INSERT", "UPDATE", "DELETE")
+LOCK_SQLSTATES = {"55P03", "40P01"}  # PostgreSQL lock_not_available, deadlock_detected
+
+
+def instrument(engine):
+    """Time write statements and count lock failures on engine"""
+    @event.listens_for(engine, "before_cursor_execute")
+    def before(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip()[:6].upper() in WRITES:
+            conn.info.setdefault("write_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip()[:6].upper() in WRITES:
+            DB_WRITE_SECONDS.observe(time.perf_counter() - conn.info["write_started"].pop())
+
+    @event.listens_for(engine, "handle_error")
+    def failed(context):
+        if context.connection is not None:
+            context.connection.info.pop("write_started", None)
+        error = context.original_exception
+        if "locked" in str(error) or getattr(error, "pgcode", None) in LOCK_SQLSTATES:
+            DB_LOCK_ERRORS.inc()
+
+
+def render():
+    """Every metric in the Prometheus text exposition format"""
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+def dump(path):
+    """Write render() to path atomically (the textfile collector may read at any time)"""
+    with open(path + ".part", "w", encoding="utf-8") as f:
+        f.write(render())
+    os.replace(path + ".part", path)
+
+
+def dump_every(path, interval=15.0):
+    """Dump to path now, every interval seconds from a daemon thread, and at exit"""
+    def loop():
+        while True:
+            time.sleep(interval)
+            dump(path)
+    dump(path)
+    threading.Thread(target=loop, name="metrics-dump", daemon=True).start()
+    atexit.register(dump, path)
+
+
+def serve(port, host="127.0.0.1"):
+    """Serve GET /metrics on host:port from a daemon thread; returns the server"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):  # keep scrapes out of the menu
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
@@ -1,76 +1,180 @@
-from sqlalchemy import Column, Integer, ForeignKey, Numeric, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Date, Index, case
 from datetime import datetime
-from lib.db.db import Base, SessionLocal
+from lib.db.db import Base, session_scope, upsert, ReadModel
+from lib.models.rows import ContributionRow
+from lib.db.money import Money, to_money
+from lib.models.member import Member
+from lib.models.member_balance import MemberBalance
+from lib.metrics import CONTRIBUTED_KES, CONTRIBUTIONS, on_commit
 
 def now():
     return datetime.now().replace(microsecond=0)
 
-class Contribution(Base):
+def day_of(context):
+    """Default contribution_day to the calendar day of the row's date"""
+    return (context.get_current_parameters().get("date") or now()).date()
+
+class Contribution(ReadModel, Base):
     __tablename__ = "contributions"
+    __read_model__ = ContributionRow
+    __table_args__ = (
+        Index("ix_contributions_member_id_date", "member_id", "date"),  # statements
+        Index("uq_contributions_member_id_day", "member_id", "contribution_day", unique=True),  # same-day merge
+    )
 
     id = Column(Integer, primary_key=True)
     member_id = Column(Integer, ForeignKey("members.id"), nullable=False)
-    amount = Column(Numeric(10, 2), nullable=False)
+    amount = Column(Money, nullable=False)
     date = Column(DateTime, default=now)  
+    contribution_day = Column(Date, nullable=False, default=day_of)  # one row per member per day
 
     # Methods
     @classmethod
-    def create(cls, member_id: int, amount: float):
+    def create(cls, member_id: int, amount, session=None):
         """Add to existing contribution today or create new record"""
-        if amount <= 0:
-            raise ValueError("❌Contribution must be greater than 0.")
+        amount = cls.check_amount(amount)
+        stamp = now()
 
-        session = SessionLocal()
-        today = now().date()
-
-        # Check if member already has contribution today
-        existing = session.query(cls).filter(
-            cls.member_id == member_id,
-            cls.date.cast(DateTime).between(datetime.combine(today, datetime.min.time()),
-                                            datetime.combine(today, datetime.max.time()))
-        ).first()
-
-        if existing:
-            existing.amount += amount
-            session.commit()
-            print(f"✅ Added {amount} to existing contribution (ID {existing.id}) for Member ID {member_id}. New total: {existing.amount}")
-            return existing
+        with session_scope(session) as session:
+            # One UPSERT: insert today's row, or add to it if the member already contributed today
+            stmt = cls._merge_day(upsert(cls, session).values(member_id=member_id, amount=amount, date=stamp,
+                                                              contribution_day=stamp.date()))
+            contribution = session.scalars(stmt.returning(cls), execution_options={"populate_existing": True}).one()
+            MemberBalance.record(session, member_id, contributed=amount, when=stamp)
+            on_commit(session, CONTRIBUTIONS)
+            on_commit(session, CONTRIBUTED_KES, float(amount))
+
+        if contribution.amount > amount:  # merged into today's row
+            print(f"✅ Added {amount} to existing contribution (ID {contribution.id}) for Member ID {member_id}. New total: {contribution.amount}")
         else:
-            contribution = cls(member_id=member_id, amount=amount, date=now())
-            session.add(contribution)
-            session.commit()
             print(f"✅ Contribution of {amount} recorded for Member ID {member_id} (ID {contribution.id})")
-            return contribution
+        return contribution
+
+    @classmethod
+    def bulk_create(cls, rows, session=None):
+        """
+        Record many contributions at once. rows is an iterable of
+        (member_id, amount, date) tuples; amounts for the same member and day
+        are merged in memory and written with one executemany UPSERT, together
+        with the ledger deltas, in a single transaction. Returns the number of
+        day rows written.
+        """
+        days = {}
+        deltas = {}
+        received = 0
+        for member_id, amount, date in rows:
+            received += 1
+            amount = cls.check_amount(amount)
+            date = date or now()
+            key = (member_id, date.date())
+            day = days.setdefault(key, {"member_id": member_id, "amount": 0, "date": date, "contribution_day": key[1]})
+            day["amount"] += amount
+            day["date"] = max(day["date"], date)
+
+            delta = deltas.setdefault(member_id, {"member_id": member_id, "total_contributed": 0,
+                                                  "first_activity": date, "last_activity": date})
+            delta["total_contributed"] += amount
+            delta["first_activity"] = min(delta["first_activity"], date)
+            delta["last_activity"] = max(delta["last_activity"], date)
+
+        if days:
+            with session_scope(session) as session:
+                session.execute(cls._merge_day(upsert(cls.__table__, session)), list(days.values()))
+                MemberBalance.record_many(session, list(deltas.values()))
+                on_commit(session, CONTRIBUTIONS, received)
+                on_commit(session, CONTRIBUTED_KES, float(sum(delta["total_contributed"] for delta in deltas.values())))
+        return len(days)
+
+    @classmethod
+    def record_many(cls, session, contributions):
+        """
+        Record (member_id, amount) contributions made now, inside the
+        caller's transaction. Unlike bulk_create, each one gets its own
+        result: a member's n-th contribution in the list goes in the n-th
+        executemany UPSERT, so it sees the ones before it. The ledger gets
+        one delta per member. Returns today's row (a ContributionRow) as it
+        stood after each contribution, in order.
+        """
+        stamp = now()
+        rounds = []     # {member_id: amount} per UPSERT
+        positions = []  # (round, member_id) per contribution
+        counts = {}     # member_id -> contributions so far
+        totals = {}     # member_id -> amount so far
+        for member_id, amount in contributions:
+            amount = cls.check_amount(amount)
+            index = counts.get(member_id, 0)
+            if index == len(rounds):
+                rounds.append({})
+            rounds[index][member_id] = amount
+            positions.append((index, member_id))
+            counts[member_id] = index + 1
+            totals[member_id] = totals.get(member_id, 0) + amount
+
+        columns = cls.__table__.c
+        stmt = cls._merge_day(upsert(cls.__table__, session)).returning(
+            *(columns[field] for field in cls.__read_model__._fields))
+        results = []
+        for amounts in rounds:
+            rows = session.execute(stmt, [{"member_id": member_id, "amount": amount, "date": stamp,
+                                           "contribution_day": stamp.date()} for member_id, amount in amounts.items()])
+            results.append({row.member_id: cls.__read_model__._make(row) for row in rows})
+
+        MemberBalance.record_many(session, [
+            {"member_id": member_id, "total_contributed": total, "last_activity": stamp}
+            for member_id, total in totals.items()
+        ])
+        on_commit(session, CONTRIBUTIONS, len(positions))
+        on_commit(session, CONTRIBUTED_KES, float(sum(totals.values())))
+        return [results[index][member_id] for index, member_id in positions]
+
+    @staticmethod
+    def check_amount(amount):
+        """Return amount as money, if it is positive"""
+        amount = to_money(amount)
+        if amount <= 0:
+            raise ValueError("❌Contribution must be greater than 0.")
+        return amount
+
+    @classmethod
+    def _merge_day(cls, stmt):
+        """Turn an INSERT into the same-day UPSERT: add the amount, keep the latest time"""
+        return stmt.on_conflict_do_update(
+            index_elements=[cls.member_id, cls.contribution_day],
+            set_={
+                "amount": cls.amount + stmt.excluded.amount,
+                "date": case((stmt.excluded.date > cls.date, stmt.excluded.date), else_=cls.date),
+            },
+        )
 
     @classmethod
-    def delete(cls, contribution_id: int):
-        session = SessionLocal()
-        c = session.get(cls, contribution_id)
-        if not c:
-            print("❌ Contribution not found.")
-            return False
-        session.delete(c)
-        session.commit()
+    def delete(cls, contribution_id: int, session=None):
+        with session_scope(session) as session:
+            c = session.get(cls, contribution_id)
+            if not c:
+                print("❌ Contribution not found.")
+                return False
+            session.delete(c)
+            session.flush()
+            MemberBalance.rebuild(session, member_ids=[c.member_id])
         print(f"🚮 Contribution {contribution_id} deleted.")
         return True
 
     @classmethod
-    def get_all(cls):
-        session = SessionLocal()
-        return session.query(cls).all()
+    def get_all(cls, session=None):
+        with session_scope(session) as session:
+            return session.query(cls).all()
 
     @classmethod
-    def get_by_id(cls, contribution_id: int):
-        session = SessionLocal()
-        return session.get(cls, contribution_id)
+    def get_by_id(cls, contribution_id: int, session=None):
+        with session_scope(session) as session:
+            return session.get(cls, contribution_id)
 
     @classmethod
-    def for_member(cls, member_id: int):
-        session = SessionLocal()
-        return session.query(cls).filter_by(member_id=member_id).all()
+    def for_member(cls, member_id: int, session=None):
+        return cls.rows(cls.member_id == member_id, session=session)
 
     @classmethod
-    def total_for_member(cls, member_id: int):
-        session = SessionLocal()
-        total = session.query(cls).filter_by(member_id=member_id).with_entities(cls.amount).all()
-        return sum([float(a[0]) for a in total]) if total else 0.0
+    def total_for_member(cls, member_id: int, session=None):
+        """Read the member's running total from the balances ledger."""
+        balance = MemberBalance.get(member_id, session)
+        return balance.total_contributed if balance else to_money(0)
@@ -1,35 +1,59 @@
 # lib/models/loan.py
-from sqlalchemy import Column, Integer, ForeignKey, Float, DateTime, Enum
+from sqlalchemy import (Column, Integer, BigInteger, ForeignKey, Float, DateTime, Enum, Index, func, select, update,
+                        case, cast, type_coerce)
 from datetime import datetime, timedelta
+from decimal import Decimal
 import enum
-from lib.db.db import Base, SessionLocal
+from lib.db.db import Base, session_scope, ReadModel
+from lib.models.rows import LoanRow
+from lib.db.money import Money, to_money
 from lib.models.member import Member
 from lib.models.contribution import Contribution
+from lib.models.member_balance import MemberBalance
+from lib.metrics import LOAN_DECISION_SECONDS, LOANS_ISSUED, LOANS_REJECTED, on_commit, timed
 
 def now():
     """Return current datetime without microseconds."""
     return datetime.now().replace(microsecond=0)
 
+def refuse(rule, message):
+    """Count a refused loan request under rule and return the error to raise"""
+    LOANS_REJECTED.inc(rule=rule)
+    return ValueError(message)
+
+# Repayment plans: days until due and flat interest on the amount
+PLANS = {
+    "1_month": {"days": 30, "rate": Decimal("0.02")},
+    "6_months": {"days": 180, "rate": Decimal("0.04")},
+    "12_months": {"days": 365, "rate": Decimal("0.07")}
+}
+
 class LoanStatus(enum.Enum):
     ACTIVE = "ACTIVE"       
     PAID = "PAID"           
     DEFAULTED = "DEFAULTED" 
 
-class Loan(Base):
+class Loan(ReadModel, Base):
     __tablename__ = "loans"
+    __read_model__ = LoanRow
+    __table_args__ = (
+        Index("ix_loans_member_id_status", "member_id", "status"),  # Rule 2 active-loan check
+        Index("ix_loans_status_due_date", "status", "due_date"),    # arrears / overdue loans
+    )
 
     id = Column(Integer, primary_key=True)
     member_id = Column(Integer, ForeignKey("members.id"), nullable=False)
-    amount = Column(Float, nullable=False)
+    amount = Column(Money, nullable=False)
     issued_date = Column(DateTime, default=now)
     due_date = Column(DateTime, nullable=False)
     interest_rate = Column(Float, nullable=False)  # Stored as percentage
     status = Column(Enum(LoanStatus), default=LoanStatus.ACTIVE)
-    balance = Column(Float, nullable=False)
+    balance = Column(Money, nullable=False)
 
     # Methods 
     @classmethod
-    def issue_loan(cls, member_id: int, amount: float, plan: str):
+    @timed(LOAN_DECISION_SECONDS, ok="issued")
+    def issue_loan(cls, member_id: int, amount, plan: str, session=None):
         """
         Issue a loan with automatic due date and interest rate based on plan.
         Plans:
@@ -37,141 +61,233 @@ class Loan(Base):
         - '6_months': 6 months, 4% interest
         - '12_months': 1 year, 7% interest
         """
-        plan_options = {
-            "1_month": {"days": 30, "rate": 0.02},
-            "6_months": {"days": 180, "rate": 0.04},
-            "12_months": {"days": 365, "rate": 0.07}
-        }
-
-        if plan not in plan_options:
-            raise ValueError("❌ Invalid plan. Choose '1_month', '6_months', or '12_months'.")
-
-        session = SessionLocal()
-        try:
-            member = session.get(Member, member_id)
-            if not member:
-                raise ValueError("❌ Member not found.")
-
-            # Rule 1: Minimum 2 months membership
-            if member.join_date > datetime.now() - timedelta(days=60):
-                raise ValueError(
-                    f"❌ Cannot lend loan. Member must be at least 2 months in the chama "
-                    f"(Joined {member.join_date.date()})."
-                )
-
-            # Rule 2: Only one active loan at a time
-            active_loans = session.query(cls).filter_by(member_id=member_id, status=LoanStatus.ACTIVE).all()
-            if active_loans:
-                raise ValueError(
-                    f"❌ Cannot lend loan. Member has an active loan (ID {active_loans[0].id}). Finish repayment first."
-                )
-
-            # Rule 3: Loan amount <= 3 * total contributions for this member
-            total_contrib_member = Contribution.total_for_member(member_id)
-            if amount > 3 * total_contrib_member:
-                raise ValueError(
-                    f"❌ Cannot lend loan. Requested amount {amount:.2f} exceeds 3x member contributions ({3*total_contrib_member:.2f})."
-                )
-
-            if amount <= 0:
-                raise ValueError("❌ Loan must be greater than 0.")
-
-            # Rule 4: Total loans for all members <= total chama contributions
-            all_members = session.query(Member).all()
-            total_chama_contrib = sum(Contribution.total_for_member(m.id) for m in all_members)
-            total_outstanding_loans = sum(
-                sum(l.balance for l in session.query(cls).filter(cls.member_id==m.id,
-                                                                 cls.status.in_([LoanStatus.ACTIVE, LoanStatus.DEFAULTED])).all())
-                for m in all_members
+        amount = cls.check_plan(amount, plan)
+
+        with session_scope(session) as session:
+            cls.check_member(session.get(Member, member_id))
+            cls.check_no_active_loan(session.scalar(cls.active_loan_query(member_id)))
+            cls.check_limit(amount, Contribution.total_for_member(member_id, session))
+            cls.check_pool(amount, *cls.pool_totals(session))
+
+            loan = cls.for_plan(member_id, amount, plan)
+            session.add(loan)
+            session.flush()
+            MemberBalance.record(session, member_id, borrowed=amount, outstanding=loan.balance,
+                                 when=loan.issued_date)
+            on_commit(session, LOANS_ISSUED)
+        print(f"Loan of {amount:.2f} issued to Member {member_id} with plan '{plan}', "
+              f"interest {loan.interest_rate:.2f}%, balance {loan.balance:.2f}, due {loan.due_date.date()}")
+        return loan
+
+    # Lending rules, in the order issue_loan (and lib.services.loan_issue) applies
+    # them. Each raises the refusal, counted under its rule, or returns quietly.
+    @staticmethod
+    def check_plan(amount, plan: str):
+        """Return amount as money, if plan is one of PLANS"""
+        amount = to_money(amount)
+        if plan not in PLANS:
+            raise refuse("invalid_plan", "❌ Invalid plan. Choose '1_month', '6_months', or '12_months'.")
+        return amount
+
+    @staticmethod
+    def check_member(member):
+        if not member:
+            raise refuse("member_not_found", "❌ Member not found.")
+
+        # Rule 1: Minimum 2 months membership
+        if member.join_date > datetime.now() - timedelta(days=60):
+            raise refuse(
+                "membership_age",
+                f"❌ Cannot lend loan. Member must be at least 2 months in the chama "
+                f"(Joined {member.join_date.date()})."
             )
 
-            if total_outstanding_loans + amount > total_chama_contrib:
-                raise ValueError(
-                    f"❌ Cannot lend loan. Total loans ({total_outstanding_loans + amount:.2f}) "
-                    f"❌ Not possible as it would surpass the total chama contributions ({total_chama_contrib:.2f})."
-                )
-
-            # Determine due date and interest
-            plan_data = plan_options[plan]
-            due_date = now() + timedelta(days=plan_data["days"])
-            interest_rate = plan_data["rate"]
-
-            # Calculate total balance
-            total_balance = round(amount + (amount * interest_rate), 2)
-            amount = round(amount, 2)
-
-            loan = cls(
-                member_id=member_id,
-                amount=amount,
-                due_date=due_date,
-                balance=total_balance,
-                interest_rate=round(interest_rate * 100, 2),  # store as percentage
-                status=LoanStatus.ACTIVE
+    @staticmethod
+    def check_no_active_loan(active_loan_id):
+        # Rule 2: Only one active loan at a time
+        if active_loan_id is not None:
+            raise refuse(
+                "active_loan",
+                f"❌ Cannot lend loan. Member has an active loan (ID {active_loan_id}). Finish repayment first."
             )
-            session.add(loan)
-            session.commit()
-            print(f"Loan of {amount:.2f} issued to Member {member_id} with plan '{plan}', "
-                  f"interest {interest_rate*100:.2f}%, balance {loan.balance:.2f}, due {due_date.date()}")
-            return loan
-        finally:
-            session.close()
-
-    def apply_repayment(self, amount: float):
-        """Apply repayment and automatically set status."""
+
+    @staticmethod
+    def check_limit(amount, total_contrib_member):
+        # Rule 3: Loan amount <= 3 * total contributions for this member
+        if amount > 3 * total_contrib_member:
+            raise refuse(
+                "contribution_limit",
+                f"❌ Cannot lend loan. Requested amount {amount:.2f} exceeds 3x member contributions ({3*total_contrib_member:.2f})."
+            )
+
         if amount <= 0:
-            raise ValueError("❌ Repayment must be greater than 0.")
-
-        session = SessionLocal()
-        try:
-            loan = session.merge(self)
-            if amount > loan.balance:
-                raise ValueError("❌ Repayment cannot exceed remaining balance.")
-            loan.balance -= amount
-
-            loan.balance = round(loan.balance, 2)
-
-            if loan.balance <= 0:
-                loan.balance = 0
-                loan.status = LoanStatus.PAID
-            elif loan.due_date < now() and loan.balance > 0:
-                loan.status = LoanStatus.DEFAULTED
-            else:
-                loan.status = LoanStatus.ACTIVE
-
-            session.commit()
-            print(f"Repayment of {amount:.2f} applied. New balance: {loan.balance:.2f}, Status: {loan.status.value}")
-        finally:
-            session.close()
+            raise refuse("non_positive", "❌ Loan must be greater than 0.")
+
+    @staticmethod
+    def check_pool(amount, total_chama_contrib, total_outstanding_loans):
+        # Rule 4: Total loans for all members <= total chama contributions
+        if total_outstanding_loans + amount > total_chama_contrib:
+            raise refuse(
+                "pool_limit",
+                f"❌ Cannot lend loan. Total loans ({total_outstanding_loans + amount:.2f}) "
+                f"❌ Not possible as it would surpass the total chama contributions ({total_chama_contrib:.2f})."
+            )
+
+    @classmethod
+    def active_loan_query(cls, member_id: int):
+        """select() of the member's ACTIVE loan id, if any (served by ix_loans_member_id_status)"""
+        return select(cls.id).where(cls.member_id == member_id, cls.status == LoanStatus.ACTIVE).limit(1)
+
+    @classmethod
+    def for_plan(cls, member_id: int, amount, plan: str):
+        """A new ACTIVE loan of amount on plan: due date and flat interest from PLANS"""
+        plan_data = PLANS[plan]
+        issued = now()
+        return cls(
+            member_id=member_id,
+            amount=amount,
+            issued_date=issued,
+            due_date=issued + timedelta(days=plan_data["days"]),
+            balance=to_money(amount + amount * plan_data["rate"]),
+            interest_rate=float(plan_data["rate"] * 100),  # store as percentage
+            status=LoanStatus.ACTIVE
+        )
+
+    def apply_repayment(self, amount, when=None, session=None):
+        """Post a repayment against this loan (see Repayment.apply_repayment)."""
+        from lib.models.repayment import Repayment
+
+        with session_scope(session) as session:
+            repayment, self.balance, self.status = Repayment.post(session, [(self.id, amount, when)])[0]
+        print(f"Repayment of {repayment.amount:.2f} applied. New balance: {self.balance:.2f}, Status: {self.status.value}")
+
+    @classmethod
+    def debit(cls, session, loan_id: int, amount, when=None):
+        """
+        Take a repayment off a loan's balance and set its status, as one
+        guarded UPDATE ... RETURNING. The balance check happens in the same
+        statement, so concurrent tellers cannot both spend the same balance.
+        Returns (member_id, new balance, new status).
+        """
+        when = when or now()
+        loans = cls.__table__
+        remaining = loans.c.balance - amount  # integer cents, exact
+        row = session.execute(
+            update(loans)
+            .where(loans.c.id == loan_id, loans.c.balance >= amount)
+            .values(
+                balance=case((remaining <= 0, 0), else_=remaining),
+                # Each branch cast to the column's type: psycopg2 sends the
+                # values untyped, and Postgres reads a CASE of untyped strings
+                # as text, which it won't assign to the loanstatus enum
+                status=case(
+                    (remaining <= 0, cast(LoanStatus.PAID, loans.c.status.type)),
+                    (loans.c.due_date < when, cast(LoanStatus.DEFAULTED, loans.c.status.type)),
+                    else_=cast(LoanStatus.ACTIVE, loans.c.status.type),
+                ),
+            )
+            .returning(loans.c.member_id, loans.c.balance, loans.c.status)
+        ).one_or_none()
+
+        if row is None:
+            if session.get(cls, loan_id) is None:
+                raise ValueError("❌ Loan not found.")
+            raise ValueError("❌ Repayment cannot exceed remaining balance.")
+        return tuple(row)
 
     # Class Methods
     @classmethod
-    def get_all(cls):
-        session = SessionLocal()
-        try:
+    def pool_totals(cls, session=None):
+        """
+        Return (total contributions, total outstanding ACTIVE/DEFAULTED balances)
+        for the whole chama, computed with SQL aggregates in a single round trip.
+        """
+        with session_scope(session) as session:
+            return tuple(session.execute(cls.pool_totals_query()).one())
+
+    @classmethod
+    def pool_totals_query(cls):
+        total_contrib = select(func.coalesce(func.sum(Contribution.amount), 0)).scalar_subquery()
+        total_outstanding = select(func.coalesce(func.sum(cls.balance), 0)).where(
+            cls.status.in_([LoanStatus.ACTIVE, LoanStatus.DEFAULTED])
+        ).scalar_subquery()
+        return select(total_contrib, total_outstanding)
+
+    @classmethod
+    def overdue(cls, as_of=None):
+        """Criteria for ACTIVE loans past their due date (served by ix_loans_status_due_date)"""
+        return cls.status == LoanStatus.ACTIVE, cls.due_date < (as_of or now())
+
+    @classmethod
+    def mark_overdue(cls, as_of=None, session=None):
+        """
+        Move every ACTIVE loan past its due date to DEFAULTED with one set-based
+        UPDATE. Idempotent: a second run finds nothing left to change. Outstanding
+        balances count ACTIVE and DEFAULTED alike, so the ledger is unaffected.
+        Returns the number of loans changed.
+        """
+        with session_scope(session) as session:
+            result = session.execute(
+                update(cls.__table__).where(*cls.overdue(as_of)).values(status=LoanStatus.DEFAULTED)
+            )
+            return result.rowcount
+
+    @classmethod
+    def apply_penalty(cls, rate_percent, session=None):
+        """
+        Add rate_percent of the outstanding balance to every DEFAULTED loan.
+        The penalty is worked out in integer cents by the database for the
+        whole batch at once (rounded half up), and the ledger gets one delta
+        per member. Returns (loans penalised, total penalty).
+        """
+        basis_points = int(to_money(rate_percent) * 100)
+        if basis_points <= 0:
+            raise ValueError("❌ Penalty rate must be greater than 0.")
+
+        cents = type_coerce(cls.balance, BigInteger)
+        penalty = (cents * basis_points + 5000) // 10000
+        defaulted = (cls.status == LoanStatus.DEFAULTED, cls.balance > 0)
+
+        with session_scope(session) as session:
+            per_member = session.execute(
+                select(cls.member_id, func.count(cls.id), type_coerce(func.sum(penalty), Money))
+                .where(*defaulted)
+                .group_by(cls.member_id)
+            ).all()
+            session.execute(update(cls.__table__).where(*defaulted).values(balance=cents + penalty))
+            MemberBalance.record_many(session, [
+                {"member_id": member_id, "outstanding_balance": total}
+                for member_id, _, total in per_member
+            ])
+        return sum(count for _, count, _ in per_member), sum((total for _, _, total in per_member), to_money(0))
+
+    @classmethod
+    def delete(cls, loan_id: int, session=None):
+        with session_scope(session) as session:
+            loan = session.get(cls, loan_id)
+            if not loan:
+                print("❌ Loan not found.")
+                return False
+            session.delete(loan)
+            session.flush()
+            MemberBalance.rebuild(session, member_ids=[loan.member_id])
+        print(f"🚮 Loan {loan_id} deleted.")
+        return True
+
+    @classmethod
+    def get_all(cls, session=None):
+        with session_scope(session) as session:
             return session.query(cls).all()
-        finally:
-            session.close()
 
     @classmethod
-    def get_by_id(cls, loan_id: int):
-        session = SessionLocal()
-        try:
+    def get_by_id(cls, loan_id: int, session=None):
+        with session_scope(session) as session:
             return session.get(cls, loan_id)
-        finally:
-            session.close()
 
     @classmethod
-    def for_member(cls, member_id: int):
-        session = SessionLocal()
-        try:
-            return session.query(cls).filter_by(member_id=member_id).all()
-        finally:
-            session.close()
+    def for_member(cls, member_id: int, session=None):
+        return cls.rows(cls.member_id == member_id, session=session)
 
     @classmethod
-    def find_by_status(cls, status: LoanStatus):
-        session = SessionLocal()
-        try:
-            return session.query(cls).filter_by(status=status).all()
-        finally:
-            session.close()
+    def find_by_status(cls, status: LoanStatus, session=None):
+        return cls.rows(cls.status == status, session=session)
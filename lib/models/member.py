@@ -1,21 +1,35 @@
 # lib/models/member.py
-from sqlalchemy import Column, Integer, String, DateTime, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Enum, delete
 from datetime import datetime
 import enum
+import os
 
-from lib.db.db import Base, SessionLocal
+from lib.db.db import Base, session_scope, ReadModel
+from lib.db.cache import LRUCache, MISSING
+from lib.models.rows import MemberRow
 from lib.helper import normalize_phone
+from lib.models.member_balance import MemberBalance
+from lib.models.statement_checkpoint import StatementCheckpoint
 
 def now():
     return datetime.now().replace(microsecond=0)
 
+# Read-through cache for lookups made without a caller's session, keyed by
+# ("id", member_id) and ("phone", normalized phone). Entries are detached
+# Members; treat them as read-only. CHAMA_MEMBER_CACHE_SIZE=0 turns it off.
+member_cache = LRUCache(
+    maxsize=int(os.environ.get("CHAMA_MEMBER_CACHE_SIZE", 1024)),
+    ttl=float(os.environ.get("CHAMA_MEMBER_CACHE_TTL", 300)),  # s; bounds staleness from other processes
+)
+
 class MemberStatus(enum.Enum):
     ACTIVE = "ACTIVE"
     INACTIVE = "INACTIVE"
     SUSPENDED = "SUSPENDED"
 
-class Member(Base):
+class Member(ReadModel, Base):
     __tablename__ = "members"
+    __read_model__ = MemberRow
 
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
@@ -25,61 +39,93 @@ class Member(Base):
 
     # Methods
     @classmethod
-    def create(cls, name: str, phone: str, status=MemberStatus.ACTIVE):
+    def create(cls, name: str, phone: str, status=MemberStatus.ACTIVE, session=None):
         if len(name.strip()) < 2:
             raise ValueError("❌ Name must be at least 2 characters long.")
         phone = normalize_phone(phone)
 
-        with SessionLocal() as session:
+        with session_scope(session) as session:
             member = cls(name=name.strip(), phone=phone, status=status, join_date=now())
             session.add(member)
-            session.commit()
-            session.refresh(member)  # ensures ID is populated
-            print(
-                f"✅ Member '{name}' created with ID {member.id} | Join Date: {member.join_date}"
-            )
-            return member
+            session.flush()  # ensures ID is populated
+        cls._forget(member.id, member.phone)
+        print(
+            f"✅ Member '{name}' created with ID {member.id} | Join Date: {member.join_date}"
+        )
+        return member
 
     @classmethod
-    def delete(cls, member_id: int):
-        with SessionLocal() as session:
+    def delete(cls, member_id: int, session=None):
+        with session_scope(session) as session:
             member = session.get(cls, member_id)
             if not member:
                 print("❌ Member not found.")
                 return False
+            session.execute(delete(MemberBalance).where(MemberBalance.member_id == member_id))
+            StatementCheckpoint.clear(session, [member_id])
             session.delete(member)
-            session.commit()
-            print(f"🚮 Member {member.name} deleted.")
-            return True
+        cls._forget(member_id, member.phone)
+        print(f"🚮 Member {member.name} deleted.")
+        return True
 
     @classmethod
-    def get_all(cls):
-        with SessionLocal() as session:
+    def get_all(cls, session=None):
+        with session_scope(session) as session:
             return session.query(cls).all()
 
     @classmethod
-    def get_by_id(cls, member_id: int):
-        with SessionLocal() as session:
-            return session.get(cls, member_id)
+    def get_by_id(cls, member_id: int, session=None):
+        """Look a member up by id; without a session, through member_cache."""
+        if session is None:
+            member = member_cache.get(("id", member_id))
+            if member is not MISSING:
+                return member
+        with session_scope(session) as scoped:
+            member = scoped.get(cls, member_id)
+        if session is None and member is not None:
+            cls._remember(member)
+        return member
 
     @classmethod
-    def find_by_phone(cls, phone: str):
+    def find_by_phone(cls, phone: str, session=None):
+        """Look a member up by phone (any accepted format); without a session, through member_cache."""
         phone = normalize_phone(phone)
-        with SessionLocal() as session:
-            return session.query(cls).filter_by(phone=phone).first()
+        if session is None:
+            member = member_cache.get(("phone", phone))
+            if member is not MISSING:
+                return member
+        with session_scope(session) as scoped:
+            member = scoped.query(cls).filter_by(phone=phone).first()
+        if session is None and member is not None:
+            cls._remember(member)
+        return member
+
+    @classmethod
+    def _remember(cls, member):
+        member_cache.put(("id", member.id), member)
+        member_cache.put(("phone", member.phone), member)
+
+    @classmethod
+    def _forget(cls, member_id, phone):
+        member_cache.invalidate(("id", member_id), ("phone", phone))
+
+    @classmethod
+    def cache_stats(cls):
+        """Hit/miss counters of member_cache, for sizing CHAMA_MEMBER_CACHE_SIZE / _TTL"""
+        return member_cache.stats()
 
-    def set_status(self, status: MemberStatus):
+    def set_status(self, status: MemberStatus, session=None):
         """Update member status safely."""
-        with SessionLocal() as session:
+        with session_scope(session) as session:
             managed_member = session.merge(self)
             managed_member.status = status
-            session.commit()
-            print(f"✅ Status for {managed_member.name} set to {status.value}")
+        self.status = status
+        self._forget(self.id, self.phone)
+        print(f"✅ Status for {managed_member.name} set to {status.value}")
 
     @classmethod
-    def active(cls):
-        with SessionLocal() as session:
-            return session.query(cls).filter_by(status=MemberStatus.ACTIVE).all()
+    def active(cls, session=None):
+        return cls.rows(cls.status == MemberStatus.ACTIVE, session=session)
 
     # Debug helper
     def __repr__(self):
@@ -0,0 +1,167 @@
+# lib/models/member_balance.py
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, func, select, insert, delete, case, union_all
+from datetime import datetime, date
+from lib.db.db import Base, session_scope, upsert
+from lib.db.money import Money
+from lib.models.statement_checkpoint import StatementCheckpoint
+
+def now():
+    return datetime.now().replace(microsecond=0)
+
+class MemberBalance(Base):
+    """Running per-member totals, updated in the same transaction as every money write."""
+    __tablename__ = "member_balances"
+
+    member_id = Column(Integer, ForeignKey("members.id"), primary_key=True)
+    total_contributed = Column(Money, nullable=False, default=0)
+    total_borrowed = Column(Money, nullable=False, default=0)
+    outstanding_balance = Column(Money, nullable=False, default=0)
+    last_activity = Column(DateTime)
+
+    # Methods
+    @classmethod
+    def record(cls, session, member_id: int, contributed=0, borrowed=0, outstanding=0, when=None):
+        """
+        Apply deltas to a member's running balances. The caller owns the
+        transaction, so the ledger commits (or rolls back) with the write itself.
+        """
+        cls.record_many(session, [{
+            "member_id": member_id,
+            "total_contributed": contributed,
+            "total_borrowed": borrowed,
+            "outstanding_balance": outstanding,
+            "last_activity": when or now(),
+        }])
+
+    @classmethod
+    def record_many(cls, session, deltas):
+        """
+        Apply a list of per-member delta dicts (keyed by column name) in one
+        executemany UPSERT. A delta merged from rows on several dates also
+        carries its earliest one as first_activity.
+        """
+        if not deltas:
+            return
+        stmt = upsert(cls.__table__, session)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[cls.member_id],
+            set_={
+                "total_contributed": cls.total_contributed + stmt.excluded.total_contributed,
+                "total_borrowed": cls.total_borrowed + stmt.excluded.total_borrowed,
+                "outstanding_balance": cls.outstanding_balance + stmt.excluded.outstanding_balance,
+                "last_activity": case(
+                    (cls.last_activity.is_(None), stmt.excluded.last_activity),
+                    (cls.last_activity < stmt.excluded.last_activity, stmt.excluded.last_activity),
+                    else_=cls.last_activity,
+                ),
+            },
+        )
+        defaults = {"total_contributed": 0, "total_borrowed": 0, "outstanding_balance": 0}
+        rows = [{**defaults, **delta} for delta in deltas]
+        firsts = [row.pop("first_activity", None) or row.get("last_activity") for row in rows]
+        session.execute(stmt, rows)
+
+        # Rows dated before today can land inside a period that already has a statement checkpoint
+        today = date.today()
+        StatementCheckpoint.invalidate(session, [
+            (row["member_id"], first.date()) for row, first in zip(rows, firsts) if first and first.date() < today
+        ])
+
+    @classmethod
+    def get(cls, member_id: int, session=None):
+        with session_scope(session) as session:
+            return session.get(cls, member_id)
+
+    # Rebuild / verify
+    @classmethod
+    def expected(cls, member_ids=None):
+        """Select the balances recomputed from the raw contributions, loans and repayments."""
+        from lib.models.member import Member
+        from lib.models.contribution import Contribution
+        from lib.models.loan import Loan, LoanStatus
+        from lib.models.repayment import Repayment
+
+        contrib = (
+            select(Contribution.member_id, func.sum(Contribution.amount).label("total"))
+            .group_by(Contribution.member_id)
+            .subquery()
+        )
+        loans = (
+            select(
+                Loan.member_id,
+                func.sum(Loan.amount).label("borrowed"),
+                func.sum(
+                    case((Loan.status.in_([LoanStatus.ACTIVE, LoanStatus.DEFAULTED]), Loan.balance), else_=0)
+                ).label("outstanding"),
+            )
+            .group_by(Loan.member_id)
+            .subquery()
+        )
+        events = union_all(
+            select(Contribution.member_id, Contribution.date.label("at")),
+            select(Loan.member_id, Loan.issued_date.label("at")),
+            select(Loan.member_id, Repayment.date.label("at")).join(Loan, Loan.id == Repayment.loan_id),
+        ).subquery()
+        activity = (
+            select(events.c.member_id, func.max(events.c.at).label("last"))
+            .group_by(events.c.member_id)
+            .subquery()
+        )
+
+        query = (
+            select(
+                Member.id.label("member_id"),
+                func.coalesce(contrib.c.total, 0).label("total_contributed"),
+                func.coalesce(loans.c.borrowed, 0).label("total_borrowed"),
+                func.coalesce(loans.c.outstanding, 0).label("outstanding_balance"),
+                activity.c.last.label("last_activity"),
+            )
+            .outerjoin(contrib, contrib.c.member_id == Member.id)
+            .outerjoin(loans, loans.c.member_id == Member.id)
+            .outerjoin(activity, activity.c.member_id == Member.id)
+        )
+        if member_ids is not None:
+            query = query.where(Member.id.in_(member_ids))
+        return query
+
+    @classmethod
+    def rebuild(cls, session=None, member_ids=None):
+        """Recompute balances from the raw tables (all members, or just member_ids)."""
+        wipe = delete(cls)
+        if member_ids is not None:
+            wipe = wipe.where(cls.member_id.in_(member_ids))
+        with session_scope(session) as session:
+            session.execute(wipe)
+            StatementCheckpoint.clear(session, member_ids)  # the raw rows changed underneath them
+            result = session.execute(
+                insert(cls).from_select(
+                    ["member_id", "total_contributed", "total_borrowed", "outstanding_balance", "last_activity"],
+                    cls.expected(member_ids),
+                )
+            )
+            return result.rowcount
+
+    @classmethod
+    def verify(cls, session=None):
+        """Return a list of (member_id, column, stored, expected) for every ledger drift."""
+        columns = ["total_contributed", "total_borrowed", "outstanding_balance", "last_activity"]
+        with session_scope(session) as session:
+            stored = {row.member_id: row for row in session.execute(select(cls.__table__))}
+            mismatches = []
+            for row in session.execute(cls.expected()):
+                current = stored.pop(row.member_id, None)
+                for column in columns:
+                    want = getattr(row, column)
+                    # A member with no activity yet has no row: that reads as zero balances
+                    have = getattr(current, column) if current is not None else (None if column == "last_activity" else 0)
+                    if have != want:
+                        mismatches.append((row.member_id, column, have, want))
+            for member_id in stored:
+                mismatches.append((member_id, "member_id", member_id, None))
+            return mismatches
+
+    # Debug helper
+    def __repr__(self):
+        return (f"<MemberBalance member_id={self.member_id}, contributed={self.total_contributed}, "
+                f"borrowed={self.total_borrowed}, outstanding={self.outstanding_balance}, "
+                f"last_activity={self.last_activity}>")
@@ -1,58 +1,90 @@
 # lib/models/repayment.py
-from sqlalchemy import Column, Integer, ForeignKey, Float, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index
 from datetime import datetime
-from lib.db.db import Base, SessionLocal
+from lib.db.db import Base, session_scope, ReadModel
+from lib.models.rows import RepaymentRow
+from lib.db.money import Money, to_money
 from lib.models.loan import Loan
+from lib.models.member_balance import MemberBalance
+from lib.metrics import REPAYMENT_SECONDS, REPAYMENTS, on_commit, timed
 
 # Function to get current datetime without microseconds
 def now():
     return datetime.now().replace(microsecond=0)
 
-class Repayment(Base):
+class Repayment(ReadModel, Base):
     __tablename__ = "repayments"
+    __read_model__ = RepaymentRow
+    __table_args__ = (
+        Index("ix_repayments_loan_id", "loan_id"),
+    )
 
     id = Column(Integer, primary_key=True)
     loan_id = Column(Integer, ForeignKey("loans.id"), nullable=False)
-    amount = Column(Float, nullable=False)
+    amount = Column(Money, nullable=False)
     date = Column(DateTime, default=now)
 
     # Methods
     @classmethod
-    def apply_repayment(cls, loan_id: int, amount: float):
+    def apply_repayment(cls, loan_id: int, amount, when=None, session=None):
         """Apply repayment to a loan safely"""
-        if amount <= 0:
-            raise ValueError("❌ Repayment must be greater than 0.")
-
-        session = SessionLocal()
-        loan = session.get(Loan, loan_id)
-        if not loan:
-            raise ValueError("❌ Loan not found.")
-        if amount > loan.balance:
-            raise ValueError("❌ Repayment cannot exceed loan balance.")
-
-        # Create repayment record and apply to loan
-        repayment = cls(loan_id=loan_id, amount=amount, date=now())
-        loan.apply_repayment(amount)  # Updates balance and status
-
-        session.add(repayment)
-        session.commit()
-        print(f"✅ Repayment of {amount} applied to Loan {loan_id}, new balance {loan.balance}")
+        with session_scope(session) as session:
+            repayment, balance, status = cls.post(session, [(loan_id, amount, when)])[0]
+        print(f"✅ Repayment of {repayment.amount:.2f} applied to Loan {loan_id}. "
+              f"New balance: {balance:.2f}, Status: {status.value}")
         return repayment
 
     @classmethod
-    def get_all(cls):
-        session = SessionLocal()
-        return session.query(cls).all()
+    def apply_many(cls, payments, session=None):
+        """
+        Post a batch of (loan_id, amount[, date]) repayments with a single
+        commit. If any payment is rejected, none of the batch is applied.
+        """
+        with session_scope(session) as session:
+            posted = cls.post(session, payments)
+        print(f"✅ {len(posted)} repayments posted.")
+        return [repayment for repayment, _, _ in posted]
 
     @classmethod
-    def get_by_id(cls, repayment_id: int):
-        session = SessionLocal()
-        return session.get(cls, repayment_id)
+    @timed(REPAYMENT_SECONDS)
+    def post(cls, session, payments):
+        """
+        Post (loan_id, amount[, date]) repayments inside the caller's
+        transaction. Each one is a guarded balance update on its loan; the
+        repayment rows and ledger deltas are then written together, so a
+        balance never changes without its repayment row.
+        Returns (repayment, new balance, new status) per payment.
+        """
+        posted = []
+        deltas = []
+        for loan_id, amount, *date in payments:
+            amount = to_money(amount)
+            if amount <= 0:
+                raise ValueError("❌ Repayment must be greater than 0.")
+            when = (date[0] if date else None) or now()
+            member_id, balance, status = Loan.debit(session, loan_id, amount, when)
+            posted.append((cls(loan_id=loan_id, amount=amount, date=when), balance, status))
+            deltas.append({"member_id": member_id, "outstanding_balance": -amount, "last_activity": when})
+
+        session.add_all([repayment for repayment, _, _ in posted])
+        session.flush()
+        MemberBalance.record_many(session, deltas)
+        on_commit(session, REPAYMENTS, len(posted))
+        return posted
+
+    @classmethod
+    def get_all(cls, session=None):
+        with session_scope(session) as session:
+            return session.query(cls).all()
+
+    @classmethod
+    def get_by_id(cls, repayment_id: int, session=None):
+        with session_scope(session) as session:
+            return session.get(cls, repayment_id)
 
     @classmethod
-    def for_loan(cls, loan_id: int):
-        session = SessionLocal()
-        return session.query(cls).filter_by(loan_id=loan_id).all()
+    def for_loan(cls, loan_id: int, session=None):
+        return cls.rows(cls.loan_id == loan_id, session=session)
 
     # Debug helper
     def __repr__(self):
@@ -0,0 +1,45 @@
+# lib/models/rows.py
+from datetime import datetime
+from decimal import Decimal
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+if TYPE_CHECKING:  # the model modules import this one
+    from lib.models.loan import LoanStatus
+    from lib.models.member import MemberStatus
+
+# Read models: plain named tuples for listing and reporting. They are filled
+# from column projections, so no identity map or attribute instrumentation
+# is involved; field names match the model columns so templates work on both.
+
+
+class MemberRow(NamedTuple):
+    id: int
+    name: str
+    phone: str
+    status: "MemberStatus"
+    join_date: Optional[datetime]
+
+
+class ContributionRow(NamedTuple):
+    id: int
+    member_id: int
+    amount: Decimal
+    date: Optional[datetime]
+
+
+class LoanRow(NamedTuple):
+    id: int
+    member_id: int
+    amount: Decimal
+    balance: Decimal
+    interest_rate: float
+    status: "LoanStatus"
+    issued_date: Optional[datetime]
+    due_date: datetime
+
+
+class RepaymentRow(NamedTuple):
+    id: int
+    loan_id: int
+    amount: Decimal
+    date: Optional[datetime]
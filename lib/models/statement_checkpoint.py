@@ -0,0 +1,78 @@
+# lib/models/statement_checkpoint.py
+from sqlalchemy import Column, Integer, ForeignKey, Date, DateTime, select, delete, func, bindparam
+from datetime import datetime, date
+from lib.db.db import Base, session_scope, upsert
+from lib.db.money import Money
+
+def now():
+    return datetime.now().replace(microsecond=0)
+
+class StatementCheckpoint(Base):
+    """
+    A member's cumulative statement totals as of the end of period_end, a day
+    already over. The next statement starts from here instead of from the
+    member's first transaction.
+    """
+    __tablename__ = "statement_checkpoints"
+
+    member_id = Column(Integer, ForeignKey("members.id"), primary_key=True)
+    period_end = Column(Date, primary_key=True)
+    total_contributed = Column(Money, nullable=False, default=0)
+    total_borrowed = Column(Money, nullable=False, default=0)
+    total_repaid = Column(Money, nullable=False, default=0)
+    created_at = Column(DateTime, default=now)
+
+    # Methods
+    @classmethod
+    def latest_before(cls, session, member_ids, day: date):
+        """Return {member_id: checkpoint} with each member's latest period_end before day."""
+        latest = (
+            select(cls.member_id, func.max(cls.period_end).label("period_end"))
+            .where(cls.member_id.in_(member_ids), cls.period_end < day)
+            .group_by(cls.member_id)
+            .subquery()
+        )
+        query = select(cls).join(
+            latest, (latest.c.member_id == cls.member_id) & (latest.c.period_end == cls.period_end)
+        )
+        return {checkpoint.member_id: checkpoint for checkpoint in session.scalars(query)}
+
+    @classmethod
+    def save_many(cls, session, checkpoints):
+        """Insert or replace checkpoints, given as dicts keyed by column name."""
+        if not checkpoints:
+            return
+        stmt = upsert(cls.__table__, session)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[cls.member_id, cls.period_end],
+            set_={column: stmt.excluded[column]
+                  for column in ("total_contributed", "total_borrowed", "total_repaid", "created_at")},
+        )
+        session.execute(stmt, [{"created_at": now(), **checkpoint} for checkpoint in checkpoints])
+
+    @classmethod
+    def invalidate(cls, session, changes):
+        """
+        Drop checkpoints made stale by backdated writes. changes is a list of
+        (member_id, day) pairs; every checkpoint of that member ending on or
+        after day no longer matches the rows and is removed.
+        """
+        if changes:
+            session.execute(
+                delete(cls.__table__).where(cls.member_id == bindparam("m"), cls.period_end >= bindparam("d")),
+                [{"m": member_id, "d": day} for member_id, day in changes],
+            )
+
+    @classmethod
+    def clear(cls, session=None, member_ids=None):
+        """Remove all checkpoints (or those of member_ids)."""
+        stmt = delete(cls)
+        if member_ids is not None:
+            stmt = stmt.where(cls.member_id.in_(member_ids))
+        with session_scope(session) as session:
+            return session.execute(stmt).rowcount
+
+    # Debug helper
+    def __repr__(self):
+        return (f"<StatementCheckpoint member_id={self.member_id}, period_end={self.period_end}, "
+                f"contributed={self.total_contributed}, borrowed={self.total_borrowed}, repaid={self.total_repaid}>")
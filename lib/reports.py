@@ -0,0 +1,56 @@
+# lib/reports.py
+from sqlalchemy import select, func
+from lib.db.db import session_scope
+from lib.models.member import Member
+from lib.models.loan import Loan, LoanStatus
+from lib.models.member_balance import MemberBalance
+
+# Each report is a single grouped or joined query; callers only render the rows.
+
+
+def group_totals(session=None):
+    """Return one row of (members, contributed, borrowed, outstanding) for the whole chama, from the ledger."""
+    query = select(
+        select(func.count(Member.id)).scalar_subquery().label("members"),
+        func.coalesce(func.sum(MemberBalance.total_contributed), 0).label("contributed"),
+        func.coalesce(func.sum(MemberBalance.total_borrowed), 0).label("borrowed"),
+        func.coalesce(func.sum(MemberBalance.outstanding_balance), 0).label("outstanding"),
+    )
+    with session_scope(session) as session:
+        return session.execute(query).one()
+
+
+def arrears(session=None):
+    """Return (member_id, name, phone, loan_id, balance, due_date) for every DEFAULTED loan, by member."""
+    query = (
+        select(Member.id.label("member_id"), Member.name, Member.phone,
+               Loan.id.label("loan_id"), Loan.balance, Loan.due_date)
+        .join(Loan, Loan.member_id == Member.id)
+        .where(Loan.status == LoanStatus.DEFAULTED)
+        .order_by(Member.id, Loan.id)
+    )
+    with session_scope(session) as session:
+        return session.execute(query).all()
+
+
+def loan_status_breakdown(session=None):
+    """Return (status, loans, amount, balance) per loan status."""
+    query = (
+        select(Loan.status, func.count(Loan.id).label("loans"),
+               func.sum(Loan.amount).label("amount"), func.sum(Loan.balance).label("balance"))
+        .group_by(Loan.status)
+        .order_by(Loan.status)
+    )
+    with session_scope(session) as session:
+        return session.execute(query).all()
+
+
+def member_status_breakdown(session=None):
+    """Return (status, members) per member status."""
+    query = (
+        select(Member.status, func.count(Member.id).label("members"))
+        .group_by(Member.status)
+        .order_by(Member.status)
+    )
+    with session_scope(session) as session:
+        return session.execute(query).all()
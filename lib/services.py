@@ -0,0 +1,121 @@
+# lib/services.py
+from sqlalchemy import func, select
+from lib import commands
+from lib.commands import NotFound, as_dict, enum_value
+from lib.db.aio import GroupCommit
+from lib.db.money import to_money
+from lib.metrics import LOAN_DECISION_SECONDS, LOANS_ISSUED, on_commit, timed
+from lib.models.member import Member, MemberStatus
+from lib.models.contribution import Contribution
+from lib.models.loan import Loan, LoanStatus
+from lib.models.repayment import Repayment
+from lib.models.member_balance import MemberBalance
+
+# Async operations behind the HTTP API (lib/api.py). Like lib.commands, each
+# one runs inside the caller's AsyncSession (lib.db.aio) and returns plain
+# data; nothing here commits -- except contribution_add, which group-commits
+# (see below). Loan decisions await each rule's query and apply the
+# Loan.check_* rules; model code that already does its job in one call
+# (Contribution.record_many, the lib.commands operations) runs unchanged on
+# the same async connection through AsyncSession.run_sync.
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# pg_advisory_xact_lock key held while a loan is decided on PostgreSQL, so two
+# requests can't both pass the active-loan or pool checks. (On SQLite the
+# decision already runs under lib.db.aio.write_lock().)
+LOAN_DECISION_LOCK = 0x43484D41
+
+
+async def run(session, op, **params):
+    """A lib.commands operation by name, on the session's sync side"""
+    def run_sync(sync_session):
+        result = commands.run(op, sync_session, **params)
+        return result if isinstance(result, dict) else list(result)  # a listing reads through the session
+    return await session.run_sync(run_sync)
+
+
+async def get_or_fail(session, model, record_id):
+    record = await session.get(model, record_id)
+    if record is None:
+        raise NotFound(f"❌ {model.__name__} {record_id} not found.")
+    return record
+
+
+async def page(session, model, *criteria, after_id=0, limit=PAGE_SIZE):
+    """Up to limit read rows (as dicts) matching criteria with id > after_id, in id order"""
+    query = model.projection().where(model.id > after_id, *criteria).order_by(model.id)
+    rows = await session.execute(query.limit(min(limit, MAX_PAGE_SIZE)))
+    return [as_dict(model.__read_model__._make(row)) for row in rows]
+
+
+# Members
+async def member_list(session, status=None, after_id=0, limit=PAGE_SIZE):
+    criteria = [Member.status == enum_value(MemberStatus, status)] if status else []
+    return await page(session, Member, *criteria, after_id=after_id, limit=limit)
+
+
+# Contributions
+async def write_contributions(session, contributions):
+    """GroupCommit write: record the (member_id, amount) pairs whose member exists"""
+    member_ids = {member_id for member_id, _ in contributions}
+    known = set(await session.scalars(select(Member.id).where(Member.id.in_(member_ids))))
+    accepted = [(member_id, amount) for member_id, amount in contributions if member_id in known]
+    rows = iter(await session.run_sync(Contribution.record_many, accepted))
+    return [as_dict(next(rows)) if member_id in known else NotFound(f"❌ Member {member_id} not found.")
+            for member_id, _ in contributions]
+
+
+# Contributions posted at the same time (the mobile app, the USSD gateway)
+# are written together: one transaction and a few executemany statements per
+# batch instead of a transaction each
+contribution_writes = GroupCommit(write_contributions)
+
+
+async def contribution_add(member_id, amount):
+    """Record a contribution in the next group commit; returns today's row for the member"""
+    return await contribution_writes.submit((member_id, Contribution.check_amount(amount)))
+
+
+async def contribution_list(session, member_id=None, after_id=0, limit=PAGE_SIZE):
+    criteria = [Contribution.member_id == member_id] if member_id is not None else []
+    return await page(session, Contribution, *criteria, after_id=after_id, limit=limit)
+
+
+# Loans
+@timed(LOAN_DECISION_SECONDS, ok="issued")
+async def loan_issue(session, member_id, amount, plan):
+    """Loan.issue_loan: the same rules in the same order, each query awaited"""
+    amount = Loan.check_plan(amount, plan)
+    if session.get_bind().dialect.name == "postgresql":
+        await session.execute(select(func.pg_advisory_xact_lock(LOAN_DECISION_LOCK)))
+
+    Loan.check_member(await session.get(Member, member_id))
+    Loan.check_no_active_loan(await session.scalar(Loan.active_loan_query(member_id)))
+    balance = await session.get(MemberBalance, member_id)
+    Loan.check_limit(amount, balance.total_contributed if balance else to_money(0))
+    Loan.check_pool(amount, *(await session.execute(Loan.pool_totals_query())).one())
+
+    loan = Loan.for_plan(member_id, amount, plan)
+    session.add(loan)
+    await session.flush()
+    await session.run_sync(MemberBalance.record, member_id, borrowed=amount, outstanding=loan.balance,
+                           when=loan.issued_date)
+    on_commit(session, LOANS_ISSUED)
+    return as_dict(loan)
+
+
+async def loan_list(session, member_id=None, status=None, after_id=0, limit=PAGE_SIZE):
+    criteria = []
+    if member_id is not None:
+        criteria.append(Loan.member_id == member_id)
+    if status:
+        criteria.append(Loan.status == enum_value(LoanStatus, status))
+    return await page(session, Loan, *criteria, after_id=after_id, limit=limit)
+
+
+# Repayments
+async def repayment_list(session, loan_id=None, after_id=0, limit=PAGE_SIZE):
+    criteria = [Repayment.loan_id == loan_id] if loan_id is not None else []
+    return await page(session, Repayment, *criteria, after_id=after_id, limit=limit)
@@ -0,0 +1,240 @@
+# lib/statements.py
+import csv
+import io
+import os
+from calendar import monthrange
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import List, NamedTuple, Optional
+from tabulate import tabulate
+from lib.db.db import session_scope
+from lib.db.money import to_money
+from lib.models.member import Member
+from lib.models.contribution import Contribution
+from lib.models.loan import Loan
+from lib.models.repayment import Repayment
+from lib.models.statement_checkpoint import StatementCheckpoint
+from lib.models.rows import MemberRow, ContributionRow, LoanRow, RepaymentRow
+
+
+class Totals(NamedTuple):
+    contributed: Decimal
+    borrowed: Decimal
+    repaid: Decimal
+
+    def plus(self, contributions, loans, repayments):
+        return Totals(
+            self.contributed + sum((c.amount for c in contributions), to_money(0)),
+            self.borrowed + sum((l.amount for l in loans), to_money(0)),
+            self.repaid + sum((r.amount for r in repayments), to_money(0)),
+        )
+
+
+ZERO = Totals(to_money(0), to_money(0), to_money(0))
+
+
+class Statement(NamedTuple):
+    member: MemberRow
+    start: date
+    end: date
+    opening: Totals
+    closing: Totals
+    contributions: List[ContributionRow]
+    loans: List[LoanRow]
+    repayments: List[RepaymentRow]
+
+
+def month_period(month: str):
+    """'YYYY-MM' -> (first day, last day) of that month"""
+    first = datetime.strptime(month, "%Y-%m").date()
+    return first, first.replace(day=monthrange(first.year, first.month)[1])
+
+
+def day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min)
+
+
+def activity(session, member_ids, since, end):
+    """
+    Load contributions, loans issued and repayments for member_ids dated from
+    since (a datetime, or None for the beginning) to the end of day end, in
+    three queries. Returns three {member_id: [rows]} dicts.
+    """
+    until = day_start(end + timedelta(days=1))
+
+    def window(column):
+        criteria = [column < until]
+        if since is not None:
+            criteria.append(column >= since)
+        return criteria
+
+    contributions, loans, repayments = defaultdict(list), defaultdict(list), defaultdict(list)
+    for row in Contribution.fetch(
+        Contribution.projection()
+        .where(Contribution.member_id.in_(member_ids), *window(Contribution.date))
+        .order_by(Contribution.member_id, Contribution.date, Contribution.id),
+        session,
+    ):
+        contributions[row.member_id].append(row)
+    for row in Loan.fetch(
+        Loan.projection()
+        .where(Loan.member_id.in_(member_ids), *window(Loan.issued_date))
+        .order_by(Loan.member_id, Loan.issued_date, Loan.id),
+        session,
+    ):
+        loans[row.member_id].append(row)
+    for *row, member_id in session.execute(
+        Repayment.projection().add_columns(Loan.member_id)
+        .join(Loan, Loan.id == Repayment.loan_id)
+        .where(Loan.member_id.in_(member_ids), *window(Repayment.date))
+        .order_by(Loan.member_id, Repayment.date, Repayment.id)
+    ):
+        repayments[member_id].append(RepaymentRow._make(row))
+    return contributions, loans, repayments
+
+
+def build_statements(session, members, start: date, end: date, save_checkpoints=True):
+    """
+    Build the statements of start..end (inclusive days) for a batch of
+    MemberRows. Each member starts from their latest checkpoint before start,
+    so only rows dated after it are read. When end is already over, the
+    closing totals are stored as that member's new checkpoint (unless
+    save_checkpoints is off; see closing_checkpoints).
+    """
+    member_ids = [member.id for member in members]
+    checkpoints = StatementCheckpoint.latest_before(session, member_ids, start)
+
+    # One read for the batch, from the earliest point any member needs
+    resume = [day_start(checkpoint.period_end + timedelta(days=1)) for checkpoint in checkpoints.values()]
+    since = min(resume) if len(checkpoints) == len(member_ids) else None
+    contributions, loans, repayments = activity(session, member_ids, since, end)
+
+    opens_at = day_start(start)
+    statements = []
+    for member in members:
+        checkpoint = checkpoints.get(member.id)
+        if checkpoint:
+            carried = Totals(checkpoint.total_contributed, checkpoint.total_borrowed, checkpoint.total_repaid)
+            after = day_start(checkpoint.period_end + timedelta(days=1))
+        else:
+            carried, after = ZERO, datetime.min
+
+        def split(rows, when):
+            rows = [row for row in rows if when(row) >= after]
+            return [row for row in rows if when(row) < opens_at], [row for row in rows if when(row) >= opens_at]
+
+        c_before, c_period = split(contributions[member.id], lambda c: c.date)
+        l_before, l_period = split(loans[member.id], lambda l: l.issued_date)
+        r_before, r_period = split(repayments[member.id], lambda r: r.date)
+
+        opening = carried.plus(c_before, l_before, r_before)
+        closing = opening.plus(c_period, l_period, r_period)
+        statements.append(Statement(member, start, end, opening, closing, c_period, l_period, r_period))
+
+    if save_checkpoints:
+        StatementCheckpoint.save_many(session, closing_checkpoints(statements))
+    return statements
+
+
+def closing_checkpoints(statements):
+    """Checkpoint dicts for the statements whose period is already over"""
+    return [
+        {"member_id": s.member.id, "period_end": s.end, "total_contributed": s.closing.contributed,
+         "total_borrowed": s.closing.borrowed, "total_repaid": s.closing.repaid}
+        for s in statements if s.end < date.today()
+    ]
+
+
+def member_statement(member_id: int, start: Optional[date], end: date, session=None):
+    """
+    Return one member's Statement for start..end, or None if there is no such
+    member. A start of None means the day they joined (their whole history).
+    """
+    with session_scope(session) as session:
+        members = Member.rows(Member.id == member_id, session=session)
+        if not members:
+            return None
+        if start is None:
+            start = (members[0].join_date or datetime.min).date()
+        return build_statements(session, members, start, end)[0]
+
+
+def render_text(statement: Statement) -> str:
+    """Plain-text statement, laid out like the CLI Member Statement"""
+    m, opening, closing = statement.member, statement.opening, statement.closing
+    lines = [
+        f"Statement for {m.name} (Member {m.id}, Phone: {m.phone}, Status: {m.status.value})",
+        f"Period: {statement.start} to {statement.end}",
+        "",
+        tabulate(
+            [["Contributions", opening.contributed, closing.contributed],
+             ["Loans issued", opening.borrowed, closing.borrowed],
+             ["Repayments", opening.repaid, closing.repaid]],
+            headers=["", "Opening", "Closing"], tablefmt="grid", floatfmt=".2f",
+        ),
+    ]
+    sections = [
+        ("Contributions", ["ID", "Amount", "Date"],
+         [[c.id, f"{c.amount:.2f}", f"{c.date:%Y-%m-%d}"] for c in statement.contributions]),
+        ("Loans", ["ID", "Amount", "Balance", "Status", "Issued", "Due Date"],
+         [[l.id, f"{l.amount:.2f}", f"{l.balance:.2f}", l.status.value, f"{l.issued_date:%Y-%m-%d}",
+           f"{l.due_date:%Y-%m-%d}"] for l in statement.loans]),
+        ("Repayments", ["ID", "Loan ID", "Amount", "Date"],
+         [[r.id, r.loan_id, f"{r.amount:.2f}", f"{r.date:%Y-%m-%d}"] for r in statement.repayments]),
+    ]
+    for title, headers, rows in sections:
+        lines += ["", f"{title}:", tabulate(rows, headers=headers, tablefmt="grid") if rows else "None in this period."]
+    return "\n".join(lines) + "\n"
+
+
+CSV_HEADERS = ["type", "id", "loan_id", "date", "amount", "balance", "status", "due_date"]
+
+
+def render_csv(statement: Statement) -> str:
+    """Statement as CSV: opening totals, the period's transactions by date, closing totals"""
+    s = statement
+    day = lambda value: f"{value:%Y-%m-%d}" if value else ""
+    transactions = sorted(
+        [("contribution", c.id, "", c.date, c.amount, "", "", "") for c in s.contributions]
+        + [("loan", l.id, "", l.issued_date, l.amount, l.balance, l.status.value, day(l.due_date)) for l in s.loans]
+        + [("repayment", r.id, r.loan_id, r.date, r.amount, "", "", "") for r in s.repayments],
+        key=lambda row: row[3] or datetime.min,
+    )
+    totals = lambda label, t, when: [
+        [f"{label}_{field}", "", "", day(when), amount, "", "", ""] for field, amount in t._asdict().items()
+    ]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADERS)
+    writer.writerows(totals("opening", s.opening, s.start))
+    writer.writerows([kind, id_, loan_id, day(when), *rest] for kind, id_, loan_id, when, *rest in transactions)
+    writer.writerows(totals("closing", s.closing, s.end))
+    return buffer.getvalue()
+
+
+def statement_path(out_dir: str, member_id: int, start: date, end: date, ext="txt") -> str:
+    return os.path.join(out_dir, f"member_{member_id}_{start:%Y%m%d}-{end:%Y%m%d}.{ext}")
+
+
+def generate_statements(start: date, end: date, out_dir: str, batch_size: int = 500):
+    """
+    Write one statement file per member for start..end, in a single pass over
+    the members in id order. Each batch of members is read with a handful of
+    queries and committed (with its checkpoints) on its own, so memory stays
+    flat and a long run never holds one big transaction. Returns files written.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    after_id = written = 0
+    while True:
+        with session_scope() as session:
+            members = Member.page(after_id, batch_size, session)
+            if not members:
+                break
+            for statement in build_statements(session, members, start, end):
+                with open(statement_path(out_dir, statement.member.id, start, end), "w", encoding="utf-8") as f:
+                    f.write(render_text(statement))
+                written += 1
+        after_id = members[-1].id
+        print(f"   ...{written} statements written")
+    return written
@@ -19,13 +19,18 @@ if config.config_file_name is not None:
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
 
-from lib.db.db import Base
+from lib.db.db import Base, DATABASE_URL
 from lib.models.member import Member
 from lib.models.contribution import Contribution
 from lib.models.loan import Loan
 from lib.models.repayment import Repayment
+from lib.models.member_balance import MemberBalance
+from lib.models.statement_checkpoint import StatementCheckpoint
 target_metadata = Base.metadata
 
+# Migrate the same database the app uses (DATABASE_URL / .env), not just alembic.ini's default
+config.set_main_option("sqlalchemy.url", DATABASE_URL.replace("%", "%%"))
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -0,0 +1,52 @@
+"""Add member_balances ledger
+
+Revision ID: 3b1f6c2a9d47
+Revises: d656104be522
+Create Date: 2026-10-18 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b1f6c2a9d47'
+down_revision: Union[str, None] = 'd656104be522'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('member_balances',
+    sa.Column('member_id', sa.Integer(), nullable=False),
+    sa.Column('total_contributed', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('total_borrowed', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('outstanding_balance', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('last_activity', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['member_id'], ['members.id'], ),
+    sa.PrimaryKeyConstraint('member_id')
+    )
+
+    # Backfill from the existing rows
+    op.execute("""
+        INSERT INTO member_balances
+            (member_id, total_contributed, total_borrowed, outstanding_balance, last_activity)
+        SELECT
+            m.id,
+            COALESCE((SELECT SUM(c.amount) FROM contributions c WHERE c.member_id = m.id), 0),
+            COALESCE((SELECT SUM(l.amount) FROM loans l WHERE l.member_id = m.id), 0),
+            COALESCE((SELECT SUM(l.balance) FROM loans l
+                      WHERE l.member_id = m.id AND l.status IN ('ACTIVE', 'DEFAULTED')), 0),
+            (SELECT MAX(a.at) FROM (
+                SELECT member_id, date AS at FROM contributions
+                UNION ALL SELECT member_id, issued_date FROM loans
+                UNION ALL SELECT l.member_id, r.date FROM repayments r JOIN loans l ON l.id = r.loan_id
+             ) a WHERE a.member_id = m.id)
+        FROM members m
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('member_balances')
@@ -0,0 +1,35 @@
+"""Add statement_checkpoints
+
+Revision ID: 5d8c3e1f7a42
+Revises: e4b7a2c9d813
+Create Date: 2026-10-18 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d8c3e1f7a42'
+down_revision: Union[str, None] = 'e4b7a2c9d813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('statement_checkpoints',
+    sa.Column('member_id', sa.Integer(), nullable=False),
+    sa.Column('period_end', sa.Date(), nullable=False),
+    sa.Column('total_contributed', sa.BigInteger(), nullable=False),
+    sa.Column('total_borrowed', sa.BigInteger(), nullable=False),
+    sa.Column('total_repaid', sa.BigInteger(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['member_id'], ['members.id'], ),
+    sa.PrimaryKeyConstraint('member_id', 'period_end')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('statement_checkpoints')
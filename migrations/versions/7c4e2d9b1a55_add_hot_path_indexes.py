@@ -0,0 +1,31 @@
+"""Add composite indexes for hot lookup paths
+
+Revision ID: 7c4e2d9b1a55
+Revises: 3b1f6c2a9d47
+Create Date: 2026-10-18 09:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c4e2d9b1a55'
+down_revision: Union[str, None] = '3b1f6c2a9d47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_contributions_member_id_date', 'contributions', ['member_id', 'date'], unique=False)
+    op.create_index('ix_loans_member_id_status', 'loans', ['member_id', 'status'], unique=False)
+    op.create_index('ix_loans_status_due_date', 'loans', ['status', 'due_date'], unique=False)
+    op.create_index('ix_repayments_loan_id', 'repayments', ['loan_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_repayments_loan_id', table_name='repayments')
+    op.drop_index('ix_loans_status_due_date', table_name='loans')
+    op.drop_index('ix_loans_member_id_status', table_name='loans')
+    op.drop_index('ix_contributions_member_id_date', table_name='contributions')
@@ -19,50 +19,56 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
-    # ### commands auto generated by Alembic - please adjust! ###
-    op.drop_table('repayments')
-    op.drop_table('members')
-    op.drop_table('loans')
-    op.drop_table('contributions')
-    # ### end Alembic commands ###
+    # Clears tables left by create_all before migrations were used. A fresh
+    # database (SQLite or Postgres) has none, so only drop what exists,
+    # children before the tables they reference.
+    #
+    # Edited in place rather than in a new revision: this is the first
+    # revision, so a fresh database has to get past it before any later one
+    # runs. Every database already stamped at or past it never runs this
+    # again, and where the old body could run it dropped the same tables.
+    op.drop_table('repayments', if_exists=True)
+    op.drop_table('loans', if_exists=True)
+    op.drop_table('contributions', if_exists=True)
+    op.drop_table('members', if_exists=True)
 
 
 def downgrade() -> None:
     # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('members',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('phone', sa.String(), nullable=False),
+    sa.Column('join_date', sa.DateTime(), nullable=True),
+    sa.Column('status', sa.String(length=9), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('phone')
+    )
     op.create_table('contributions',
-    sa.Column('id', sa.INTEGER(), nullable=False),
-    sa.Column('member_id', sa.INTEGER(), nullable=False),
-    sa.Column('amount', sa.NUMERIC(precision=10, scale=2), nullable=False),
-    sa.Column('date', sa.DATETIME(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('member_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('date', sa.DateTime(), nullable=True),
     sa.ForeignKeyConstraint(['member_id'], ['members.id'], ),
     sa.PrimaryKeyConstraint('id')
     )
     op.create_table('loans',
-    sa.Column('id', sa.INTEGER(), nullable=False),
-    sa.Column('member_id', sa.INTEGER(), nullable=False),
-    sa.Column('amount', sa.FLOAT(), nullable=False),
-    sa.Column('issued_date', sa.DATETIME(), nullable=True),
-    sa.Column('due_date', sa.DATETIME(), nullable=False),
-    sa.Column('interest_rate', sa.FLOAT(), nullable=False),
-    sa.Column('status', sa.VARCHAR(length=9), nullable=True),
-    sa.Column('balance', sa.FLOAT(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('member_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('issued_date', sa.DateTime(), nullable=True),
+    sa.Column('due_date', sa.DateTime(), nullable=False),
+    sa.Column('interest_rate', sa.Float(), nullable=False),
+    sa.Column('status', sa.String(length=9), nullable=True),
+    sa.Column('balance', sa.Float(), nullable=False),
     sa.ForeignKeyConstraint(['member_id'], ['members.id'], ),
     sa.PrimaryKeyConstraint('id')
     )
-    op.create_table('members',
-    sa.Column('id', sa.INTEGER(), nullable=False),
-    sa.Column('name', sa.VARCHAR(), nullable=False),
-    sa.Column('phone', sa.VARCHAR(), nullable=False),
-    sa.Column('join_date', sa.DATETIME(), nullable=True),
-    sa.Column('status', sa.VARCHAR(length=9), nullable=True),
-    sa.PrimaryKeyConstraint('id'),
-    sa.UniqueConstraint('phone')
-    )
     op.create_table('repayments',
-    sa.Column('id', sa.INTEGER(), nullable=False),
-    sa.Column('loan_id', sa.INTEGER(), nullable=False),
-    sa.Column('amount', sa.FLOAT(), nullable=False),
-    sa.Column('date', sa.DATETIME(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('loan_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('date', sa.DateTime(), nullable=True),
     sa.ForeignKeyConstraint(['loan_id'], ['loans.id'], ),
     sa.PrimaryKeyConstraint('id')
     )
@@ -0,0 +1,53 @@
+"""Add contribution_day with one contribution row per member per day
+
+Revision ID: a9d3f8e21c06
+Revises: 7c4e2d9b1a55
+Create Date: 2026-10-18 10:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d3f8e21c06'
+down_revision: Union[str, None] = '7c4e2d9b1a55'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('contributions', sa.Column('contribution_day', sa.Date(), nullable=True))
+    op.execute("UPDATE contributions SET date = COALESCE(date, CURRENT_TIMESTAMP)")
+    # date() truncates a timestamp on both SQLite and Postgres (CAST AS DATE does not on SQLite)
+    op.execute("UPDATE contributions SET contribution_day = date(date)")
+
+    # Fold same-day duplicates into the lowest id so the unique index can be built.
+    # The kept row takes the group's latest time so member_balances.last_activity still matches.
+    op.execute("""
+        UPDATE contributions
+        SET amount = (SELECT SUM(c2.amount) FROM contributions c2
+                      WHERE c2.member_id = contributions.member_id
+                        AND c2.contribution_day = contributions.contribution_day),
+            date = (SELECT MAX(c2.date) FROM contributions c2
+                    WHERE c2.member_id = contributions.member_id
+                      AND c2.contribution_day = contributions.contribution_day)
+        WHERE id IN (SELECT MIN(id) FROM contributions
+                     GROUP BY member_id, contribution_day HAVING COUNT(*) > 1)
+    """)
+    op.execute("""
+        DELETE FROM contributions
+        WHERE id NOT IN (SELECT MIN(id) FROM contributions GROUP BY member_id, contribution_day)
+    """)
+
+    with op.batch_alter_table('contributions') as batch_op:
+        batch_op.alter_column('contribution_day', existing_type=sa.Date(), nullable=False)
+    op.create_index('uq_contributions_member_id_day', 'contributions', ['member_id', 'contribution_day'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_contributions_member_id_day', table_name='contributions')
+    with op.batch_alter_table('contributions') as batch_op:
+        batch_op.drop_column('contribution_day')
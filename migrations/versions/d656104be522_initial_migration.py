@@ -67,3 +67,6 @@ def downgrade() -> None:
     op.drop_table('contributions')
     op.drop_table('members')
     # ### end Alembic commands ###
+    # Postgres keeps Enum columns as named types that outlive their tables
+    sa.Enum(name='loanstatus').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='memberstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,55 @@
+"""Store money as integer cents
+
+Revision ID: e4b7a2c9d813
+Revises: a9d3f8e21c06
+Create Date: 2026-10-18 11:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b7a2c9d813'
+down_revision: Union[str, None] = 'a9d3f8e21c06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> {column: type before this migration}
+MONEY_COLUMNS = {
+    'contributions': {'amount': sa.Numeric(precision=10, scale=2)},
+    'loans': {'amount': sa.Float(), 'balance': sa.Float()},
+    'repayments': {'amount': sa.Float()},
+    'member_balances': {
+        'total_contributed': sa.Numeric(precision=12, scale=2),
+        'total_borrowed': sa.Numeric(precision=12, scale=2),
+        'outstanding_balance': sa.Numeric(precision=12, scale=2),
+    },
+}
+
+
+def is_sqlite() -> bool:
+    return op.get_context().dialect.name == 'sqlite'
+
+
+def upgrade() -> None:
+    for table, columns in MONEY_COLUMNS.items():
+        if is_sqlite():
+            # No ALTER COLUMN TYPE: scale in place, then batch mode copies into BIGINT columns
+            op.execute(f"UPDATE {table} SET " + ", ".join(f"{c} = ROUND({c} * 100)" for c in columns))
+        with op.batch_alter_table(table) as batch_op:
+            for column, old_type in columns.items():
+                batch_op.alter_column(column, type_=sa.BigInteger(), existing_type=old_type, existing_nullable=False,
+                                      postgresql_using=f"ROUND({column} * 100)::bigint")
+
+
+def downgrade() -> None:
+    for table, columns in MONEY_COLUMNS.items():
+        with op.batch_alter_table(table) as batch_op:
+            for column, old_type in columns.items():
+                batch_op.alter_column(column, type_=old_type, existing_type=sa.BigInteger(), existing_nullable=False,
+                                      postgresql_using=f"{column} / 100.0")
+        if is_sqlite():
+            op.execute(f"UPDATE {table} SET " + ", ".join(f"{c} = {c} / 100.0" for c in columns))
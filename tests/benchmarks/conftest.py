@@ -0,0 +1,56 @@
+import contextlib
+import hashlib
+import inspect
+import os
+import shutil
+import sys
+from datetime import datetime
+
+import pytest
+
+from lib.db import seed
+from lib.db.db import SCHEMA_REVISION, engine
+from lib.models import member as member_module
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1M": 1_000_000}  # contribution rows (--fixture-sizes)
+AS_OF = datetime(2026, 1, 1)  # fixtures end here, so today's writes never merge into seeded rows
+FIXTURE_VERSION = hashlib.sha1(inspect.getsource(seed).encode()).hexdigest()[:8]
+
+
+def pytest_generate_tests(metafunc):
+    if "size" in metafunc.fixturenames:
+        metafunc.parametrize("size", metafunc.config.getoption("fixture_sizes"), scope="module")
+
+
+def fixture_shape(rows):
+    members = max(50, rows // 20)
+    return {"members": members, "contributions": rows, "loans": members // 5, "repayments": members * 3 // 5}
+
+
+@pytest.fixture(scope="module")
+def fixture_db(size, request):
+    """
+    Make the tests' database a fresh copy of size's fixture, seeding (and
+    keeping) it first if needed. Shared by a module's benchmarks, in file
+    order: the reads run before the writes change it.
+    """
+    work_db = engine.url.database
+    engine.dispose()
+    for suffix in ("", "-wal", "-shm"):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(work_db + suffix)
+    member_module.member_cache.clear()  # ids mean different members in each fixture
+
+    fixtures_dir = request.config.getoption("fixtures_dir")
+    cached = os.path.join(fixtures_dir, f"{size}-{SCHEMA_REVISION}-{FIXTURE_VERSION}.db")
+    if not os.path.exists(cached):
+        with contextlib.redirect_stdout(sys.stderr):
+            seed.seed(**fixture_shape(SIZES[size]), seed=1, as_of=AS_OF)
+        engine.dispose()  # the last connection to close checkpoints the WAL into the file
+        os.makedirs(fixtures_dir, exist_ok=True)
+        shutil.copyfile(work_db, cached + ".part")
+        os.replace(cached + ".part", cached)
+    shutil.copyfile(cached, work_db)
+    yield fixture_shape(SIZES[size])
+    engine.dispose()
+    member_module.member_cache.clear()
@@ -0,0 +1,96 @@
+"""
+The operations we care about, timed by pytest-benchmark on seeded fixture
+databases (--fixture-sizes 1k 100k 1M). Reads run before writes, since the
+writes change the module's fixture. Each write round gets its own member
+or loan, through benchmark.pedantic.
+"""
+import itertools
+import random
+from datetime import date
+
+import pytest
+from sqlalchemy import delete
+
+from benchmarks.phone_normalize import FORMATS
+from lib import reports, statements
+from lib.db.db import session_scope
+from lib.helper import _normalize_phone, normalize_phone
+from lib.models.member import Member
+from lib.models.contribution import Contribution
+from lib.models.loan import Loan
+from lib.models.repayment import Repayment
+from lib.models.statement_checkpoint import StatementCheckpoint
+
+STATEMENT_MONTH = "2025-12"
+PHONES = 10_000
+WRITE_ROUNDS = 100
+
+
+def rounds_of(items):
+    """pedantic setup handing out one item per round, and how many rounds there are"""
+    if not items:
+        pytest.skip("nothing in the fixture to run it on")
+    handed = iter(items)
+    return (lambda: ((next(handed),), {})), min(len(items), WRITE_ROUNDS)
+
+
+# The Reports menu (lib/menu.py reports_menu), without the printing
+def test_member_statement(benchmark, fixture_db):
+    member_ids = itertools.cycle(range(1, fixture_db["members"] + 1))
+    benchmark(lambda: statements.render_text(statements.member_statement(next(member_ids), None, date.today())))
+
+
+def test_group_totals(benchmark, fixture_db):
+    benchmark(reports.group_totals)
+
+
+def test_members_in_arrears(benchmark, fixture_db):
+    benchmark(reports.arrears)
+
+
+def test_status_breakdown(benchmark, fixture_db):
+    def status_breakdown():
+        with session_scope() as session:
+            reports.loan_status_breakdown(session)
+            reports.member_status_breakdown(session)
+    benchmark(status_breakdown)
+
+
+def test_monthly_statements(benchmark, fixture_db, tmp_path):
+    start, end = statements.month_period(STATEMENT_MONTH)
+
+    def forget_checkpoints():  # every round builds the month cold
+        with session_scope() as session:
+            session.execute(delete(StatementCheckpoint))
+    benchmark.pedantic(statements.generate_statements, args=(start, end, str(tmp_path)), setup=forget_checkpoints,
+                       rounds=5)
+
+
+# The get_all listings
+@pytest.mark.parametrize("model", [Member, Contribution, Loan, Repayment], ids=lambda model: model.__name__)
+def test_get_all(benchmark, fixture_db, model):
+    benchmark(model.get_all)
+
+
+# Writes
+def test_contribution_create(benchmark, fixture_db):
+    member_ids = iter(range(1, fixture_db["members"] + 1))
+    benchmark.pedantic(lambda: Contribution.create(next(member_ids), 500),
+                       rounds=min(fixture_db["members"], WRITE_ROUNDS))
+
+
+def test_issue_loan(benchmark, fixture_db, borrowers):
+    setup, rounds = rounds_of(borrowers)
+    benchmark.pedantic(lambda member_id: Loan.issue_loan(member_id, 100, "1_month"), setup=setup, rounds=rounds)
+
+
+def test_apply_repayment(benchmark, fixture_db, loans_to_repay):
+    setup, rounds = rounds_of(loans_to_repay)
+    benchmark.pedantic(lambda loan_id: Repayment.apply_repayment(loan_id, 10), setup=setup, rounds=rounds)
+
+
+# No database: a fresh memo every round
+def test_normalize_phone(benchmark):
+    rng = random.Random(3)
+    phones = [rng.choice(FORMATS)(f"{rng.randint(0, 99_999_999):08d}") for _ in range(PHONES)]
+    benchmark.pedantic(lambda: [normalize_phone(p) for p in phones], setup=_normalize_phone.cache_clear, rounds=20)
@@ -0,0 +1,83 @@
+import os
+import tempfile
+
+# Point the app at a scratch file before lib.db.db builds its engine
+WORK_DB = os.path.join(tempfile.mkdtemp(), "tests.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{WORK_DB}"
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import exists, select
+
+from lib.db import seed
+from lib.db.db import session_scope
+from lib.db.money import to_money
+from lib.models import member as member_module
+from lib.models.member import Member
+from lib.models.loan import Loan, LoanStatus
+from lib.models.member_balance import MemberBalance
+
+AS_OF = datetime(2026, 1, 1)  # seeded rows end here, so today's writes never merge into them
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("chama benchmarks (tests/benchmarks)")
+    group.addoption("--fixture-sizes", nargs="+", choices=["1k", "100k", "1M"], default=["1k"],
+                    help="fixture databases to run the benchmarks on (default: 1k)")
+    group.addoption("--fixtures-dir", default=os.path.join(tempfile.gettempdir(), "chama-bench-fixtures"),
+                    help="where built fixtures are kept between runs")
+
+
+@pytest.fixture
+def chama():
+    """A small seeded chama, the same rows for every test; returns the row counts"""
+    member_module.member_cache.clear()  # a test may have changed a cached member
+    return seed.seed(members=60, contributions=900, loans=20, repayments=30, seed=11, as_of=AS_OF)
+
+
+def loan_candidates(limit):
+    """Members Loan.issue_loan will lend a small amount to: two months in, contributed, no active loan"""
+    with session_scope() as session:
+        return session.scalars(
+            select(Member.id).join(MemberBalance, MemberBalance.member_id == Member.id)
+            .where(Member.join_date <= datetime.now() - timedelta(days=61),
+                   MemberBalance.total_contributed >= to_money(1000),
+                   ~exists().where(Loan.member_id == Member.id, Loan.status == LoanStatus.ACTIVE))
+            .order_by(Member.id).limit(limit)
+        ).all()
+
+
+def open_loans(limit):
+    """ACTIVE loans with more than 100 left to repay"""
+    with session_scope() as session:
+        return session.scalars(
+            select(Loan.id).where(Loan.status == LoanStatus.ACTIVE, Loan.balance > to_money(100))
+            .order_by(Loan.id).limit(limit)
+        ).all()
+
+
+@pytest.fixture
+def borrowers():
+    """Up to 100 loan_candidates in the database as it is (request the database's fixture first)"""
+    return loan_candidates(100)
+
+
+@pytest.fixture
+def loans_to_repay():
+    """Up to 100 open_loans in the database as it is"""
+    return open_loans(100)
+
+
+@pytest.fixture
+def borrower(chama):
+    candidates = loan_candidates(1)
+    assert candidates, "the seeded chama has no member who can borrow"
+    return candidates[0]
+
+
+@pytest.fixture
+def open_loan(chama):
+    loans = open_loans(1)
+    assert loans, "the seeded chama has no open loan"
+    return loans[0]
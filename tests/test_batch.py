@@ -0,0 +1,77 @@
+import io
+import json
+
+import pytest
+from sqlalchemy import func, select
+
+from lib import commands
+from lib.db.db import session_scope
+from lib.models.contribution import Contribution
+
+CONTRIBUTION = '{"op": "contribution.add", "member_id": 1, "amount": "500"}'
+
+
+def run_batch(*lines):
+    """(exit code, output lines as dicts) for a batch of NDJSON lines"""
+    out = io.StringIO()
+    code = commands.run_batch([line + "\n" for line in lines], out)
+    return code, [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+def contributed():
+    with session_scope() as session:
+        return session.scalar(select(func.sum(Contribution.amount)))
+
+
+def test_batch_commits_every_line(chama):
+    before = contributed()
+    code, output = run_batch(CONTRIBUTION, "", '{"op": "member.show", "id": 2}')
+    assert code == commands.EXIT_OK
+    assert [line.get("op") for line in output] == ["contribution.add", "member.show", None]
+    assert output[-1] == {"committed": 2}
+    assert contributed() - before == 500
+
+
+def test_listing_line_has_every_record(chama):
+    code, output = run_batch('{"op": "contribution.list", "member_id": 2}', '{"op": "member.list"}')
+    assert code == commands.EXIT_OK
+    assert {record["member_id"] for record in output[0]["result"]} == {2}
+    assert len(output[1]["result"]) == chama["members"]
+
+
+@pytest.mark.parametrize("line", [
+    "not json",
+    "[1, 2]",
+    "5",
+    '"contribution.add"',
+    '{"member_id": 1}',
+    '{"op": ["contribution.add"]}',
+    '{"op": "contribution.add", "member_id": 1, "amount": "5", "note": "x"}',
+    '{"op": "contribution.add", "member_id": 1}',
+    '{"op": "loan.repay", "loan_id": 1, "amount": "1", "date": 12}',
+    '{"op": "member.show", "id": "2"}',
+    '{"op": "member.set-status", "id": true, "status": "INACTIVE"}',
+    '{"op": "contribution.add", "member_id": 1, "amount": null}',
+])
+def test_malformed_line_rolls_back(chama, line):
+    before = contributed()
+    code, output = run_batch(CONTRIBUTION, line, CONTRIBUTION)
+    assert code == commands.EXIT_USAGE
+    assert output[-1]["line"] == 2 and output[-1]["error"].startswith("❌")
+    assert contributed() == before
+
+
+@pytest.mark.parametrize("line", [
+    '{"op": "contribution.add", "member_id": 10000, "amount": "5"}',
+    '{"op": "contribution.add", "member_id": 1, "amount": "abc"}',
+    '{"op": "contribution.add", "member_id": 1, "amount": "1e30"}',
+    '{"op": "loan.issue", "member_id": 1, "amount": "100", "plan": "2_weeks"}',
+    '{"op": "member.show", "id": 10000}',
+    '{"op": "report.everything"}',
+])
+def test_refused_line_rolls_back(chama, line):
+    before = contributed()
+    code, output = run_batch(CONTRIBUTION, line, CONTRIBUTION)
+    assert code == commands.EXIT_REJECTED
+    assert output[-1]["line"] == 2 and output[-1]["error"].startswith("❌")
+    assert contributed() == before
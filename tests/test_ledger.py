@@ -0,0 +1,65 @@
+from datetime import datetime
+
+from sqlalchemy import select
+
+from lib.db.db import session_scope
+from lib.db.money import to_money
+from lib.models.contribution import Contribution
+from lib.models.loan import Loan, LoanStatus
+from lib.models.repayment import Repayment
+from lib.models.member_balance import MemberBalance
+
+
+def test_seeded_ledger_matches(chama):
+    assert MemberBalance.verify() == []
+
+
+def test_contribution_add(chama):
+    before = MemberBalance.get(1).total_contributed
+    Contribution.create(1, "500.25")
+    Contribution.create(1, "100")  # same day: merged into the row above
+    assert MemberBalance.get(1).total_contributed == before + to_money("600.25")
+    assert MemberBalance.verify() == []
+
+
+def test_loan_issue(borrower):
+    before = MemberBalance.get(borrower)
+    loan = Loan.issue_loan(borrower, 100, "1_month")
+    after = MemberBalance.get(borrower)
+    assert loan.status == LoanStatus.ACTIVE
+    assert after.total_borrowed - before.total_borrowed == to_money(100)
+    assert after.outstanding_balance - before.outstanding_balance == loan.balance
+    assert MemberBalance.verify() == []
+
+
+def test_repayment(open_loan):
+    before = Loan.get_by_id(open_loan).balance
+    Repayment.apply_repayment(open_loan, 10)
+    assert Loan.get_by_id(open_loan).balance == before - to_money(10)
+    assert MemberBalance.verify() == []
+
+
+def test_repayment_pays_off_loan(borrower):
+    loan = Loan.issue_loan(borrower, 100, "1_month")
+    Repayment.apply_repayment(loan.id, loan.balance)
+    assert Loan.get_by_id(loan.id).status == LoanStatus.PAID
+    assert MemberBalance.verify() == []
+
+
+def test_penalty(chama):
+    Loan.mark_overdue(as_of=datetime(2030, 1, 1))
+    penalised, _ = Loan.apply_penalty(5)
+    assert penalised > 0
+    assert MemberBalance.verify() == []
+
+
+def ledger():
+    with session_scope() as session:
+        return {row.member_id: tuple(row) for row in session.execute(select(MemberBalance.__table__))}
+
+
+def test_rebuild_changes_nothing(chama):
+    Contribution.create(2, 250)
+    before = ledger()
+    MemberBalance.rebuild()
+    assert ledger() == before
@@ -0,0 +1,91 @@
+from collections import defaultdict
+
+import pytest
+from sqlalchemy import update
+
+from lib import reports
+from lib.db.db import engine, session_scope
+from lib.db.money import to_money
+from lib.db.profiler import profiler
+from lib.models.member import Member
+from lib.models.contribution import Contribution
+from lib.models.loan import Loan, LoanStatus
+from lib.models.member_balance import MemberBalance
+
+
+# The loops the Reports menu ran before lib.reports, as the reference
+def legacy_group_totals():
+    members = Member.get_all()
+    total_contributions = sum((sum((c.amount for c in Contribution.for_member(m.id)), to_money(0))
+                               for m in members), to_money(0))
+    total_loans = to_money(0)
+    total_outstanding = to_money(0)
+    for m in members:
+        loans = Loan.for_member(m.id)
+        total_loans += sum((l.amount for l in loans), to_money(0))
+        total_outstanding += sum((l.balance for l in loans if l.status in [LoanStatus.ACTIVE, LoanStatus.DEFAULTED]),
+                                 to_money(0))
+    return (len(members), total_contributions, total_loans, total_outstanding)
+
+
+def legacy_arrears():
+    rows = []
+    for m in Member.get_all():
+        for l in Loan.for_member(m.id):
+            if l.status == LoanStatus.DEFAULTED:
+                rows.append((m.id, m.name, m.phone, l.id, l.balance, l.due_date))
+    return rows
+
+
+def legacy_loan_status_breakdown():
+    groups = defaultdict(lambda: [0, to_money(0), to_money(0)])
+    for l in Loan.get_all():
+        groups[l.status][0] += 1
+        groups[l.status][1] += l.amount
+        groups[l.status][2] += l.balance
+    return sorted(((status, *totals) for status, totals in groups.items()), key=lambda row: row[0].name)
+
+
+def legacy_member_status_breakdown():
+    groups = defaultdict(int)
+    for m in Member.get_all():
+        groups[m.status] += 1
+    return sorted(groups.items(), key=lambda row: row[0].name)
+
+
+def plain(result):
+    return [tuple(row) for row in result] if isinstance(result, list) else tuple(result)
+
+
+@pytest.fixture
+def defaulted(chama):
+    """The seeded chama with every third ACTIVE loan DEFAULTED, so arrears has rows"""
+    with session_scope() as session:
+        session.execute(update(Loan).where(Loan.id % 3 == 0, Loan.status == LoanStatus.ACTIVE)
+                        .values(status=LoanStatus.DEFAULTED))
+    MemberBalance.rebuild()
+
+
+@pytest.fixture
+def queries():
+    profiler.attach(engine)
+    yield profiler
+    profiler.detach()
+
+
+@pytest.mark.parametrize("legacy, report", [
+    (legacy_group_totals, reports.group_totals),
+    (legacy_arrears, reports.arrears),
+    (legacy_loan_status_breakdown, reports.loan_status_breakdown),
+    (legacy_member_status_breakdown, reports.member_status_breakdown),
+], ids=["group totals", "arrears", "loans by status", "members by status"])
+def test_report_matches_loops(defaulted, queries, legacy, report):
+    expected = plain(legacy())
+    with queries.operation(report.__name__) as operation:
+        actual = plain(report())
+    assert actual == expected
+    assert operation.statements and not operation.repeated(), operation.summary()  # set-based, no N+1
+
+
+def test_arrears_has_rows(defaulted):
+    assert reports.arrears()
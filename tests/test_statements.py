@@ -0,0 +1,64 @@
+from datetime import date, datetime
+
+from sqlalchemy import delete, func, select
+
+from lib import statements
+from lib.db.db import session_scope
+from lib.models.contribution import Contribution
+from lib.models.member import Member
+from lib.models.member_balance import MemberBalance
+from lib.models.statement_checkpoint import StatementCheckpoint
+
+MONTHS = ["2025-09", "2025-10", "2025-11", "2025-12"]
+
+
+def build(month, save_checkpoints=True):
+    """Every member's statement for month, by member id"""
+    start, end = statements.month_period(month)
+    with session_scope() as session:
+        members = Member.page(0, 1000, session)
+        return {s.member.id: s for s in statements.build_statements(session, members, start, end, save_checkpoints)}
+
+
+def forget_checkpoints():
+    with session_scope() as session:
+        session.execute(delete(StatementCheckpoint))
+
+
+def checkpoint_count():
+    with session_scope() as session:
+        return session.scalar(select(func.count()).select_from(StatementCheckpoint))
+
+
+def test_checkpointed_statements_match_full_recomputation(chama):
+    forget_checkpoints()
+    warm = {month: build(month) for month in MONTHS}  # each month opens from the last one's checkpoints
+    assert checkpoint_count() == len(MONTHS) * chama["members"]
+    for month in MONTHS:
+        forget_checkpoints()
+        assert build(month, save_checkpoints=False) == warm[month], month  # from the first row
+
+
+def test_backdated_bulk_import_drops_stale_checkpoints(chama):
+    forget_checkpoints()
+    for month in MONTHS:
+        build(month)
+    # One member's delta is merged from an old date and a recent one
+    Contribution.bulk_create([(1, 1000, datetime(2025, 9, 15)), (1, 500, datetime(2025, 12, 20))])
+    warm = build(MONTHS[-1])[1]
+    forget_checkpoints()
+    assert warm.closing == build(MONTHS[-1], save_checkpoints=False)[1].closing
+
+
+def test_whole_history_matches_ledger(chama):
+    with session_scope() as session:
+        ledger = {row.member_id: row for row in session.execute(select(MemberBalance.__table__))}
+    for member_id, balance in ledger.items():
+        statement = statements.member_statement(member_id, None, date.today())
+        assert statement.opening == statements.ZERO
+        assert statement.closing.contributed == balance.total_contributed
+        assert statement.closing.borrowed == balance.total_borrowed
+
+
+def test_unknown_member(chama):
+    assert statements.member_statement(10_000, None, date.today()) is None
@@ -0,0 +1,41 @@
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from lib import commands
+from lib.db.db import session_scope
+from lib.models.loan import Loan, LoanStatus
+from lib.models.member_balance import MemberBalance
+
+LATER = datetime(2030, 1, 1)  # every seeded loan is overdue by then
+
+
+def statuses():
+    with session_scope() as session:
+        return dict(session.execute(select(Loan.status, func.count()).group_by(Loan.status)).all())
+
+
+def test_sweep_defaults_overdue_loans(chama):
+    active = statuses().get(LoanStatus.ACTIVE, 0)
+    assert active > 0
+    assert Loan.mark_overdue(as_of=LATER) == active
+    assert LoanStatus.ACTIVE not in statuses()
+    assert MemberBalance.verify() == []
+
+
+def test_sweep_is_idempotent(chama):
+    Loan.mark_overdue(as_of=LATER)
+    after_first = statuses()
+    assert Loan.mark_overdue(as_of=LATER) == 0
+    assert statuses() == after_first
+
+
+def test_sweep_leaves_loans_not_yet_due(chama):
+    assert Loan.mark_overdue(as_of=datetime(2000, 1, 1)) == 0
+
+
+def test_sweep_command_twice(chama):
+    with session_scope() as session:
+        commands.run("loan.sweep", session)
+    with session_scope() as session:
+        assert commands.run("loan.sweep", session) == {"defaulted": 0}